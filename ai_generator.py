@@ -1,7 +1,173 @@
 import os
 import json
-from openai import OpenAI
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import streamlit as st
+import config
+from code_patch import PatchError, apply_unified_diff, build_edit_context, diff_stats
+from code_repair import repair_context, tail_of_traceback
+from code_validator import analyze_code
+from llm_cache import get_response_cache, make_cache_key
+from llm_client import get_llm_client
+from prompt_budget import PromptBudgetExceeded, check_budget, count_tokens, stage_budget
+from singleflight import get_single_flight
+from spec_compiler import UnsupportedSpec, compile_spec, get_spec_compiler
+from telemetry import span
+from utils import parse_partial_json, strip_code_fences
+
+# Spec fields the generated code depends on; code generation may start once these are complete.
+# The spec prompt asks for `description` last so these finish while it is still streaming
+SPECULATION_FIELDS = ('name', 'category', 'features', 'data_structure', 'visualizations', 'interactions', 'layout')
+
+# Background threads for speculative code generation, shared by all sessions
+_pipeline_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="codegen")
+
+# Prompts are module constants with source indentation stripped, and every
+# user prompt starts with fixed text, so requests share the longest possible
+# prefix for provider-side prompt caching.
+SPECIFICATION_SYSTEM_PROMPT = """\
+You are an expert in creating productivity tools and Streamlit applications.
+Analyze the user's natural language description and create a detailed specification for a Streamlit-based productivity tool.
+
+Respond with a JSON object containing:
+{
+    "name": "Tool name",
+    "category": "planner|dashboard|tracker|other",
+    "features": ["list", "of", "key", "features"],
+    "data_structure": {
+        "fields": [
+            {"name": "field_name", "type": "string|number|date|boolean", "description": "field description"}
+        ]
+    },
+    "visualizations": [
+        {"type": "chart|table|metric|progress", "description": "what it shows"}
+    ],
+    "interactions": [
+        "list of user interactions like add, edit, delete, filter, etc."
+    ],
+    "layout": {
+        "columns": 1-3,
+        "sections": ["section1", "section2"]
+    },
+    "description": "Detailed description"
+}"""
+
+SPECIFICATION_USER_PREFIX = "Create a specification for this productivity tool: "
+
+CODE_SYSTEM_PROMPT = """\
+You are an expert Streamlit developer. Generate complete, functional Streamlit code based on the provided tool specification.
+
+IMPORTANT REQUIREMENTS:
+1. Use ONLY Streamlit's built-in components and styling
+2. Include proper session state management for data persistence
+3. Use pandas for data manipulation and plotly for visualizations
+4. Handle errors gracefully with try-catch blocks
+5. Provide clear user feedback for all actions
+6. Use st.columns() for layout organization
+7. Include data validation and input sanitization
+8. Add helpful tooltips and instructions for users
+9. Implement CRUD operations (Create, Read, Update, Delete) as needed
+10. Use datetime for date/time handling
+
+The code should be a complete function that can be executed within a Streamlit app.
+Start the function with 'def execute_tool():' and include all necessary imports at the top.
+
+Do NOT include any mock or sample data - use empty states with clear instructions for users to add their own data.
+
+DATA STORAGE:
+A `tool_table(name)` function is available as a global (do not import it). It returns a persistent,
+column-oriented table for this tool. Prefer it over lists of dicts in st.session_state:
+- table.append({"field": value, ...}) / table.extend(rows) add rows and return their row ids
+- table.update(row_id, field=value) and table.delete(row_id) change existing rows
+- table.frame() returns a cached pandas DataFrame indexed by row_id; do not rebuild DataFrames from lists
+- len(table), table.get(row_id) and table.column("field") read data without building a DataFrame
+- table.create_index("field") (ordered=True for dates/numbers) enables table.lookup("field", value),
+  table.between("field", low, high) and table.counts("field"); use them to filter large tables
+
+CACHING:
+A `tool_cache` decorator is also available as a global. Wrap functions that build derived DataFrames
+(groupby, pivot, resample) or plotly figures in it, so reruns that change nothing reuse the result:
+    @tool_cache
+    def completion_chart(frame, period):
+        ...
+        return px.line(...)
+- results are reused until an argument changes or a tool_table of this tool is written
+- pass everything the result depends on (frames, filters, session_state data) as arguments
+- never mutate a returned value; do not wrap functions that call st.* widgets or write data
+
+COMPONENTS:
+A `ui` object is also available as a global. Use it instead of hand-written forms, per-row widget
+loops and chart code; it keeps reruns fast however many rows a table holds:
+    tasks = tool_table("tasks")
+    ui.add_form(tasks, {"title": "text", "status": ["To Do", "Done"], "due": "date", "hours": "number"},
+                key="add_task", required=["title"])
+    rows = ui.filter_bar(tasks, ["status"], key="task_filters")
+    ui.table_editor(tasks, rows, columns=["title", "status", "due", "hours"], key="task_list",
+                    column_config={"status": st.column_config.SelectboxColumn(options=["To Do", "Done"])})
+    ui.chart("bar", tasks, x="status", agg="count", title="Tasks by status")
+- add_form field kinds: text, textarea, number, int, date, checkbox, or a list of options
+- table_editor shows one page of rows, saves edited cells and deletes ticked rows itself
+- chart kinds: line, bar, scatter, area, pie; data is a tool_table or DataFrame; agg is count, sum or mean"""
+
+CODE_USER_PREFIX = (
+    "Generate production-ready Streamlit code that handles all specified features and interactions "
+    "for this tool specification (JSON):\n"
+)
+
+IMPROVE_SYSTEM_PROMPT = """\
+You are an expert Streamlit developer. Improve the provided Streamlit code based on the user's improvement request.
+
+Maintain the same code structure and ensure compatibility with the existing session state.
+Only modify what's necessary for the improvement.
+Keep all error handling and validation in place."""
+
+PATCH_REPLY_FORMAT = """\
+Reply with ONLY a unified diff against the current code (no explanation, no full file):
+- one `@@ -<old line>,<count> +<new line>,<count> @@` header per hunk, using the line numbers shown
+- context lines start with a space, removed lines with `-`, added lines with `+`
+- copy context and removed lines exactly as shown, without the `NNNN| ` line number prefix
+- include 2-3 lines of unchanged context around every change"""
+
+IMPROVE_PATCH_SYSTEM_PROMPT = IMPROVE_SYSTEM_PROMPT + "\n\n" + PATCH_REPLY_FORMAT
+
+REPAIR_SYSTEM_PROMPT = """\
+You are an expert Streamlit developer. A generated Streamlit tool failed validation or raised an error
+on its first run. Fix the cause of the reported error and change nothing else.
+
+""" + PATCH_REPLY_FORMAT
+
+# Spec fields left out of the code prompt, in this order, when it exceeds its token budget
+OPTIONAL_SPEC_FIELDS = ('layout', 'interactions', 'description', 'features')
+
+
+def compact_json(value):
+    """Serialize without indentation or spaces after separators"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+def is_json_object(text):
+    """Whether a specification reply parses to a JSON object"""
+    try:
+        return isinstance(json.loads(text), dict)
+    except ValueError:
+        return False
+
+def is_valid_code(text):
+    """Whether a code reply passes validation once its markdown fences are stripped"""
+    return analyze_code(strip_code_fences(text)).valid
+
+class _SpeculationCancelled(Exception):
+    """Raised inside a discarded speculative code call to stop reading its stream"""
+
+def applies_to(tool_code):
+    """Check for diff replies: the diff applies to `tool_code` and the result validates"""
+    
+    def accept(diff):
+        try:
+            return analyze_code(apply_unified_diff(tool_code, diff)).valid
+        except PatchError:
+            return False
+    
+    return accept
 
 class AIGenerator:
     def __init__(self):
@@ -10,132 +176,572 @@ class AIGenerator:
             st.error("⚠️ OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
             st.stop()
         
-        self.client = OpenAI(api_key=self.api_key)
+        # One client, connection pool and rate limit shared by every session
+        self.llm = get_llm_client(self.api_key)
         
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
         # do not change this unless explicitly requested by the user
         self.model = "gpt-4o"
+        
+        # Shared on-disk cache of completions; None when disabled
+        self.response_cache = get_response_cache()
+        
+        # Timing and token usage of the most recent call per stage
+        self.last_stats = {}
+        self.last_pipeline_report = None
+        self.last_improvement = None
     
-    def generate_tool_specification(self, user_description):
-        """Generate a structured specification for the productivity tool"""
-        
-        system_prompt = """You are an expert in creating productivity tools and Streamlit applications. 
-        Analyze the user's natural language description and create a detailed specification for a Streamlit-based productivity tool.
-        
-        Respond with a JSON object containing:
-        {
-            "name": "Tool name",
-            "category": "planner|dashboard|tracker|other",
-            "description": "Detailed description",
-            "features": ["list", "of", "key", "features"],
-            "data_structure": {
-                "fields": [
-                    {"name": "field_name", "type": "string|number|date|boolean", "description": "field description"}
-                ]
-            },
-            "visualizations": [
-                {"type": "chart|table|metric|progress", "description": "what it shows"}
-            ],
-            "interactions": [
-                "list of user interactions like add, edit, delete, filter, etc."
-            ],
-            "layout": {
-                "columns": 1-3,
-                "sections": ["section1", "section2"]
-            }
-        }"""
+    def _complete(self, stage, system_prompt, user_prompt, tokens_saved=0, accept=None, fresh=False, **params):
+        """Run a chat completion, serving repeats from the response cache.
         
-        try:
-            response = self.client.chat.completions.create(
+        Identical requests already in flight in another session are joined
+        instead of sent again. `tokens_saved` is how many input tokens prompt
+        compaction removed, for reporting. A reply is cached only if
+        `accept(content)` is true, so unusable replies are asked for again
+        next time; `fresh` skips the cache lookup.
+        """
+        
+        with span(f"llm.{stage}", model=self.model) as trace:
+            started = time.perf_counter()
+            input_tokens = check_budget(stage, system_prompt, user_prompt)
+            trace.set(input_tokens=input_tokens)
+            cache_key = make_cache_key(self.model, system_prompt, user_prompt, **params)
+            if self.response_cache is not None and not fresh:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    trace.set(cached=True)
+                    self._record_stats(stage, started, input_tokens, tokens_saved, None, cached=True)
+                    return cached
+            
+            response, coalesced = get_single_flight().do(cache_key, lambda: self.llm.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Create a specification for this productivity tool: {user_description}"}
+                    {"role": "user", "content": user_prompt}
                 ],
+                **params
+            ))
+            content = response.choices[0].message.content
+            trace.set(cached=False, coalesced=coalesced)
+            if coalesced:
+                # The session that sent the request accounts for its tokens and caches it
+                self._record_stats(stage, started, input_tokens, tokens_saved, None, coalesced=True)
+                return content
+            
+            trace.set_usage(response.usage)
+            trace.set(prompt_tokens_saved=tokens_saved)
+            self._record_stats(stage, started, input_tokens, tokens_saved, None, usage=response.usage)
+            
+            if self.response_cache is not None and self._cacheable(content, accept):
+                self.response_cache.set(cache_key, content, stage=stage)
+            
+            return content
+    
+    def _stream(self, stage, system_prompt, user_prompt, on_delta=None, tokens_saved=0, accept=None, fresh=False,
+                stats_into=None, **params):
+        """Run a streaming chat completion, calling on_delta with the text so far.
+        
+        Identical streams already in flight in another session are joined:
+        one response is read and its text fanned out to every caller's
+        on_delta, and it is closed once no caller is listening. `accept` and
+        `fresh` work as in _complete(). Stats go to `stats_into` instead of
+        last_stats when given, for calls made off the script thread.
+        """
+        
+        with span(f"llm.{stage}", model=self.model, stream=True) as trace:
+            started = time.perf_counter()
+            input_tokens = check_budget(stage, system_prompt, user_prompt)
+            trace.set(input_tokens=input_tokens)
+            cache_key = make_cache_key(self.model, system_prompt, user_prompt, **params)
+            if self.response_cache is not None:
+                cached = None if fresh else self.response_cache.get(cache_key)
+                if cached is not None:
+                    if on_delta:
+                        on_delta(cached)
+                    trace.set(cached=True)
+                    self._record_stats(
+                        stage, started, input_tokens, tokens_saved, time.perf_counter(), cached=True, into=stats_into
+                    )
+                    return cached
+            
+            first_token_at = None
+            
+            def handle_update(text):
+                nonlocal first_token_at
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                if on_delta:
+                    on_delta(text)
+            
+            (content, usage, chunk_count), coalesced = get_single_flight().stream(
+                cache_key, lambda publish: self._read_stream(publish, system_prompt, user_prompt, params), handle_update
+            )
+            trace.set(cached=False, coalesced=coalesced)
+            if first_token_at is not None:
+                trace.set(time_to_first_token=first_token_at - started)
+            if coalesced:
+                # The session that opened the stream accounts for its tokens and caches it
+                self._record_stats(
+                    stage, started, input_tokens, tokens_saved, first_token_at, coalesced=True, into=stats_into
+                )
+                return content
+            
+            trace.set_usage(usage)
+            trace.set(prompt_tokens_saved=tokens_saved)
+            self._record_stats(
+                stage, started, input_tokens, tokens_saved, first_token_at, usage=usage, chunk_count=chunk_count,
+                into=stats_into
+            )
+            
+            if self.response_cache is not None and self._cacheable(content, accept):
+                self.response_cache.set(cache_key, content, stage=stage)
+            
+            return content
+    
+    def _read_stream(self, publish, system_prompt, user_prompt, params):
+        """Read one streamed completion, publishing the text so far; return (content, usage, chunk_count)"""
+        
+        stream = self.llm.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            stream=True,
+            stream_options={"include_usage": True},
+            **params
+        )
+        
+        parts = []
+        usage = None
+        chunk_count = 0
+        try:
+            for chunk in stream:
+                # The final chunk carries usage and no choices
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                
+                parts.append(delta)
+                chunk_count += 1
+                publish("".join(parts))
+        except BaseException:
+            # Stop the response and give its connection back instead of leaving it half read
+            if hasattr(stream, 'close'):
+                stream.close()
+            raise
+        
+        return "".join(parts), usage, chunk_count
+    
+    @staticmethod
+    def _cacheable(content, accept):
+        return bool(content) and (accept is None or accept(content))
+    
+    def _record_stats(self, stage, started, input_tokens, tokens_saved, first_token_at,
+                      usage=None, cached=False, chunk_count=0, coalesced=False, compiled=False, into=None):
+        """Remember timing and token usage of the latest call for each stage, in `into` or last_stats"""
+        
+        finished = time.perf_counter()
+        stats = {
+            'duration': finished - started,
+            'time_to_first_token': first_token_at - started if first_token_at else None,
+            'cached': cached,
+            'coalesced': coalesced,
+            'compiled': compiled,
+            'input_tokens': input_tokens,
+            'prompt_tokens_saved': tokens_saved,
+            'prompt_tokens': None,
+            'completion_tokens': None,
+            'total_tokens': None
+        }
+        if usage is not None:
+            stats['prompt_tokens'] = usage.prompt_tokens
+            stats['completion_tokens'] = usage.completion_tokens
+            stats['total_tokens'] = usage.total_tokens
+        elif chunk_count:
+            # Streams without a usage chunk emit roughly one token per delta
+            stats['completion_tokens'] = chunk_count
+        
+        (self.last_stats if into is None else into)[stage] = stats
+    
+    def _specification_prompts(self, user_description):
+        """Return (system, user, tokens_saved); the variable description comes last"""
+        user_prompt = SPECIFICATION_USER_PREFIX + user_description
+        return SPECIFICATION_SYSTEM_PROMPT, user_prompt, 0
+    
+    def _code_prompts(self, tool_spec):
+        """Return (system, user, tokens_saved) with the spec serialized compactly at the end.
+        
+        Optional spec fields are dropped if the prompt would not fit the code
+        stage's input budget.
+        """
+        spec = dict(tool_spec)
+        spec_json = compact_json(spec)
+        budget = stage_budget("code")
+        fixed_tokens = count_tokens(CODE_SYSTEM_PROMPT) + count_tokens(CODE_USER_PREFIX)
+        for field in OPTIONAL_SPEC_FIELDS:
+            if budget is None or fixed_tokens + count_tokens(spec_json) <= budget:
+                break
+            if spec.pop(field, None) is not None:
+                spec_json = compact_json(spec)
+        
+        tokens_saved = count_tokens(json.dumps(tool_spec, indent=2)) - count_tokens(spec_json)
+        return CODE_SYSTEM_PROMPT, CODE_USER_PREFIX + spec_json, tokens_saved
+    
+    def _compile_locally(self, tool_spec):
+        """Build code from the spec without the LLM; None when the spec needs the LLM"""
+        
+        if not config.SPEC_COMPILER_ENABLED:
+            return None
+        
+        with span("spec_compile") as trace:
+            started = time.perf_counter()
+            code, reason = get_spec_compiler().compile(tool_spec)
+            if code is None:
+                trace.set_outcome("fallback")
+                trace.set(reason=reason)
+                return None
+            self._record_stats("code", started, 0, 0, None, compiled=True)
+            return code
+    
+    def generate_tool_specification(self, user_description, fresh=False):
+        """Generate a structured specification for the productivity tool.
+        
+        `fresh` asks the model again instead of reusing a cached reply.
+        """
+        
+        system_prompt, user_prompt, tokens_saved = self._specification_prompts(user_description)
+        
+        try:
+            content = self._complete(
+                "specification",
+                system_prompt,
+                user_prompt,
+                tokens_saved=tokens_saved,
+                accept=is_json_object,
+                fresh=fresh,
                 response_format={"type": "json_object"}
             )
             
-            return json.loads(response.choices[0].message.content)
+            return json.loads(content)
             
         except Exception as e:
             st.error(f"Error generating tool specification: {str(e)}")
             return None
     
-    def generate_streamlit_code(self, tool_spec):
-        """Generate Streamlit code based on the tool specification"""
-        
-        system_prompt = """You are an expert Streamlit developer. Generate complete, functional Streamlit code based on the provided tool specification.
-
-        IMPORTANT REQUIREMENTS:
-        1. Use ONLY Streamlit's built-in components and styling
-        2. Include proper session state management for data persistence
-        3. Use pandas for data manipulation and plotly for visualizations
-        4. Handle errors gracefully with try-catch blocks
-        5. Provide clear user feedback for all actions
-        6. Use st.columns() for layout organization
-        7. Include data validation and input sanitization
-        8. Add helpful tooltips and instructions for users
-        9. Implement CRUD operations (Create, Read, Update, Delete) as needed
-        10. Use datetime for date/time handling
+    def stream_tool_specification(self, user_description, on_partial=None, fresh=False):
+        """Stream the specification, calling on_partial with each partially parsed spec"""
         
-        The code should be a complete function that can be executed within a Streamlit app.
-        Start the function with 'def execute_tool():' and include all necessary imports at the top.
+        system_prompt, user_prompt, tokens_saved = self._specification_prompts(user_description)
         
-        Do NOT include any mock or sample data - use empty states with clear instructions for users to add their own data."""
+        def handle_delta(text):
+            partial = parse_partial_json(text)
+            if on_partial and isinstance(partial, dict):
+                on_partial(partial)
         
-        user_prompt = f"""Generate Streamlit code for this tool specification:
+        try:
+            content = self._stream(
+                "specification",
+                system_prompt,
+                user_prompt,
+                on_delta=handle_delta,
+                tokens_saved=tokens_saved,
+                accept=is_json_object,
+                fresh=fresh,
+                response_format={"type": "json_object"}
+            )
+            
+            return json.loads(content)
+            
+        except Exception as e:
+            st.error(f"Error generating tool specification: {str(e)}")
+            return None
+    
+    def generate_streamlit_code(self, tool_spec, fresh=False):
+        """Generate Streamlit code based on the tool specification"""
         
-        {json.dumps(tool_spec, indent=2)}
+        compiled = self._compile_locally(tool_spec)
+        if compiled is not None:
+            return compiled
         
-        The code should be production-ready and handle all specified features and interactions."""
+        system_prompt, user_prompt, tokens_saved = self._code_prompts(tool_spec)
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=3000
+            return strip_code_fences(
+                self._complete(
+                    "code", system_prompt, user_prompt, tokens_saved=tokens_saved, accept=is_valid_code, fresh=fresh,
+                    max_tokens=3000
+                )
             )
             
-            return response.choices[0].message.content
+        except Exception as e:
+            st.error(f"Error generating Streamlit code: {str(e)}")
+            return None
+    
+    def stream_streamlit_code(self, tool_spec, on_delta=None, fresh=False):
+        """Stream the Streamlit code, calling on_delta with the code received so far"""
+        
+        compiled = self._compile_locally(tool_spec)
+        if compiled is not None:
+            if on_delta:
+                on_delta(compiled)
+            return compiled
+        
+        system_prompt, user_prompt, tokens_saved = self._code_prompts(tool_spec)
+        
+        def handle_delta(text):
+            if on_delta:
+                on_delta(strip_code_fences(text))
+        
+        try:
+            return strip_code_fences(self._stream(
+                "code", system_prompt, user_prompt, on_delta=handle_delta, tokens_saved=tokens_saved,
+                accept=is_valid_code, fresh=fresh, max_tokens=3000
+            ))
             
         except Exception as e:
             st.error(f"Error generating Streamlit code: {str(e)}")
             return None
     
+    def generate_pipelined(self, user_description, on_partial=None, on_code_delta=None, poll_interval=0.1,
+                           fresh=False):
+        """Generate spec and code with overlapped LLM calls.
+        
+        Code generation starts speculatively as soon as SPECULATION_FIELDS have
+        fully streamed in, while the description is still arriving. If the
+        final spec agrees on every field the speculative call saw the code is
+        kept, otherwise its stream is closed and the code is regenerated from
+        the final spec. Specs the local compiler can handle skip the code call
+        entirely. `fresh` skips cached replies. Returns (tool_spec, tool_code).
+        """
+        
+        started = time.perf_counter()
+        system_prompt, user_prompt, tokens_saved = self._specification_prompts(user_description)
+        speculation = {}
+        
+        def handle_delta(text):
+            partial = parse_partial_json(text)
+            if not isinstance(partial, dict):
+                return
+            if on_partial:
+                on_partial(partial)
+            if 'future' in speculation or 'skipped' in speculation:
+                return
+            
+            # Values stream in key order, so every key but the last is complete
+            completed = list(partial)[:-1]
+            if all(field in completed for field in SPECULATION_FIELDS):
+                completed_spec = {key: partial[key] for key in completed}
+                if self._may_compile(completed_spec):
+                    # The compiler will most likely write the code, so no code call is paid for
+                    speculation['skipped'] = True
+                    return
+                speculation['spec'] = completed_spec
+                speculation['progress'] = {'text': ''}
+                speculation['future'] = _pipeline_executor.submit(
+                    self._code_worker, speculation['spec'], speculation['progress'], fresh
+                )
+        
+        try:
+            content = self._stream(
+                "specification",
+                system_prompt,
+                user_prompt,
+                on_delta=handle_delta,
+                tokens_saved=tokens_saved,
+                accept=is_json_object,
+                fresh=fresh,
+                response_format={"type": "json_object"}
+            )
+            tool_spec = json.loads(content)
+        except Exception as e:
+            self._cancel_speculation(speculation)
+            st.error(f"Error generating tool specification: {str(e)}")
+            return None, None
+        
+        tool_code = self._compile_locally(tool_spec)
+        if tool_code is not None:
+            self._cancel_speculation(speculation)
+            outcome = 'compiled'
+        else:
+            tool_code, outcome = self._await_code(tool_spec, speculation, on_code_delta, poll_interval, fresh)
+            if tool_code is None:
+                return tool_spec, None
+        
+        pipelined = time.perf_counter() - started
+        sequential = self.last_stats['specification']['duration'] + self.last_stats['code']['duration']
+        self.last_pipeline_report = {
+            'speculation': outcome,
+            'pipelined_seconds': pipelined,
+            'sequential_seconds': sequential,
+            'saved_seconds': sequential - pipelined
+        }
+        
+        return tool_spec, tool_code
+    
+    def _may_compile(self, spec):
+        """Whether the code-shaping fields streamed so far compile without the LLM"""
+        
+        if not config.SPEC_COMPILER_ENABLED:
+            return False
+        try:
+            compile_spec(spec)
+        except UnsupportedSpec:
+            return False
+        return True
+    
+    def _await_code(self, tool_spec, speculation, on_code_delta, poll_interval, fresh=False):
+        """Use or replace the speculative code call; return (tool_code, speculation outcome)"""
+        
+        future = speculation.get('future')
+        progress = speculation.get('progress')
+        seen = speculation.get('spec', {})
+        if future and all(tool_spec.get(f) == seen.get(f) for f in set(SPECULATION_FIELDS) | set(seen)):
+            outcome = 'kept'
+        else:
+            outcome = 'discarded' if future else 'not started'
+            self._cancel_speculation(speculation)
+            progress = {'text': ''}
+            future = _pipeline_executor.submit(self._code_worker, tool_spec, progress, fresh)
+        
+        try:
+            while True:
+                try:
+                    tool_code, stats = future.result(timeout=poll_interval)
+                    self.last_stats['code'] = stats
+                    return tool_code, outcome
+                except FutureTimeoutError:
+                    if on_code_delta and progress['text']:
+                        on_code_delta(progress['text'])
+        except Exception as e:
+            st.error(f"Error generating Streamlit code: {str(e)}")
+            return None, outcome
+    
+    @staticmethod
+    def _cancel_speculation(speculation):
+        """Stop a speculative code call that will not be used, closing its stream if it has one"""
+        
+        future = speculation.get('future')
+        if future is not None and not future.cancel():
+            speculation['progress']['cancelled'] = True
+    
+    def _code_worker(self, tool_spec, progress, fresh=False):
+        """Generate code off the script thread, publishing partial text into `progress`.
+        
+        Returns (tool_code, stats); the caller records the stats on its own
+        thread. Setting progress['cancelled'] ends the call at the next delta.
+        """
+        
+        system_prompt, user_prompt, tokens_saved = self._code_prompts(tool_spec)
+        stats = {}
+        
+        def handle_delta(text):
+            if progress.get('cancelled'):
+                raise _SpeculationCancelled()
+            progress['text'] = strip_code_fences(text)
+        
+        tool_code = strip_code_fences(self._stream(
+            "code", system_prompt, user_prompt, on_delta=handle_delta, tokens_saved=tokens_saved,
+            accept=is_valid_code, fresh=fresh, stats_into=stats, max_tokens=3000
+        ))
+        return tool_code, stats['code']
+    
     def improve_tool(self, tool_code, improvement_request):
-        """Improve existing tool code based on user feedback"""
+        """Improve existing tool code based on user feedback.
+        
+        Asks for a unified diff against an outline and the relevant parts of
+        the code, then applies and validates it locally. Falls back to
+        regenerating the whole tool when the patch does not apply or breaks
+        validation. `last_improvement` describes what happened.
+        """
+        
+        started = time.perf_counter()
+        try:
+            improved, patch_error = self._improve_with_patch(tool_code, improvement_request)
+            mode = 'patch'
+            if improved is None:
+                mode = 'full'
+                improved = strip_code_fences(self._complete(
+                    "improve_full", *self._improve_full_prompts(tool_code, improvement_request),
+                    accept=is_valid_code, max_tokens=3000
+                ))
+        except Exception as e:
+            st.error(f"Error improving tool: {str(e)}")
+            return None
+        
+        self.last_improvement = {
+            'mode': mode,
+            'fallback_reason': patch_error if mode == 'full' else None,
+            'duration': time.perf_counter() - started,
+            **diff_stats(tool_code, improved or "")
+        }
+        return improved
+    
+    def _improve_with_patch(self, tool_code, improvement_request):
+        """Return (patched_code, None), or (None, reason) when the diff is unusable"""
+        
+        try:
+            context, blocks = build_edit_context(tool_code, improvement_request)
+        except SyntaxError:
+            return None, "current code does not parse"
         
-        system_prompt = """You are an expert Streamlit developer. Improve the provided Streamlit code based on the user's improvement request.
+        scope = "the full code" if blocks is None else "an outline of the tool and the code most relevant to the request"
+        user_prompt = f"CURRENT CODE ({scope}):\n{context}\n\nIMPROVEMENT REQUEST:\n{improvement_request}"
+        tokens_saved = count_tokens(tool_code) - count_tokens(context)
         
-        Maintain the same code structure and ensure compatibility with the existing session state.
-        Only modify what's necessary for the improvement.
-        Keep all error handling and validation in place."""
+        try:
+            diff = self._complete(
+                "improve", IMPROVE_PATCH_SYSTEM_PROMPT, user_prompt, tokens_saved=tokens_saved,
+                accept=applies_to(tool_code), max_tokens=2000
+            )
+        except PromptBudgetExceeded as e:
+            # The full-rewrite prompt has its own, larger budget
+            return None, str(e)
+        if not diff:
+            return None, "empty response"
         
-        user_prompt = f"""Improve this Streamlit code:
+        try:
+            patched = apply_unified_diff(tool_code, diff)
+        except PatchError as e:
+            return None, str(e)
         
-        CURRENT CODE:
-        {tool_code}
+        result = analyze_code(patched)
+        if not result.valid:
+            return None, f"patched code failed validation: {result.message}"
+        return patched, None
+    
+    def repair_code(self, tool_code, error, traceback_text=None):
+        """Ask for a targeted fix of one error in generated code; return the patched code, or None.
         
-        IMPROVEMENT REQUEST:
-        {improvement_request}
+        Only the error, the end of its traceback and the code around the
+        failing line are sent, and the reply is a diff applied locally. Errors
+        without a line get an outline and the blocks relevant to them.
+        """
         
-        Return the complete improved code."""
+        scope, context = repair_context(tool_code, error, traceback_text)
+        parts = [f"ERROR:\n{error}"]
+        if traceback_text:
+            parts.append(f"TRACEBACK (innermost frames):\n{tail_of_traceback(traceback_text)}")
+        parts.append(f"CURRENT CODE ({scope}):\n{context}")
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=3000
+            diff = self._complete(
+                "repair", REPAIR_SYSTEM_PROMPT, "\n\n".join(parts), accept=applies_to(tool_code), max_tokens=1000
             )
-            
-            return response.choices[0].message.content
-            
+            return apply_unified_diff(tool_code, diff) if diff else None
+        except PatchError:
+            return None
         except Exception as e:
-            st.error(f"Error improving tool: {str(e)}")
+            st.error(f"Error repairing generated code: {str(e)}")
             return None
+    
+    def _improve_full_prompts(self, tool_code, improvement_request):
+        user_prompt = (
+            f"Improve this Streamlit code:\n\nCURRENT CODE:\n{tool_code}\n\n"
+            f"IMPROVEMENT REQUEST:\n{improvement_request}\n\nReturn the complete improved code."
+        )
+        return IMPROVE_SYSTEM_PROMPT, user_prompt
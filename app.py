@@ -1,18 +1,30 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import json
+from datetime import datetime
+import time
+import config
+from warmup import start_warmup
 from ai_generator import AIGenerator
+from code_cache import code_digest
+from code_patch import unified_diff
+from code_repair import get_code_repairer
+from code_validator import analyze_code
+from perf_linter import lint_performance
+from preflight import get_preflight_pool
+from singleflight import get_single_flight
+from spec_compiler import get_spec_compiler
 from templates import get_template_library, get_template_code
+from template_registry import get_template_registry
+from telemetry import get_telemetry, span
+from template_matcher import get_template_matcher
+from tool_cache import get_tool_cache
 from tool_executor import ToolExecutor
-from utils import sanitize_input, validate_generated_code
+from tool_store import get_tool_store
+from utils import get_owner_id, is_admin, sanitize_input, validate_generated_code
 
+# Import heavy libraries and start shared resources in the background
+start_warmup()
     
 # Initialize session state
-if 'generated_tools' not in st.session_state:
-    st.session_state.generated_tools = {}
 if 'current_tool' not in st.session_state:
     st.session_state.current_tool = None
 if 'ai_generator' not in st.session_state:
@@ -33,10 +45,11 @@ def main():
     # Sidebar for navigation and templates
     with st.sidebar:
         st.header("Navigation")
-        page = st.selectbox(
-            "Choose a page:",
-            ["Generate New Tool", "My Generated Tools", "Template Library"]
-        )
+        pages = ["Generate New Tool", "My Generated Tools", "Template Library"]
+        if is_admin():
+            # Metrics cover every session in the process, so only admins see them
+            pages.append("Metrics")
+        page = st.selectbox("Choose a page:", pages)
         
         if page == "Template Library":
             st.header("📚 Template Library")
@@ -55,6 +68,8 @@ def main():
         my_tools_page()
     elif page == "Template Library":
         template_library_page()
+    elif page == "Metrics" and is_admin():
+        metrics_page()
 
 def generate_tool_page():
     st.header("🎯 Generate New Tool")
@@ -81,6 +96,19 @@ def generate_tool_page():
             placeholder="My Awesome Tool"
         )
         
+        generation_mode = st.radio(
+            "Generation mode:",
+            ["Streaming", "Pipelined", "Sequential"],
+            horizontal=True,
+            help="Streaming shows the specification and code while the AI is still writing them. "
+                 "Pipelined also starts writing code before the specification is finished."
+        )
+        
+        force_fresh = st.checkbox(
+            "Force fresh generation",
+            help="Always call the AI, even when the description matches a built-in template or an earlier request"
+        )
+        
         generate_btn = st.button("🚀 Generate Tool", type="primary")
     
     with col2:
@@ -94,16 +122,34 @@ def generate_tool_page():
     
     # Generation process
     if generate_btn and user_input.strip():
-        with st.spinner("🤖 AI is analyzing your request..."):
+        with st.spinner("🤖 AI is analyzing your request..."), span("generate", mode=generation_mode) as generate_trace:
             try:
                 # Sanitize input
                 clean_input = sanitize_input(user_input)
                 
+                # Serve near-verbatim template requests locally
+                generation_started = time.perf_counter()
+                template_match = None if force_fresh else get_template_matcher().match(clean_input)
+                generate_trace.set(template_match=template_match.name if template_match else None)
+                
                 # Generate tool specification
-                tool_spec = st.session_state.ai_generator.generate_tool_specification(clean_input)
+                if template_match:
+                    tool_spec, tool_code = template_match.spec, template_match.code
+                    st.success(
+                        f"⚡ Matched the '{template_match.name}' template "
+                        f"(similarity {template_match.score:.2f}) - served instantly without an API call"
+                    )
+                elif generation_mode == "Pipelined":
+                    tool_spec, tool_code = stream_pipelined(clean_input, fresh=force_fresh)
+                elif generation_mode == "Streaming":
+                    tool_spec = stream_specification(clean_input, fresh=force_fresh)
+                else:
+                    tool_spec = st.session_state.ai_generator.generate_tool_specification(clean_input, fresh=force_fresh)
                 
                 if tool_spec:
                     st.success("✅ Tool specification generated!")
+                    if not template_match:
+                        show_stage_stats("specification")
                     
                     # Display specification
                     with st.expander("View Tool Specification", expanded=True):
@@ -111,23 +157,38 @@ def generate_tool_page():
                     
                     # Generate Streamlit code
                     with st.spinner("🔧 Generating Streamlit code..."):
-                        tool_code = st.session_state.ai_generator.generate_streamlit_code(tool_spec)
+                        if template_match:
+                            # The template's code is already in hand
+                            pass
+                        elif generation_mode == "Pipelined":
+                            show_pipeline_report()
+                        elif generation_mode == "Streaming":
+                            tool_code = stream_code(tool_spec, fresh=force_fresh)
+                        else:
+                            tool_code = st.session_state.ai_generator.generate_streamlit_code(tool_spec, fresh=force_fresh)
+                        
+                        if not template_match and tool_code:
+                            get_template_matcher().record_generation(time.perf_counter() - generation_started)
+                            tool_code = repair_generated_code(tool_code)
                         
-                        if tool_code and validate_generated_code(tool_code):
+                        # Bundled template code is trusted and skips validation
+                        if tool_code and (template_match or validate_generated_code(tool_code)):
                             st.success("✅ Code generated successfully!")
+                            if not template_match:
+                                show_stage_stats("code")
+                                if config.PERF_LINT_REGENERATE:
+                                    tool_code = fix_performance(tool_code)
                             
                             # Save generated tool
-                            tool_id = f"tool_{len(st.session_state.generated_tools) + 1}"
                             final_name = tool_name.strip() if tool_name.strip() else tool_spec.get('name', 'Unnamed Tool')
                             
-                            st.session_state.generated_tools[tool_id] = {
-                                'name': final_name,
-                                'description': clean_input,
-                                'specification': tool_spec,
-                                'code': tool_code,
-                                'created_at': datetime.now().isoformat(),
-                                'data': {}
-                            }
+                            tool_id = get_tool_store().create_tool(
+                                get_owner_id(),
+                                final_name,
+                                clean_input,
+                                tool_spec,
+                                tool_code
+                            )
                             
                             st.session_state.current_tool = tool_id
 
@@ -137,6 +198,7 @@ def generate_tool_page():
                             # Code preview section
                             st.subheader("🧾 Preview of Generated Code")
                             st.code(tool_code, language='python')
+                            show_perf_report(lint_performance(tool_code))
 
                             # Optional: Provide downloadable version
                             st.download_button(
@@ -149,55 +211,283 @@ def generate_tool_page():
                             
                             # Preview section
                             st.header("🔍 Tool Preview")
-                            preview_tool(tool_id)
+                            if preflight_tool(tool_code):
+                                # A rerun would leave this page, so repairs are offered from My Tools
+                                preview_tool(tool_id, offer_repair=False)
                             
                         else:
+                            generate_trace.set_outcome("invalid_code")
                             st.error("❌ Failed to generate valid code. Please try again with a different description.")
                 else:
+                    generate_trace.set_outcome("no_specification")
                     st.error("❌ Failed to generate tool specification. Please try again.")
                     
             except Exception as e:
+                generate_trace.set_outcome("error")
                 st.error(f"❌ An error occurred: {str(e)}")
     
     elif generate_btn:
         st.warning("⚠️ Please enter a description of the tool you want to create.")
+    
+    show_template_match_stats()
+
+def show_template_match_stats():
+    """Show how many requests were served from the template library"""
+    stats = get_template_matcher().stats()
+    if not stats['requests']:
+        return
+    
+    st.caption(
+        f"⚡ {stats['local_fraction']:.0%} of {stats['requests']} requests served from the template library"
+        f" · ~{stats['saved_seconds']:.0f}s of generation time saved"
+    )
+
+def throttled(render, interval=0.1):
+    """Wrap a render callback so streamed updates repaint at most every `interval` seconds"""
+    last_render = [0.0]
+    
+    def callback(value):
+        now = time.monotonic()
+        if now - last_render[0] >= interval:
+            last_render[0] = now
+            render(value)
+    
+    return callback
+
+def stream_specification(clean_input, fresh=False):
+    """Generate the specification, showing the partially parsed JSON as it arrives"""
+    placeholder = st.empty()
+    tool_spec = st.session_state.ai_generator.stream_tool_specification(
+        clean_input,
+        on_partial=throttled(placeholder.json),
+        fresh=fresh
+    )
+    placeholder.empty()
+    return tool_spec
+
+def stream_code(tool_spec, fresh=False):
+    """Generate the tool code, showing it in a live code preview as it arrives"""
+    placeholder = st.empty()
+    tool_code = st.session_state.ai_generator.stream_streamlit_code(
+        tool_spec,
+        on_delta=throttled(lambda code: placeholder.code(code, language='python')),
+        fresh=fresh
+    )
+    placeholder.empty()
+    return tool_code
+
+def stream_pipelined(clean_input, fresh=False):
+    """Generate spec and code with overlapped calls, showing both as they arrive"""
+    spec_placeholder = st.empty()
+    code_placeholder = st.empty()
+    tool_spec, tool_code = st.session_state.ai_generator.generate_pipelined(
+        clean_input,
+        on_partial=throttled(spec_placeholder.json),
+        on_code_delta=lambda code: code_placeholder.code(code, language='python'),
+        fresh=fresh
+    )
+    spec_placeholder.empty()
+    code_placeholder.empty()
+    return tool_spec, tool_code
+
+def show_pipeline_report():
+    """Show pipelined latency next to the equivalent sequential latency"""
+    report = st.session_state.ai_generator.last_pipeline_report
+    if not report:
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Pipelined", f"{report['pipelined_seconds']:.1f}s")
+    col2.metric("Sequential (same calls)", f"{report['sequential_seconds']:.1f}s")
+    col3.metric("Saved", f"{report['saved_seconds']:.1f}s")
+    if report['speculation'] == 'compiled':
+        st.caption("Speculative code generation: not needed, the code was compiled locally from the spec")
+    else:
+        st.caption(f"Speculative code generation: {report['speculation']}")
+
+def show_stage_stats(stage):
+    """Show latency and token usage of the latest call for a generation stage"""
+    stats = st.session_state.ai_generator.last_stats.get(stage)
+    if not stats:
+        return
+    
+    parts = []
+    if stats.get('compiled'):
+        parts.append("compiled locally from the spec, no LLM call")
+    if stats['cached']:
+        parts.append("served from cache")
+    if stats.get('coalesced'):
+        parts.append("shared with an identical request in flight")
+    if stats['time_to_first_token'] is not None:
+        parts.append(f"first token after {stats['time_to_first_token']:.2f}s")
+    parts.append(f"{stats['duration']:.2f}s total")
+    if stats['total_tokens']:
+        parts.append(f"{stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens")
+    elif stats['completion_tokens']:
+        parts.append(f"~{stats['completion_tokens']} completion tokens")
+    if stats.get('prompt_tokens_saved', 0) > 0 and not stats['cached'] and not stats['coalesced']:
+        parts.append(f"{stats['prompt_tokens_saved']} prompt tokens saved by compaction")
+    
+    st.caption(" · ".join(parts))
+
+def preflight_tool(tool_code):
+    """Smoke-run the tool in a warm worker process before rendering it in this session"""
+    if not config.PREFLIGHT_ENABLED:
+        return True
+    
+    with st.spinner("🧪 Test-running the tool..."), span("preflight") as trace:
+        result = run_preflight(tool_code)
+        if not result.ok:
+            trace.set_outcome("failed")
+    
+    if result.ok:
+        st.caption(f"🧪 Preflight run passed in {result.runtime * 1000:.0f} ms")
+        return True
+    
+    st.error(f"❌ The tool failed its preflight run: {result.error}")
+    if result.traceback:
+        with st.expander("🔍 Error Details"):
+            st.code(result.traceback, language='python')
+    return False
+
+def run_preflight(tool_code):
+    """Preflight result for this code, reusing the session's last run when the code has not changed"""
+    digest = code_digest(tool_code)
+    last = st.session_state.get('last_preflight')
+    if last is not None and last[0] == digest:
+        return last[1]
+    
+    result = get_preflight_pool().run(tool_code)
+    st.session_state.last_preflight = (digest, result)
+    return result
+
+def show_perf_report(report):
+    """Show the static performance score of generated code and what lowered it"""
+    if not report.findings:
+        st.caption("⚡ Performance lint: 100/100, no rerun hot spots found")
+        return
+    
+    with st.expander(f"⚡ Performance lint: {report.score}/100 · {len(report.findings)} finding(s)"):
+        for finding in report.findings:
+            st.markdown(f"- {finding}")
+
+def fix_performance(tool_code):
+    """Feed performance findings back to the model once; keep the new code only if it validates and scores higher"""
+    report = lint_performance(tool_code)
+    if report.score >= config.PERF_LINT_MIN_SCORE:
+        return tool_code
+    
+    with st.spinner("⚡ Fixing performance findings..."), span("perf_fix", score_before=report.score) as trace:
+        improved_code = st.session_state.ai_generator.improve_tool(tool_code, report.feedback())
+        improved = lint_performance(improved_code) if improved_code else None
+        if improved is None or not analyze_code(improved_code).valid or improved.score <= report.score:
+            trace.set_outcome("rejected")
+            return tool_code
+        trace.set(score_after=improved.score)
+    
+    st.info(f"⚡ Performance lint score raised from {report.score} to {improved.score}")
+    return improved_code
+
+def find_code_error(tool_code):
+    """(error, traceback) of the first problem in tool code, from validation then a preflight run; None if clean"""
+    result = analyze_code(tool_code)
+    if not result.valid:
+        return result.message, None
+    if config.PREFLIGHT_ENABLED:
+        run = run_preflight(tool_code)
+        if not run.ok:
+            return run.error, run.traceback
+    return None
+
+def repair_generated_code(tool_code, error=None):
+    """Fix generated code that fails validation or its first run with targeted repairs, not a full regeneration.
+    
+    `error` is an (error, traceback) the code already raised, e.g. while
+    rendering; repaired versions are then checked with validation and preflight.
+    """
+    if config.CODE_REPAIR_MAX_ATTEMPTS <= 0:
+        return tool_code
+    
+    known = [error] if error else []
+    
+    def find_error(code):
+        return known.pop() if known else find_code_error(code)
+    
+    with st.spinner("🩹 Checking the generated code..."):
+        repaired_code, attempts = get_code_repairer().repair(st.session_state.ai_generator, tool_code, find_error)
+    if repaired_code is None:
+        return tool_code
+    if attempts:
+        st.info(f"🩹 Fixed the generated code with {attempts} targeted repair(s) instead of regenerating it")
+    return repaired_code
 
-def preview_tool(tool_id):
-    """Preview the generated tool"""
-    if tool_id not in st.session_state.generated_tools:
+def preview_tool(tool_id, offer_repair=True):
+    """Preview the generated tool.
+    
+    When it raises while rendering, `offer_repair` shows a button that runs
+    repair_generated_code on the error; the repaired code is saved with the
+    old version kept for "Restore previous version".
+    """
+    store = get_tool_store()
+    owner = get_owner_id()
+    tool_code = store.get_code(owner, tool_id)
+    if tool_code is None:
         st.error("Tool not found!")
         return
     
-    tool = st.session_state.generated_tools[tool_id]
+    if st.session_state.pop('repaired_tool', None) == tool_id:
+        st.success("🩹 The tool was repaired. Use **Restore previous version** to undo the change.")
     
     try:
         # Execute the generated tool code
-        st.session_state.tool_executor.execute_tool(tool_id, tool['code'])
+        st.session_state.tool_executor.execute_tool(tool_id, tool_code)
+        
+        error = st.session_state.tool_executor.last_error(tool_id)
+        if error is None:
+            return
+        if not offer_repair:
+            st.info("🩹 Open the tool from **My Generated Tools** to repair it.")
+        elif st.button("🩹 Repair this tool", key=f"repair_{tool_id}"):
+            repair_saved_tool(tool_id, tool_code, error)
         
     except Exception as e:
         st.error(f"❌ Error executing tool: {str(e)}")
         
         # Show code for debugging
         with st.expander("View Generated Code (for debugging)"):
-            st.code(tool['code'], language='python')
+            st.code(tool_code, language='python')
+
+def repair_saved_tool(tool_id, tool_code, error):
+    """Repair a saved tool from the error it raised; the new code replaces it only if it validates and passes preflight"""
+    repaired_code = repair_generated_code(tool_code, error)
+    if repaired_code == tool_code:
+        st.warning("The repair did not produce working code; the tool was not changed.")
+        return
+    if not get_tool_store().update_code(get_owner_id(), tool_id, repaired_code):
+        st.error("Tool not found!")
+        return
+    st.session_state.repaired_tool = tool_id
+    st.rerun()
 
 def my_tools_page():
     st.header("🗂️ My Generated Tools")
     
-    if not st.session_state.generated_tools:
+    # Only metadata is read here; code loads when the selected tool runs
+    tools = {tool['id']: tool for tool in get_tool_store().list_tools(get_owner_id())}
+    
+    if not tools:
         st.info("📝 No tools generated yet. Go to 'Generate New Tool' to create your first productivity tool!")
         return
     
     # Tool selection
-    tool_names = {tool_id: tool_data['name'] for tool_id, tool_data in st.session_state.generated_tools.items()}
     selected_tool_id = st.selectbox(
         "Select a tool to view:",
-        list(tool_names.keys()),
-        format_func=lambda x: tool_names[x]
+        list(tools.keys()),
+        format_func=lambda x: tools[x]['name']
     )
     
     if selected_tool_id:
-        tool = st.session_state.generated_tools[selected_tool_id]
+        tool = tools[selected_tool_id]
         
         # Tool info
         col1, col2, col3 = st.columns([2, 1, 1])
@@ -207,8 +497,26 @@ def my_tools_page():
         with col2:
             st.write(f"**Created:** {datetime.fromisoformat(tool['created_at']).strftime('%Y-%m-%d %H:%M')}")
         with col3:
-            if st.button("🗑️ Delete Tool"):
-                del st.session_state.generated_tools[selected_tool_id]
+            if st.button("🗑️ Delete Tool") and get_tool_store().delete_tool(get_owner_id(), selected_tool_id):
+                st.session_state.tool_executor.clear_tool_data(selected_tool_id)
+                st.rerun()
+        
+        with st.expander("✏️ Improve this tool"):
+            with st.form(f"improve_{selected_tool_id}", clear_on_submit=True):
+                improvement_request = st.text_area(
+                    "What should change?",
+                    placeholder="e.g., Add a filter by priority above the task table"
+                )
+                submitted = st.form_submit_button("Apply Improvement")
+            if submitted and improvement_request.strip():
+                improve_saved_tool(selected_tool_id, sanitize_input(improvement_request))
+            show_improvement_report(selected_tool_id)
+        
+        store = get_tool_store()
+        if store.has_previous_code(get_owner_id(), selected_tool_id):
+            if st.button("↩️ Restore previous version", help="Undo the last improvement or repair"):
+                store.revert_code(get_owner_id(), selected_tool_id)
+                st.session_state.pop('last_improvement', None)
                 st.rerun()
         
         st.divider()
@@ -217,10 +525,65 @@ def my_tools_page():
         st.header(f"🚀 {tool['name']}")
         preview_tool(selected_tool_id)
 
+def improve_saved_tool(tool_id, improvement_request):
+    """Apply an improvement to a saved tool; the new code is saved only if it validates and passes preflight"""
+    store = get_tool_store()
+    generator = st.session_state.ai_generator
+    owner = get_owner_id()
+    current_code = store.get_code(owner, tool_id)
+    if current_code is None:
+        st.error("Tool not found!")
+        return
+    
+    with st.spinner("✏️ Improving the tool..."), span("improve") as trace:
+        improved_code = generator.improve_tool(current_code, improvement_request)
+        if generator.last_improvement:
+            trace.set(mode=generator.last_improvement['mode'])
+    
+    if not improved_code or improved_code == current_code:
+        st.warning("The improvement did not change the tool.")
+        return
+    if not validate_generated_code(improved_code) or not preflight_tool(improved_code):
+        st.error("The improved code was not saved.")
+        return
+    
+    if not store.update_code(owner, tool_id, improved_code):
+        st.error("Tool not found!")
+        return
+    report = dict(generator.last_improvement)
+    stage = 'improve' if report['mode'] == 'patch' else 'improve_full'
+    report['tool_id'] = tool_id
+    report['stats'] = generator.last_stats.get(stage)
+    report['diff'] = unified_diff(current_code, improved_code)
+    st.session_state.last_improvement = report
+
+def show_improvement_report(tool_id):
+    report = st.session_state.get('last_improvement')
+    if not report or report['tool_id'] != tool_id:
+        return
+    
+    parts = [
+        "applied as a patch" if report['mode'] == 'patch' else "regenerated the full tool",
+        f"+{report['added']} / -{report['removed']} lines",
+        f"{report['duration']:.2f}s"
+    ]
+    stats = report['stats']
+    if stats and stats['completion_tokens']:
+        parts.append(f"{stats['completion_tokens']} completion tokens")
+    st.success("✅ Improvement saved: " + " · ".join(parts))
+    if report['fallback_reason']:
+        st.caption(f"Patch not usable ({report['fallback_reason']}), so the whole tool was regenerated.")
+    st.code(report['diff'], language='diff')
+
 def template_library_page():
     st.header("📚 Template Library")
     
-    templates = get_template_library()
+    registry = get_template_registry()
+    category = st.selectbox("Category", ["All"] + sorted(registry.categories))
+    if category == "All":
+        templates = registry.library
+    else:
+        templates = {template.name: template.info for template in registry.by_category(category)}
     
     for template_name, template_data in templates.items():
         with st.expander(f"📋 {template_name}", expanded=False):
@@ -239,5 +602,106 @@ def template_library_page():
                     code = get_template_code(template_name)
                     st.code(code, language='python')
 
+def metrics_page():
+    st.header("📈 Metrics")
+    st.caption("Aggregated over all sessions served by this process since it started.")
+    
+    telemetry = get_telemetry()
+    summary = telemetry.summary()
+    
+    if not summary:
+        st.info("No pipeline activity recorded yet.")
+    else:
+        st.subheader("Pipeline Stages")
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+    
+    st.subheader("Caches")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        stats = st.session_state.tool_executor.code_cache.stats()
+        st.metric("Compiled tool cache", f"{stats['entries']} / {stats['maxsize']}")
+        st.caption(f"{stats['hits']} hits · {stats['misses']} misses")
+    with col2:
+        response_cache = st.session_state.ai_generator.response_cache
+        if response_cache is None:
+            st.metric("LLM response cache", "disabled")
+        else:
+            stats = response_cache.stats()
+            st.metric("LLM response cache", f"{stats['hit_rate']:.0%} hit rate")
+            st.caption(f"{stats['entries']} entries · {stats['hits']} hits · {stats['misses']} misses")
+    with col3:
+        stats = get_template_matcher().stats()
+        st.metric("Served from templates", f"{stats['local_fraction']:.0%}")
+        st.caption(f"{stats['served_locally']} of {stats['requests']} requests")
+    with col4:
+        stats = get_spec_compiler().stats()
+        st.metric("Code compiled locally", f"{stats['compiled_fraction']:.0%}")
+        reasons = ", ".join(f"{reason} ({count})" for reason, count in stats['top_fallback_reasons'])
+        st.caption(f"{stats['compiled']} compiled · {stats['fallbacks']} sent to the LLM" + (f": {reasons}" if reasons else ""))
+    stats = get_tool_cache().stats()
+    st.caption(
+        f"Tool results cache: {stats['hit_rate']:.0%} hit rate · {stats['entries']} results "
+        f"({stats['bytes'] / 1024 / 1024:.1f} MB) across {stats['tools']} tools · {stats['evictions']} evicted"
+    )
+    
+    stats = get_code_repairer().stats(get_template_matcher().stats()['avg_generation_seconds'])
+    if stats['repairs']:
+        st.subheader("Code Repair")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Repaired", f"{stats['success_rate']:.0%}")
+            st.caption(f"{stats['repaired']} of {stats['repairs']} invalid generations")
+        with col2:
+            attempts = stats['avg_attempts_to_valid']
+            st.metric("Attempts to valid code", f"{attempts:.1f}" if attempts is not None else "-")
+            st.caption(f"{stats['failed_attempts']} attempts spent on repairs that failed")
+        with col3:
+            seconds = stats['avg_seconds_to_valid']
+            st.metric("Time to valid code", f"{seconds:.1f} s" if seconds is not None else "-")
+            if stats['speedup_vs_regeneration']:
+                st.caption(
+                    f"{stats['speedup_vs_regeneration']:.1f}x faster than a full regeneration "
+                    f"(~{stats['avg_regeneration_seconds']:.1f} s)"
+                )
+    
+    st.subheader("OpenAI Client")
+    stats = st.session_state.ai_generator.llm.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("In flight", f"{stats['in_flight']} / {stats['max_concurrency']}")
+    with col2:
+        st.metric("Queued", stats['queue_depth'])
+        st.caption(f"Peak {stats['peak_queue_depth']}")
+    with col3:
+        st.metric("Wait p95", f"{stats['wait_p95_ms']:.0f} ms")
+        st.caption(f"p50 {stats['wait_p50_ms']:.0f} ms")
+    with col4:
+        st.metric("Retries", stats['retries'])
+        st.caption(f"{stats['throttled']} rate limited · {stats['failures']} failed")
+    stats = get_single_flight().stats()
+    st.caption(
+        f"{stats['coalesced']} duplicate requests joined one already in flight "
+        f"({stats['executions']} sent, {stats['abandoned']} abandoned before starting)"
+    )
+    
+    st.subheader("Export")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="📥 Prometheus metrics",
+            data=telemetry.prometheus_text(),
+            file_name="focus_builder_metrics.prom",
+            mime="text/plain"
+        )
+    with col2:
+        st.download_button(
+            label="📥 Recent spans (JSONL)",
+            data=telemetry.recent_jsonl(),
+            file_name="focus_builder_trace.jsonl",
+            mime="application/jsonl"
+        )
+    if config.TRACE_FILE:
+        st.caption(f"All spans are also appended to `{config.TRACE_FILE}`.")
+
 if __name__ == "__main__":
     main()
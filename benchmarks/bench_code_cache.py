@@ -0,0 +1,64 @@
+"""Per-rerun overhead of preparing a generated tool, with and without CodeCache.
+
+Measures everything ToolExecutor does before calling `execute_tool()`:
+turning the source into a bound function. Uses the bundled template code.
+
+    python benchmarks/bench_code_cache.py [--iterations N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_cache import CodeCache  # noqa: E402
+from templates import get_template_code  # noqa: E402
+
+TEMPLATES = ["Daily Habit Tracker", "Project Task Dashboard"]
+
+
+def time_per_call(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def bench_template(name, iterations):
+    code = get_template_code(name)
+
+    def uncached():
+        exec_globals = {"__builtins__": __builtins__}
+        exec(code, exec_globals)
+        return exec_globals["execute_tool"]
+
+    cache = CodeCache()
+    cache.get(code)  # warm, as after the first render
+
+    def cached():
+        return cache.get(code).bind({"__builtins__": __builtins__})
+
+    before = time_per_call(uncached, iterations)
+    after = time_per_call(cached, iterations)
+    return {
+        "template": name,
+        "code_bytes": len(code),
+        "uncached_us": round(before * 1e6, 2),
+        "cached_us": round(after * 1e6, 2),
+        "speedup": round(before / after, 1) if after else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = [bench_template(name, args.iterations) for name in TEMPLATES]
+    print(json.dumps({"benchmark": "code_cache", "iterations": args.iterations, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
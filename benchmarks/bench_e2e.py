@@ -0,0 +1,156 @@
+"""End-to-end generation pipeline benchmark against a local fake OpenAI server.
+
+Drives sanitize_input, AIGenerator (spec and code), validate_generated_code
+and ToolExecutor.execute_tool for N requests and reports per-stage
+p50/p95/p99 latency and overall throughput as JSON. Streamlit runs in bare
+mode and logs "missing ScriptRunContext" warnings to stderr; the report
+goes to stdout or --output.
+
+    python benchmarks/bench_e2e.py --requests 20 --concurrency 4 --latency 0.2 --token-rate 300
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+
+STAGES = ["sanitize", "specification", "code", "validate", "execute"]
+
+DESCRIPTION = (
+    "Create a daily habit tracker with visual progress charts. I want to track <b>multiple habits</b> "
+    "like exercise, reading, water intake, and meditation. Show my streaks and completion rates."
+)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else None,
+        "p50_ms": round(percentile(values, 50) * 1000, 3) if values else None,
+        "p95_ms": round(percentile(values, 95) * 1000, 3) if values else None,
+        "p99_ms": round(percentile(values, 99) * 1000, 3) if values else None,
+    }
+
+
+def run_request(index, stream):
+    # Imported here so environment overrides apply before the modules read config
+    from ai_generator import AIGenerator
+    from tool_executor import ToolExecutor
+    from tool_store import get_tool_store
+    from utils import get_owner_id, sanitize_input, validate_generated_code
+
+    timings = {}
+    generator = AIGenerator()
+
+    started = time.perf_counter()
+    clean_input = sanitize_input(f"{DESCRIPTION} (request {index})")
+    timings["sanitize"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if stream:
+        tool_spec = generator.stream_tool_specification(clean_input)
+    else:
+        tool_spec = generator.generate_tool_specification(clean_input)
+    timings["specification"] = time.perf_counter() - started
+    if not tool_spec:
+        return timings, False
+
+    started = time.perf_counter()
+    if stream:
+        tool_code = generator.stream_streamlit_code(tool_spec)
+    else:
+        tool_code = generator.generate_streamlit_code(tool_spec)
+    timings["code"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    valid = validate_generated_code(tool_code)
+    timings["validate"] = time.perf_counter() - started
+    if not valid:
+        return timings, False
+
+    tool_id = get_tool_store().create_tool(get_owner_id(), tool_spec["name"], clean_input, tool_spec, tool_code)
+    started = time.perf_counter()
+    ToolExecutor().execute_tool(tool_id, tool_code)
+    timings["execute"] = time.perf_counter() - started
+
+    return timings, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake server seconds before the first token")
+    parser.add_argument("--token-rate", type=float, default=300.0, help="Fake server tokens per second")
+    parser.add_argument("--stream", action="store_true", help="Use the streaming generation methods")
+    parser.add_argument("--llm-code", action="store_true",
+                        help="Disable the local spec compiler so code always comes from the (fake) LLM")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(latency=args.latency, token_rate=args.token_rate) as server:
+        os.environ["OPENAI_API_KEY"] = "fake-key"
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["FOCUS_BUILDER_LLM_CACHE"] = "0"
+        os.environ["FOCUS_BUILDER_SPEC_COMPILER"] = "0" if args.llm_code else "1"
+        os.environ["FOCUS_BUILDER_DATA_DIR"] = tempfile.mkdtemp(prefix="focus-builder-bench-")
+
+        # Warm imports and connections so the first request is not an outlier
+        run_request(-1, args.stream)
+
+        samples = {stage: [] for stage in STAGES}
+        failures = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [pool.submit(run_request, i, args.stream) for i in range(args.requests)]
+            for future in futures:
+                timings, ok = future.result()
+                failures += not ok
+                for stage, seconds in timings.items():
+                    samples[stage].append(seconds)
+        elapsed = time.perf_counter() - started
+
+    totals = [sum(values) for values in zip(*(samples[stage] for stage in STAGES))]
+    report = {
+        "benchmark": "e2e",
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency_s": args.latency,
+            "token_rate": args.token_rate,
+            "stream": args.stream,
+            "llm_code": args.llm_code,
+        },
+        "failures": failures,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 3),
+        "stages": {stage: summarize(samples[stage]) for stage in STAGES},
+        "total": summarize(totals),
+        "fake_server_requests": server.requests,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Time per widget interaction in a saved tool, with and without fragment isolation.
+
+Saves the bundled Project Task Dashboard as a tool, seeds its tables with tasks and
+changes its "Filter by Status" selectbox repeatedly on the My Generated Tools
+page. Streamlit's AppTest always reruns the whole script, so:
+
+- "full_page" reruns app.py: sidebar, page chrome and the tool, which is what
+  every interaction cost before tools ran as fragments
+- "isolated" reruns a script holding only ToolExecutor.execute_tool, which is
+  what Streamlit reruns when a widget inside the tool's fragment changes
+
+    python benchmarks/bench_fragments.py [--tasks N] [--iterations N]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+OWNER = "bench-owner"
+TEMPLATE = "Project Task Dashboard"
+STATUSES = ["To Do", "In Progress", "Completed"]
+
+
+def seed(tables, tasks):
+    tables("projects").extend(
+        {
+            "name": f"Project {index}",
+            "description": "",
+            "deadline": date.today() + timedelta(days=30),
+            "priority": "Medium",
+            "created_date": date.today(),
+        }
+        for index in range(5)
+    )
+    tables("tasks").extend(
+        {
+            "title": f"Task {index}",
+            "description": "",
+            "project_id": index % 5,
+            "status": STATUSES[index % 3],
+            "priority": ["Low", "Medium", "High"][index % 3],
+            "due_date": date.today() + timedelta(days=index % 20 - 5),
+            "estimate": 1.0 + index % 4,
+            "created_date": date.today(),
+        }
+        for index in range(tasks)
+    )
+
+
+def time_interactions(at, iterations):
+    """Median seconds per rerun after changing the tool's status filter"""
+    at.run()
+    samples = []
+    for iteration in range(iterations):
+        status_filter = next(box for box in at.selectbox if box.label == "Filter by Status")
+        status_filter.select(status_filter.options[iteration % len(status_filter.options)])
+        started = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - started)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return statistics.median(samples)
+
+
+def run_tool_only(tool_id):
+    from tool_executor import ToolExecutor
+    from tool_store import get_tool_store
+    from utils import get_owner_id
+
+    ToolExecutor().execute_tool(tool_id, get_tool_store().get_code(get_owner_id(), tool_id))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["FOCUS_BUILDER_WARMUP"] = "0"
+    os.environ["FOCUS_BUILDER_DATA_DIR"] = tempfile.mkdtemp(prefix="focus-builder-bench-")
+
+    from streamlit.testing.v1 import AppTest
+    from templates import get_template_code, get_template_spec
+    from tool_store import get_tool_store
+    from utils import get_owner_id
+    from tool_tables import ToolTableSet, get_table_storage
+
+    spec = get_template_spec(TEMPLATE)
+    tool_id = get_tool_store().create_tool(OWNER, TEMPLATE, spec["description"], spec, get_template_code(TEMPLATE))
+    seed(ToolTableSet(OWNER, tool_id, get_table_storage()), args.tasks)
+
+    full_page = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    full_page.query_params["owner"] = OWNER
+    full_page.run()
+    page = next(box for box in full_page.sidebar.selectbox if "My Generated Tools" in box.options)
+    page.select("My Generated Tools")
+    full_page_seconds = time_interactions(full_page, args.iterations)
+
+    isolated = AppTest.from_function(run_tool_only, args=(tool_id,), default_timeout=120)
+    isolated.query_params["owner"] = OWNER
+    isolated_seconds = time_interactions(isolated, args.iterations)
+
+    print(json.dumps({
+        "benchmark": "fragments",
+        "template": TEMPLATE,
+        "tasks": args.tasks,
+        "iterations": args.iterations,
+        "full_page_ms": round(full_page_seconds * 1000, 2),
+        "isolated_ms": round(isolated_seconds * 1000, 2),
+        "speedup": round(full_page_seconds / isolated_seconds, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Rerun time of the Daily Habit Tracker template with a large history.
+
+Saves the template as a tool, fills its tables with HABITS habits logged
+daily for YEARS years, and runs it through ToolExecutor in AppTest:
+
+- "idle" reruns change nothing, so streaks and charts come from tool_cache
+- "after_write" reruns follow a change to one habit's progress for today,
+  which rebuilds the (habit_id, day) index and recomputes every streak,
+  weekly average and the chart
+
+"script" is the time the tool itself takes, as a server would spend it;
+"apptest" adds the test harness's own per-run overhead.
+
+    python benchmarks/bench_habit_tracker.py [--habits N] [--years N] [--iterations N]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+OWNER = "bench-owner"
+TEMPLATE = "Daily Habit Tracker"
+BUDGET_MS = 100
+
+
+def seed(tables, habits, years):
+    rng = np.random.default_rng(7)
+    today = date.today().toordinal()
+    days = np.arange(today - 365 * years, today)
+
+    habit_table = tables("habits")
+    habit_table.extend(
+        {"name": f"Habit {number}", "target": 4.0, "category": "Health", "unit": "times",
+         "created_date": date.fromordinal(int(days[0]))}
+        for number in range(habits)
+    )
+
+    rows = []
+    for habit_id in range(habits):
+        # Mostly on target, so streaks of realistic length form
+        values = np.where(rng.random(len(days)) < 0.85, 4.0, rng.integers(0, 4, len(days)))
+        rows.extend({"habit_id": habit_id, "day": int(day), "value": float(value)} for day, value in zip(days, values))
+    tables("habit_logs").extend(rows)
+    return len(rows)
+
+
+def run_tool(tool_id):
+    import time
+
+    import streamlit as st
+    from tool_executor import ToolExecutor
+    from tool_store import get_tool_store
+    from utils import get_owner_id
+
+    started = time.perf_counter()
+    ToolExecutor().execute_tool(tool_id, get_tool_store().get_code(get_owner_id(), tool_id))
+    st.session_state["script_seconds"] = time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--habits", type=int, default=50)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["FOCUS_BUILDER_WARMUP"] = "0"
+    os.environ["FOCUS_BUILDER_DATA_DIR"] = tempfile.mkdtemp(prefix="focus-builder-bench-")
+
+    from streamlit.testing.v1 import AppTest
+    from templates import get_template_code, get_template_spec
+    from tool_store import get_tool_store
+    from utils import get_owner_id
+    from tool_tables import ToolTableSet, get_table_storage
+
+    spec = get_template_spec(TEMPLATE)
+    tool_id = get_tool_store().create_tool(OWNER, TEMPLATE, spec["description"], spec, get_template_code(TEMPLATE))
+    log_count = seed(ToolTableSet(OWNER, tool_id, get_table_storage()), args.habits, args.years)
+
+    at = AppTest.from_function(run_tool, args=(tool_id,), default_timeout=120)
+    at.query_params["owner"] = OWNER
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    # Writes go straight to the table, as the progress editor's do
+    logs = ToolTableSet(OWNER, tool_id, get_table_storage())("habit_logs")
+    today = date.today().toordinal()
+    today_rows = {}
+
+    samples = {"idle": [], "after_write": []}
+    for iteration in range(args.iterations):
+        started = time.perf_counter()
+        at.run()
+        samples["idle"].append((time.perf_counter() - started, at.session_state["script_seconds"]))
+
+        habit_id = iteration % args.habits
+        value = float(iteration % 5)
+        if habit_id in today_rows:
+            logs.update(today_rows[habit_id], value=value)
+        else:
+            today_rows[habit_id] = logs.append({"habit_id": habit_id, "day": today, "value": value})
+        started = time.perf_counter()
+        at.run()
+        samples["after_write"].append((time.perf_counter() - started, at.session_state["script_seconds"]))
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+    results = {}
+    for kind, timings in samples.items():
+        results[f"{kind}_script_ms"] = round(statistics.median(script for _, script in timings) * 1000, 1)
+        results[f"{kind}_apptest_ms"] = round(statistics.median(wall for wall, _ in timings) * 1000, 1)
+
+    print(json.dumps({
+        "benchmark": "habit_tracker",
+        "habits": args.habits,
+        "logs": log_count,
+        "iterations": args.iterations,
+        **results,
+        "budget_ms": BUDGET_MS,
+        "within_budget": max(results["idle_script_ms"], results["after_write_script_ms"]) < BUDGET_MS,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Cold-start import cost of the app and of a generated tool's first render.
+
+Each scenario runs in a fresh interpreter under `python -X importtime` and the
+per-module timings are summed from its stderr. "app" is everything `app.py`
+imports before drawing the first page; "first_render" is what a generated tool
+pulls in on top of Streamlit the first time it runs.
+
+    python benchmarks/bench_import_time.py [--repeat N] [--top N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    # Only the module imports of app.py; the page itself needs a Streamlit runtime
+    "app": "import streamlit, config, warmup, ai_generator, preflight, templates, telemetry, "
+           "template_matcher, tool_executor, tool_store, utils",
+    "app_eager_before_lazy_imports": "import streamlit, pandas, plotly.express, plotly.graph_objects, openai, "
+                                     "config, ai_generator, preflight, templates, telemetry, "
+                                     "template_matcher, tool_executor, tool_store, utils",
+    "first_render": "import streamlit; import pandas, plotly.express",
+}
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        modules[name] = (int(parts[0]), int(parts[1]))
+    return modules
+
+
+def run_scenario(statement):
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    env["FOCUS_BUILDER_WARMUP"] = "0"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def bench_scenario(statement, repeat, top):
+    runs = [run_scenario(statement) for _ in range(repeat)]
+    totals = sorted(sum(self_us for self_us, _ in run.values()) for run in runs)
+    median = runs[[sum(s for s, _ in run.values()) for run in runs].index(totals[len(totals) // 2])]
+
+    # Top-level packages by cumulative time, from the median run
+    packages = {}
+    for name, (_, cumulative) in median.items():
+        if "." not in name:
+            packages[name] = max(packages.get(name, 0), cumulative)
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    return {
+        "modules": len(median),
+        "total_ms": round(totals[len(totals) // 2] / 1000, 1),
+        "min_ms": round(totals[0] / 1000, 1),
+        "top_packages_ms": {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    results = {name: bench_scenario(statement, args.repeat, args.top) for name, statement in SCENARIOS.items()}
+    results["app_saved_ms"] = round(
+        results["app_eager_before_lazy_imports"]["total_ms"] - results["app"]["total_ms"], 1
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Rerun time of the Project Task Dashboard template as the task count grows.
+
+Saves the template as one tool per task count, fills its tables and runs it
+through ToolExecutor in AppTest:
+
+- "filter" reruns change the status filter, which the indexes answer and the
+  paginated editor renders one page of
+- "after_write" reruns follow a status change to one task, which updates the
+  indexes in place and redraws the cached progress chart
+
+"script" is the time the tool itself takes, as a server would spend it. With
+a fixed page size it should stay close to flat as the task count grows.
+
+    python benchmarks/bench_task_dashboard.py [--tasks N [N ...]] [--iterations N]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+OWNER = "bench-owner"
+TEMPLATE = "Project Task Dashboard"
+STATUSES = ["To Do", "In Progress", "Completed"]
+PRIORITIES = ["Low", "Medium", "High"]
+PROJECTS = 20
+
+
+def seed(tables, tasks):
+    tables("projects").extend(
+        {"name": f"Project {index}", "description": "", "deadline": date.today() + timedelta(days=90),
+         "priority": "Medium", "created_date": date.today()}
+        for index in range(PROJECTS)
+    )
+    tables("tasks").extend(
+        {"title": f"Task {index}", "description": "", "project_id": index % PROJECTS,
+         "status": STATUSES[index % 3], "priority": PRIORITIES[index // 3 % 3],
+         "due_date": date.today() + timedelta(days=index % 60 - 20), "estimate": 1.0 + index % 4,
+         "created_date": date.today()}
+        for index in range(tasks)
+    )
+
+
+def run_tool(tool_id):
+    import time
+
+    import streamlit as st
+    from tool_executor import ToolExecutor
+    from tool_store import get_tool_store
+    from utils import get_owner_id
+
+    started = time.perf_counter()
+    ToolExecutor().execute_tool(tool_id, get_tool_store().get_code(get_owner_id(), tool_id))
+    st.session_state["script_seconds"] = time.perf_counter() - started
+
+
+def measure(tool_id, tasks, iterations):
+    from streamlit.testing.v1 import AppTest
+    from tool_tables import ToolTableSet, get_table_storage
+
+    at = AppTest.from_function(run_tool, args=(tool_id,), default_timeout=120)
+    at.query_params["owner"] = OWNER
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    # Writes go straight to the table, as the task editor's do
+    table = ToolTableSet(OWNER, tool_id, get_table_storage())("tasks")
+
+    samples = {"filter": [], "after_write": []}
+    for iteration in range(iterations):
+        status_filter = next(box for box in at.selectbox if box.label == "Filter by Status")
+        status_filter.select(status_filter.options[iteration % len(status_filter.options)])
+        at.run()
+        samples["filter"].append(at.session_state["script_seconds"])
+
+        table.update(iteration * 7 % tasks, status=STATUSES[iteration % 3])
+        at.run()
+        samples["after_write"].append(at.session_state["script_seconds"])
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return {f"{kind}_script_ms": round(statistics.median(timings) * 1000, 1) for kind, timings in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["FOCUS_BUILDER_WARMUP"] = "0"
+    os.environ["FOCUS_BUILDER_DATA_DIR"] = tempfile.mkdtemp(prefix="focus-builder-bench-")
+
+    from templates import get_template_code, get_template_spec
+    from tool_store import get_tool_store
+    from utils import get_owner_id
+    from tool_tables import ToolTableSet, get_table_storage
+
+    spec = get_template_spec(TEMPLATE)
+    results = []
+    for tasks in args.tasks:
+        tool_id = get_tool_store().create_tool(OWNER, TEMPLATE, spec["description"], spec, get_template_code(TEMPLATE))
+        seed(ToolTableSet(OWNER, tool_id, get_table_storage()), tasks)
+        results.append({"tasks": tasks, **measure(tool_id, tasks, args.iterations)})
+
+    print(json.dumps({
+        "benchmark": "task_dashboard",
+        "projects": PROJECTS,
+        "page_size": 50,
+        "iterations": args.iterations,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Template registry load time, lookup cost and reload time as the library grows.
+
+Copies the bundled templates under new names until the directory holds N
+templates, then times a cold load, the per-rerun lookups the app makes
+(library, code, spec, category) and a reload after one file changes.
+
+    python benchmarks/bench_templates.py [--templates N] [--iterations N]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from template_registry import MANIFEST_FILE, TEMPLATE_DIR, TemplateRegistry  # noqa: E402
+
+
+def build_library(count):
+    root = tempfile.mkdtemp(prefix="focus-builder-templates-")
+    bundled = sorted(name for name in os.listdir(TEMPLATE_DIR) if not name.startswith((".", "_")))
+    for number in range(count):
+        source = os.path.join(TEMPLATE_DIR, bundled[number % len(bundled)])
+        target = os.path.join(root, f"{number:04d}_{os.path.basename(source)}")
+        shutil.copytree(source, target)
+        with open(os.path.join(target, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest["name"] = f"{manifest['name']} #{number}"
+        with open(os.path.join(target, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+    return root
+
+
+def time_per_call(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--templates", type=int, default=400)
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    root = build_library(args.templates)
+    try:
+        started = time.perf_counter()
+        registry = TemplateRegistry(root, reload_seconds=0)
+        load_seconds = time.perf_counter() - started
+
+        name = next(template.name for template in registry.templates if template.code)
+        lookups = {
+            "library": lambda: registry.library,
+            "code": lambda: registry.code(name),
+            "spec": lambda: registry.get(name).spec(),
+            "category": lambda: registry.by_category("tracker"),
+        }
+        lookup_ns = {key: round(time_per_call(func, args.iterations) * 1e9, 1) for key, func in lookups.items()}
+
+        unchanged_check = time_per_call(registry.reload_if_changed, 20)
+        manifest = os.path.join(root, sorted(os.listdir(root))[0], MANIFEST_FILE)
+        os.utime(manifest, ns=(time.time_ns(), time.time_ns() + 1000))
+        started = time.perf_counter()
+        registry.reload_if_changed()
+        reload_seconds = time.perf_counter() - started
+
+        print(json.dumps({
+            "benchmark": "templates",
+            "templates": len(registry.library),
+            "with_code": registry.stats()["with_code"],
+            "load_ms": round(load_seconds * 1000, 1),
+            "lookup_ns": lookup_ns,
+            "unchanged_check_ms": round(unchanged_check * 1000, 2),
+            "reload_ms": round(reload_seconds * 1000, 1),
+        }, indent=2))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Single-pass AST validation versus the previous regex-based checks.
+
+The corpus is the bundled template code plus synthetic tools built by
+repeating template functions up to the 50 KB size limit.
+
+    python benchmarks/bench_validator.py [--iterations N]
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import code_validator  # noqa: E402
+from templates import get_template_code  # noqa: E402
+
+LEGACY_PATTERNS = [
+    r'import\s+os',
+    r'import\s+sys',
+    r'import\s+subprocess',
+    r'exec\s*\(',
+    r'eval\s*\(',
+    r'__import__',
+    r'open\s*\(',
+    r'file\s*\(',
+    r'input\s*\(',
+    r'raw_input\s*\('
+]
+
+
+def legacy_validate(code):
+    """The checks utils.validate_generated_code and ToolExecutor.validate_tool_code ran before.
+
+    Every check runs even after a failure, which is the cost paid for code
+    that passes. The old `input\\s*\\(` pattern also matched `st.text_input(`,
+    so in practice it rejected nearly every tool.
+    """
+    ast.parse(code)
+    accepted = 'def execute_tool(' in code
+    for pattern in LEGACY_PATTERNS:
+        if re.search(pattern, code, re.IGNORECASE):
+            accepted = False
+    if len(code) > 50000:
+        accepted = False
+    compile(code, '<string>', 'exec')
+    return accepted
+
+
+def build_corpus():
+    corpus = {}
+    for name in ["Daily Habit Tracker", "Project Task Dashboard"]:
+        corpus[name] = get_template_code(name)
+
+    # Grow a tool toward the size cap with renamed helper copies of both templates
+    helpers = []
+    size = 0
+    index = 0
+    names = ["Daily Habit Tracker", "Project Task Dashboard"]
+    while True:
+        helper = get_template_code(names[index % 2]).replace("def execute_tool():", f"def section_{index}():")
+        if size + len(helper) > 45000:
+            break
+        helpers.append(helper)
+        size += len(helper)
+        index += 1
+    corpus["synthetic ~45KB"] = "\n".join(helpers) + "\ndef execute_tool():\n    section_0()\n"
+    return corpus
+
+
+def time_per_call(func, code, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(code)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    def cold_analyze(code):
+        code_validator._results.clear()
+        return code_validator.analyze_code(code)
+
+    results = []
+    for name, code in build_corpus().items():
+        legacy = time_per_call(legacy_validate, code, args.iterations)
+        cold = time_per_call(cold_analyze, code, args.iterations)
+        warm = time_per_call(code_validator.analyze_code, code, args.iterations)
+        results.append({
+            "tool": name,
+            "code_bytes": len(code),
+            "legacy_accepts": legacy_validate(code),
+            "ast_accepts": code_validator.analyze_code(code).valid,
+            "legacy_us": round(legacy * 1e6, 1),
+            "ast_cold_us": round(cold * 1e6, 1),
+            "ast_memoized_us": round(warm * 1e6, 1),
+        })
+
+    print(json.dumps({"benchmark": "validator", "iterations": args.iterations, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
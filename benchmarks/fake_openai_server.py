@@ -0,0 +1,196 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Serves canned responses with configurable latency and token rate so the
+generation pipeline can be measured offline. Requests that ask for a JSON
+object get a tool specification; all others get tool code.
+
+    python benchmarks/fake_openai_server.py --port 8011 --latency 0.3 --token-rate 150
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from templates import get_template_code  # noqa: E402
+
+DEFAULT_SPEC = {
+    "name": "Daily Habit Tracker",
+    "category": "tracker",
+    "features": ["habit management", "daily check-offs", "progress visualization", "streak tracking"],
+    "data_structure": {
+        "fields": [
+            {"name": "habit", "type": "string", "description": "Habit name"},
+            {"name": "date", "type": "date", "description": "Day the habit was logged"},
+            {"name": "value", "type": "number", "description": "Amount completed"}
+        ]
+    },
+    "visualizations": [
+        {"type": "chart", "description": "Completion rate over time"},
+        {"type": "metric", "description": "Current streak per habit"}
+    ],
+    "interactions": ["add habit", "log progress", "delete habit"],
+    "layout": {"columns": 2, "sections": ["Add Habit", "Today's Progress", "Progress Overview"]},
+    "description": "Track daily habits with progress charts and streaks"
+}
+
+
+def split_tokens(text):
+    """Rough tokenization: words and punctuation, keeping whitespace attached"""
+    return re.findall(r"\s*\w+|\s*[^\w\s]|\s+", text)
+
+
+class FakeOpenAIServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, token_rate=200.0, spec=None, code=None):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.spec_text = json.dumps(spec or DEFAULT_SPEC)
+        self.code_text = code or get_template_code("Daily Habit Tracker")
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                server._handle(self, body)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handle(self, handler, body):
+        with self._lock:
+            self.requests += 1
+
+        wants_json = (body.get("response_format") or {}).get("type") == "json_object"
+        text = self.spec_text if wants_json else self.code_text
+        tokens = split_tokens(text)
+        prompt_tokens = sum(len(split_tokens(m.get("content") or "")) for m in body.get("messages", []))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens)
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "gpt-4o")
+
+        time.sleep(self.latency)
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            self._stream(handler, completion_id, model, tokens, usage if include_usage else None)
+        else:
+            time.sleep(len(tokens) / self.token_rate)
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            }
+            data = json.dumps(payload).encode("utf-8")
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(data)))
+            handler.end_headers()
+            handler.wfile.write(data)
+
+    def _stream(self, handler, completion_id, model, tokens, usage):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Cache-Control", "no-cache")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+
+        def send(chunk):
+            handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            handler.wfile.flush()
+
+        def chunk(delta, finish_reason=None):
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+
+        send(chunk({"role": "assistant", "content": ""}))
+        interval = 1.0 / self.token_rate
+        for token in tokens:
+            time.sleep(interval)
+            send(chunk({"content": token}))
+        send(chunk({}, "stop"))
+        if usage is not None:
+            send({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [],
+                "usage": usage
+            })
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.wfile.flush()
+        handler.close_connection = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="Tokens per second after the first")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.host, args.port, args.latency, args.token_rate)
+    print(f"Fake OpenAI API listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
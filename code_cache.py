@@ -0,0 +1,113 @@
+import ast
+import hashlib
+import threading
+import types
+from collections import OrderedDict
+
+
+def code_digest(code):
+    """Return the content hash used to key cached tool code"""
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+class CompiledTool:
+    """Compiled form of a generated tool's source"""
+
+    def __init__(self, digest, module_code, function_code=None):
+        self.digest = digest
+        self.module_code = module_code
+        # Set only when the module body is nothing but `def execute_tool():`,
+        # in which case the function can be built without running the module.
+        self.function_code = function_code
+
+    def bind(self, exec_globals):
+        """Resolve `execute_tool` against a fresh globals dict"""
+        if self.function_code is not None:
+            func = types.FunctionType(self.function_code, exec_globals, "execute_tool")
+            exec_globals["execute_tool"] = func
+            return func
+
+        exec(self.module_code, exec_globals)
+        return exec_globals.get("execute_tool")
+
+
+class CodeCache:
+    """Process-wide LRU cache of compiled tool code, keyed by content hash"""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, code):
+        """Return the CompiledTool for `code`, compiling it on first use"""
+        digest = code_digest(code)
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return entry
+
+        # Compile outside the lock so one large tool does not stall other sessions
+        entry = self._compile(digest, code)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[digest] = entry
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _compile(self, digest, code):
+        tree = ast.parse(code, filename=f"<tool {digest[:12]}>")
+        module_code = compile(tree, f"<tool {digest[:12]}>", "exec")
+        return CompiledTool(digest, module_code, self._standalone_function(tree, module_code))
+
+    @staticmethod
+    def _standalone_function(tree, module_code):
+        """Find the `execute_tool` code object if it can be bound directly"""
+        if len(tree.body) != 1:
+            return None
+
+        node = tree.body[0]
+        if not isinstance(node, ast.FunctionDef) or node.name != "execute_tool":
+            return None
+        if node.decorator_list or node.args.defaults or node.args.kw_defaults:
+            return None
+
+        for const in module_code.co_consts:
+            if isinstance(const, types.CodeType) and const.co_name == "execute_tool":
+                # Closures need cells from the module frame, which we never create
+                if const.co_freevars:
+                    return None
+                return const
+        return None
+
+
+_code_cache = CodeCache()
+
+
+def get_code_cache():
+    """Return the cache shared by every session in this process"""
+    return _code_cache
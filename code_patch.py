@@ -0,0 +1,228 @@
+import ast
+import difflib
+import math
+import re
+
+# Tools up to this many lines are sent whole; longer ones as an outline plus relevant blocks
+FULL_CONTEXT_LINES = 120
+
+# Lines of relevant blocks to include for a long tool
+RELEVANT_LINES_BUDGET = 80
+
+# Blocks scoring below this fraction of the best block are left out
+RELEVANCE_CUTOFF = 0.3
+
+# Statements longer than this are split into their children when picking blocks
+MAX_BLOCK_LINES = 60
+
+_WORD_RE = re.compile(r"[A-Za-z][a-z]+|[A-Z]+(?![a-z])|\d+")
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+# The numbered listing we send ("  42| code"), in case the model copies it into the diff
+_LISTING_PREFIX_RE = re.compile(r"^\s*\d+\| ?")
+_STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "add", "make", "can", "should", "would",
+    "please", "into", "from", "each", "when", "also", "all", "new", "use", "its", "are",
+}
+
+
+class PatchError(Exception):
+    """A diff could not be applied to the code it was written against"""
+
+
+class Block:
+    """A contiguous range of source lines that can be sent on its own"""
+
+    def __init__(self, start, end, lines):
+        self.start = start  # 1-based, inclusive
+        self.end = end
+        self.text = "\n".join(lines[start - 1:end])
+        self.header = lines[start - 1].strip()
+
+    def __len__(self):
+        return self.end - self.start + 1
+
+
+def _words(text):
+    return {word.lower() for word in _WORD_RE.findall(text) if len(word) > 2} - _STOPWORDS
+
+
+def _split_blocks(statements, lines):
+    blocks = []
+    for node in statements:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        end = node.end_lineno
+        children = [child for field in ("body", "orelse", "handlers", "finalbody")
+                    for child in getattr(node, field, []) or []]
+
+        if end - start + 1 > MAX_BLOCK_LINES and children:
+            # Keep the header (e.g. `with tab1:`) with the first child so indentation stays readable
+            nested = _split_blocks(children, lines)
+            nested[0] = Block(start, nested[0].end, lines)
+            blocks.extend(nested)
+        else:
+            blocks.append(Block(start, end, lines))
+    return blocks
+
+
+def code_blocks(code):
+    """Split tool code into blocks: module statements, and the statements of `execute_tool`"""
+    tree = ast.parse(code)
+    lines = code.splitlines()
+
+    statements = []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == "execute_tool":
+            statements.extend(node.body)
+        else:
+            statements.append(node)
+    return _split_blocks(statements, lines)
+
+
+def outline(blocks):
+    """One line per block: its line range and first line"""
+    return "\n".join(f"L{block.start}-{block.end}: {block.header[:80]}" for block in blocks)
+
+
+def numbered(code, start=1, end=None):
+    lines = code.splitlines()
+    end = end or len(lines)
+    return "\n".join(f"{number:4d}| {lines[number - 1]}" for number in range(start, end + 1))
+
+
+def relevant_blocks(blocks, request, budget=RELEVANT_LINES_BUDGET):
+    """Pick the blocks that share the rarest words with the request, within a line budget"""
+    request_words = _words(request)
+    block_words = [_words(block.text) for block in blocks]
+
+    # Words found in every block (like the tool's main entity) say little about where to edit
+    weights = {}
+    for word in request_words:
+        frequency = sum(1 for words in block_words if word in words)
+        if frequency:
+            weights[word] = math.log((1 + len(blocks)) / frequency)
+
+    scored = []
+    for block, words in zip(blocks, block_words):
+        score = sum(weights.get(word, 0) for word in words & request_words)
+        if score > 0:
+            scored.append((score / len(block) ** 0.5, block))
+    scored.sort(key=lambda item: item[0], reverse=True)
+
+    chosen = []
+    used = 0
+    for score, block in scored:
+        if score < scored[0][0] * RELEVANCE_CUTOFF:
+            break
+        if used + len(block) > budget and chosen:
+            continue
+        chosen.append(block)
+        used += len(block)
+
+    if not chosen and blocks:
+        # Nothing mentions the request (e.g. a brand-new feature): show where the tool starts
+        chosen = [blocks[0]]
+    return sorted(chosen, key=lambda block: block.start)
+
+
+def build_edit_context(code, request):
+    """Return (context_text, blocks_sent): the whole numbered code when short,
+    otherwise an outline plus the numbered relevant blocks"""
+    lines = code.splitlines()
+    if len(lines) <= FULL_CONTEXT_LINES:
+        return numbered(code), None
+
+    blocks = code_blocks(code)
+    chosen = relevant_blocks(blocks, request)
+    parts = [f"OUTLINE ({len(lines)} lines):", outline(blocks), "", "RELEVANT CODE:"]
+    previous_end = None
+    for block in chosen:
+        if previous_end is not None and block.start > previous_end + 1:
+            parts.append("   ...")
+        parts.append(numbered(code, block.start, block.end))
+        previous_end = block.end
+    return "\n".join(parts), chosen
+
+
+def _parse_hunks(diff):
+    hunks = []
+    current = None
+    for raw in diff.splitlines():
+        if raw.startswith("```"):
+            continue
+        if raw.startswith("--- ") or raw.startswith("+++ "):
+            continue
+        match = _HUNK_RE.match(raw)
+        if match or raw.startswith("@@"):
+            current = {"start": int(match.group(1)) if match else None, "old": [], "new": []}
+            hunks.append(current)
+            continue
+        if current is None:
+            continue
+
+        marker, text = (raw[0], raw[1:]) if raw else (" ", "")
+        if marker not in " +-":
+            # Models sometimes drop the leading space on context lines
+            marker, text = " ", raw
+        text = _LISTING_PREFIX_RE.sub("", text, count=1)
+
+        if marker in " -":
+            current["old"].append(text)
+        if marker in " +":
+            current["new"].append(text)
+    return [hunk for hunk in hunks if hunk["old"] or hunk["new"]]
+
+
+def _find(lines, old, hint):
+    """Index where `old` occurs in `lines`, nearest to `hint`; trailing whitespace is ignored"""
+    if not old:
+        return hint
+    stripped = [line.rstrip() for line in lines]
+    target = [line.rstrip() for line in old]
+    candidates = [
+        i for i in range(len(lines) - len(old) + 1)
+        if stripped[i] == target[0] and stripped[i:i + len(old)] == target
+    ]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda i: abs(i - hint))
+
+
+def apply_unified_diff(code, diff):
+    """Apply a unified diff to `code`, locating hunks by content.
+
+    Line numbers in hunk headers are only used to choose between several
+    matches, so diffs written against an excerpt still apply.
+    """
+    hunks = _parse_hunks(diff)
+    if not hunks:
+        raise PatchError("The response contained no diff hunks")
+
+    lines = code.splitlines()
+    offset = 0
+    for number, hunk in enumerate(hunks, 1):
+        hint = (hunk["start"] - 1 + offset) if hunk["start"] else 0
+        index = _find(lines, hunk["old"], max(hint, 0))
+        if index is None:
+            raise PatchError(f"Hunk {number} does not match the current code")
+        lines[index:index + len(hunk["old"])] = hunk["new"]
+        offset += len(hunk["new"]) - len(hunk["old"])
+
+    patched = "\n".join(lines)
+    return patched + "\n" if code.endswith("\n") else patched
+
+
+def diff_stats(before, after):
+    """Count lines added and removed between two versions"""
+    added = removed = 0
+    for line in difflib.unified_diff(before.splitlines(), after.splitlines(), lineterm="", n=0):
+        if line.startswith("+") and not line.startswith("+++"):
+            added += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            removed += 1
+    return {"added": added, "removed": removed}
+
+
+def unified_diff(before, after, name="tool.py"):
+    return "\n".join(difflib.unified_diff(
+        before.splitlines(), after.splitlines(), f"a/{name}", f"b/{name}", lineterm=""
+    ))
@@ -0,0 +1,145 @@
+import re
+import threading
+import time
+
+import config
+from code_patch import build_edit_context, numbered
+from telemetry import span
+
+# Lines of code shown on each side of the failing line
+REPAIR_CONTEXT_LINES = 12
+# Innermost traceback lines sent with a runtime error
+REPAIR_TRACEBACK_LINES = 12
+
+# Frames of the tool itself in a preflight traceback or one from code compiled by code_cache
+_TOOL_FRAME_RE = re.compile(r'File "<(?:preflight|tool [0-9a-f]+)>", line (\d+)')
+_LINE_RE = re.compile(r"\bline (\d+)")
+
+
+def error_line(error, traceback_text=None):
+    """Line of the tool code an error points at, innermost frame first; None when unknown"""
+    if traceback_text:
+        frames = _TOOL_FRAME_RE.findall(traceback_text)
+        if frames:
+            return int(frames[-1])
+    match = _LINE_RE.search(error or "")
+    return int(match.group(1)) if match else None
+
+
+def error_snippet(code, line, context=REPAIR_CONTEXT_LINES):
+    """(start, end, numbered lines) around `line`, or the whole file when the line is unknown"""
+    total = max(1, len(code.splitlines()))
+    if line is None:
+        return 1, total, numbered(code)
+    line = min(max(line, 1), total)
+    start, end = max(1, line - context), min(total, line + context)
+    return start, end, numbered(code, start, end)
+
+
+def repair_context(code, error, traceback_text=None):
+    """(scope, text) of the code sent with an error: the lines around it, or when the
+    line is unknown an outline plus the blocks most relevant to the error"""
+    total = len(code.splitlines())
+    line = error_line(error, traceback_text)
+    if line is None:
+        try:
+            context, blocks = build_edit_context(code, error)
+        except SyntaxError:
+            context, blocks = numbered(code), None
+        if blocks is not None:
+            return f"an outline of all {total} lines and the code most relevant to the error", context
+        return f"all {total} lines", context
+    start, end, snippet = error_snippet(code, line)
+    return f"lines {start}-{end} of {total}", snippet
+
+
+def tail_of_traceback(traceback_text, lines=REPAIR_TRACEBACK_LINES):
+    return "\n".join(traceback_text.strip().splitlines()[-lines:])
+
+
+class CodeRepairer:
+    """Bounded loop of targeted LLM fixes for generated code that fails to validate or run.
+
+    Each attempt sends only the error, the end of its traceback and the code
+    around the failing line, and applies the returned diff. Attempts and
+    latency to valid code are tracked next to the average full generation
+    time, which is what a blind regeneration would cost.
+    """
+
+    def __init__(self, max_attempts=None):
+        self.max_attempts = config.CODE_REPAIR_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self._lock = threading.Lock()
+        self.repairs = 0
+        self.repaired = 0
+        self.attempts_to_valid = 0
+        self.seconds_to_valid = 0.0
+        self.failed_attempts = 0
+
+    def repair(self, generator, tool_code, find_error):
+        """Return (code, attempts): the first repaired code that `find_error` accepts, or (None, attempts).
+
+        `find_error(code)` returns None for good code, else (error, traceback).
+        """
+        problem = find_error(tool_code)
+        if problem is None:
+            return tool_code, 0
+
+        started = time.perf_counter()
+        code = None
+        attempts = 0
+        with span("repair", max_attempts=self.max_attempts) as trace:
+            current = tool_code
+            while problem is not None and attempts < self.max_attempts:
+                attempts += 1
+                error, traceback_text = problem
+                candidate = generator.repair_code(current, error, traceback_text)
+                if candidate is None or candidate == current:
+                    # The same prompt would get the same reply back from the response cache
+                    break
+                current = candidate
+                problem = find_error(current)
+                if problem is None:
+                    code = current
+            trace.set(attempts=attempts)
+            if code is None:
+                trace.set_outcome("failed")
+
+        with self._lock:
+            self.repairs += 1
+            if code is None:
+                self.failed_attempts += attempts
+            else:
+                self.repaired += 1
+                self.attempts_to_valid += attempts
+                self.seconds_to_valid += time.perf_counter() - started
+        return code, attempts
+
+    def stats(self, avg_generation_seconds=None):
+        """Repair outcomes; `avg_generation_seconds` is the cost of regenerating from scratch"""
+        with self._lock:
+            avg_seconds = self.seconds_to_valid / self.repaired if self.repaired else None
+            return {
+                "repairs": self.repairs,
+                "repaired": self.repaired,
+                "success_rate": self.repaired / self.repairs if self.repairs else 0.0,
+                "avg_attempts_to_valid": self.attempts_to_valid / self.repaired if self.repaired else None,
+                "avg_seconds_to_valid": avg_seconds,
+                "avg_regeneration_seconds": avg_generation_seconds,
+                "speedup_vs_regeneration": (
+                    avg_generation_seconds / avg_seconds if avg_seconds and avg_generation_seconds else None
+                ),
+                "failed_attempts": self.failed_attempts,
+            }
+
+
+_code_repairer = None
+_code_repairer_lock = threading.Lock()
+
+
+def get_code_repairer():
+    """Return the repairer shared by every session in this process"""
+    global _code_repairer
+    with _code_repairer_lock:
+        if _code_repairer is None:
+            _code_repairer = CodeRepairer()
+        return _code_repairer
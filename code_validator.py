@@ -0,0 +1,195 @@
+import ast
+import threading
+from collections import OrderedDict
+
+from code_cache import code_digest
+
+MAX_CODE_SIZE = 50000  # 50KB limit
+
+# Modules generated tools may not import, matched on the top-level package
+BANNED_MODULES = {'os', 'sys', 'subprocess', 'shutil', 'socket', 'ctypes', 'importlib', 'builtins'}
+
+# Builtins generated tools may not call by name
+BANNED_CALLS = {
+    'exec', 'eval', 'compile', '__import__', 'open', 'file', 'input', 'raw_input', 'breakpoint',
+    'globals', 'locals', 'vars', 'getattr', 'setattr', 'delattr',
+}
+
+# Methods generated tools may not call on any object, e.g. io.open() or builtins.exec()
+BANNED_METHODS = {'open', 'exec', 'eval', 'compile', '__import__'}
+
+# Introspection attributes that lead back to unrestricted builtins
+BANNED_ATTRIBUTES = {'__builtins__', '__globals__', '__subclasses__', '__code__', '__import__'}
+
+
+class ValidationResult:
+    """Outcome of a single validation pass over a tool's source"""
+
+    def __init__(self, errors, warnings, has_execute_tool, imports, metrics):
+        self.errors = errors
+        self.warnings = warnings
+        self.has_execute_tool = has_execute_tool
+        self.imports = imports
+        self.metrics = metrics
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    @property
+    def message(self):
+        return self.errors[0] if self.errors else "Code validation passed"
+
+
+class _ToolCodeVisitor(ast.NodeVisitor):
+    def __init__(self):
+        self.errors = []
+        self.imports = set()
+        self.has_execute_tool = False
+        self.uses_st = False
+        self.uses_sidebar = False
+        self.node_count = 0
+        self.function_count = 0
+        self._function_depth = 0
+
+    def visit(self, node):
+        self.node_count += 1
+        return super().visit(node)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self._check_module(alias.name)
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        if node.module:
+            self._check_module(node.module)
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node):
+        self.function_count += 1
+        if node.name == 'execute_tool' and self._function_depth == 0:
+            self.has_execute_tool = True
+        self._function_depth += 1
+        self.generic_visit(node)
+        self._function_depth -= 1
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id in BANNED_CALLS:
+            self.errors.append(f"Code contains potentially dangerous operation: {node.func.id}() on line {node.lineno}")
+        elif isinstance(node.func, ast.Attribute) and node.func.attr in BANNED_METHODS:
+            self.errors.append(f"Code contains potentially dangerous operation: .{node.func.attr}() on line {node.lineno}")
+        self.generic_visit(node)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, str):
+            self._check_string(node.value, node.lineno)
+
+    def visit_BinOp(self, node):
+        # Names spelled in pieces, e.g. "__glob" + "als__"
+        value = _constant_string(node)
+        if value is not None:
+            self._check_string(value, node.lineno)
+            return
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node):
+        if node.attr in BANNED_ATTRIBUTES:
+            self.errors.append(f"Code contains potentially dangerous operation: .{node.attr} on line {node.lineno}")
+        elif node.attr == 'sidebar':
+            self.uses_sidebar = True
+        self.generic_visit(node)
+
+    def visit_Name(self, node):
+        if node.id == 'st':
+            self.uses_st = True
+        elif node.id in BANNED_ATTRIBUTES:
+            self.errors.append(f"Code contains potentially dangerous operation: {node.id} on line {node.lineno}")
+
+    def _check_string(self, value, lineno):
+        for name in BANNED_ATTRIBUTES:
+            if name in value:
+                self.errors.append(f"Code contains potentially dangerous operation: {name!r} on line {lineno}")
+                return
+
+    def _check_module(self, module):
+        root = module.split('.')[0]
+        self.imports.add(module)
+        if root in BANNED_MODULES:
+            self.errors.append(f"Code contains potentially dangerous operation: import {module}")
+
+
+def _constant_string(node):
+    """Value of a string literal or a +-concatenation of them, else None"""
+    if isinstance(node, ast.Constant):
+        return node.value if isinstance(node.value, str) else None
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _constant_string(node.left), _constant_string(node.right)
+        if left is not None and right is not None:
+            return left + right
+    return None
+
+
+def _validate(code):
+    if not code or not isinstance(code, str):
+        return ValidationResult(["No code to validate"], [], False, [], {})
+
+    metrics = {'size_bytes': len(code), 'lines': code.count('\n') + 1}
+
+    # Refuse oversized input before spending time parsing it
+    if len(code) > MAX_CODE_SIZE:
+        return ValidationResult(["Generated code is too long"], [], False, [], metrics)
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return ValidationResult([f"Syntax error: {str(e)}"], [], False, [], metrics)
+
+    visitor = _ToolCodeVisitor()
+    visitor.visit(tree)
+
+    errors = list(visitor.errors)
+    if not visitor.has_execute_tool:
+        errors.insert(0, "Code must contain an 'execute_tool()' function")
+
+    warnings = []
+    if visitor.uses_st and not any(module.split('.')[0] == 'streamlit' for module in visitor.imports):
+        warnings.append("Generated code uses Streamlit but doesn't import it (this might be intentional)")
+
+    metrics.update({
+        'nodes': visitor.node_count,
+        'functions': visitor.function_count,
+        'imports': len(visitor.imports),
+        'uses_sidebar': visitor.uses_sidebar,
+    })
+
+    return ValidationResult(errors, warnings, visitor.has_execute_tool, sorted(visitor.imports), metrics)
+
+
+_results = OrderedDict()
+_results_lock = threading.Lock()
+_MAX_RESULTS = 256
+
+
+def analyze_code(code):
+    """Validate tool code in one AST walk, memoized by content hash"""
+    if not isinstance(code, str):
+        return _validate(code)
+
+    digest = code_digest(code)
+    with _results_lock:
+        result = _results.get(digest)
+        if result is not None:
+            _results.move_to_end(digest)
+            return result
+
+    result = _validate(code)
+
+    with _results_lock:
+        _results[digest] = result
+        while len(_results) > _MAX_RESULTS:
+            _results.popitem(last=False)
+
+    return result
@@ -0,0 +1,85 @@
+import os
+
+# Directory for everything the app persists between restarts (caches, stores)
+DATA_DIR = os.getenv("FOCUS_BUILDER_DATA_DIR", ".focus_builder")
+
+
+def env_flag(name, default):
+    """Read a boolean feature switch from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off", "")
+
+
+def data_path(filename):
+    """Return a path inside DATA_DIR, creating the directory on first use"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, filename)
+
+
+# LLM response cache
+LLM_CACHE_ENABLED = env_flag("FOCUS_BUILDER_LLM_CACHE", True)
+LLM_CACHE_TTL_SECONDS = int(os.getenv("FOCUS_BUILDER_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("FOCUS_BUILDER_LLM_CACHE_MAX_ENTRIES", "2000"))
+
+# Requests at least this similar to a bundled template are served without the LLM
+TEMPLATE_MATCH_THRESHOLD = float(os.getenv("FOCUS_BUILDER_TEMPLATE_MATCH_THRESHOLD", "0.8"))
+
+# Headless smoke runs of generated tools before they are shown
+PREFLIGHT_ENABLED = env_flag("FOCUS_BUILDER_PREFLIGHT", True)
+PREFLIGHT_WORKERS = int(os.getenv("FOCUS_BUILDER_PREFLIGHT_WORKERS", "2"))
+PREFLIGHT_TIMEOUT_SECONDS = float(os.getenv("FOCUS_BUILDER_PREFLIGHT_TIMEOUT", "5"))
+PREFLIGHT_MEMORY_LIMIT_MB = int(os.getenv("FOCUS_BUILDER_PREFLIGHT_MEMORY_MB", "512"))
+
+# Per-tool tables kept loaded in memory across sessions (least recently used are dropped)
+TOOL_TABLES_IN_MEMORY = int(os.getenv("FOCUS_BUILDER_TOOL_TABLES_IN_MEMORY", "64"))
+
+# Append every telemetry span as a JSON line to this file (disabled when unset)
+TRACE_FILE = os.getenv("FOCUS_BUILDER_TRACE_FILE") or None
+
+# Import heavy libraries in a background thread when the app module first loads
+WARMUP_ENABLED = env_flag("FOCUS_BUILDER_WARMUP", True)
+
+# Shared OpenAI client: requests in flight, rate limits and retry backoff
+LLM_MAX_CONCURRENCY = int(os.getenv("FOCUS_BUILDER_LLM_MAX_CONCURRENCY", "8"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("FOCUS_BUILDER_LLM_RPM", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("FOCUS_BUILDER_LLM_TPM", "30000"))
+LLM_MAX_RETRIES = int(os.getenv("FOCUS_BUILDER_LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("FOCUS_BUILDER_LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("FOCUS_BUILDER_LLM_BACKOFF_MAX", "30"))
+
+# Largest prompt (system + user, in tokens) each LLM stage may send
+PROMPT_TOKEN_BUDGETS = {
+    "specification": 1500,
+    "code": 2500,
+    "improve": 4000,
+    "improve_full": 8000,
+    "repair": 2000,
+}
+# Stages with no smaller prompt to fall back to; over budget they log a warning and send anyway
+ADVISORY_BUDGET_STAGES = {"improve_full", "repair"}
+
+# Compile regular specs straight to code; the LLM writes code only for the rest
+SPEC_COMPILER_ENABLED = env_flag("FOCUS_BUILDER_SPEC_COMPILER", True)
+
+# Run each generated tool in a Streamlit fragment so its widgets rerun only the tool
+TOOL_FRAGMENTS_ENABLED = env_flag("FOCUS_BUILDER_TOOL_FRAGMENTS", True)
+
+# Results memoized by generated tools through `tool_cache`: bytes per tool, and tools kept
+TOOL_CACHE_MAX_MB_PER_TOOL = int(os.getenv("FOCUS_BUILDER_TOOL_CACHE_MB", "32"))
+TOOL_CACHE_MAX_TOOLS = int(os.getenv("FOCUS_BUILDER_TOOL_CACHE_TOOLS", "64"))
+
+# Seconds between checks for edited template files (0 loads templates once and never reloads)
+TEMPLATE_RELOAD_SECONDS = float(os.getenv("FOCUS_BUILDER_TEMPLATE_RELOAD", "2"))
+
+# Generated code scoring below this on the static performance lint gets one regeneration pass that
+# feeds the findings back to the model (off by default: it costs an extra LLM call)
+PERF_LINT_REGENERATE = env_flag("FOCUS_BUILDER_PERF_LINT_REGENERATE", False)
+PERF_LINT_MIN_SCORE = int(os.getenv("FOCUS_BUILDER_PERF_LINT_MIN_SCORE", "70"))
+
+# Targeted LLM fixes tried on generated code that fails validation or its preflight run (0 disables)
+CODE_REPAIR_MAX_ATTEMPTS = int(os.getenv("FOCUS_BUILDER_CODE_REPAIR_ATTEMPTS", "2"))
+
+# Token that shows the Metrics page to visitors whose URL has ?admin=<token> (hidden from everyone when unset)
+ADMIN_TOKEN = os.getenv("FOCUS_BUILDER_ADMIN_TOKEN") or None
@@ -0,0 +1,305 @@
+import random
+import threading
+import time
+from collections import deque
+
+import config
+from telemetry import span
+
+# Responses worth retrying: rate limiting and transient server-side failures
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Completion budget assumed for rate limiting when a request sets no max_tokens
+DEFAULT_COMPLETION_ESTIMATE = 1000
+
+
+def estimate_request_tokens(messages, max_tokens=None):
+    """Rough token cost of a request, charged against the tokens-per-minute budget"""
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // 4 + (max_tokens or DEFAULT_COMPLETION_ESTIMATE)
+
+
+class RateLimiter:
+    """Token buckets for requests per minute and tokens per minute.
+
+    Both buckets refill continuously and start full. `acquire` blocks until
+    one request and `tokens` tokens are available in the respective buckets.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.request_capacity = float(requests_per_minute)
+        self.token_capacity = float(tokens_per_minute)
+        self._requests = self.request_capacity
+        self._tokens = self.token_capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.request_capacity, self._requests + elapsed * self.request_capacity / 60)
+        self._tokens = min(self.token_capacity, self._tokens + elapsed * self.token_capacity / 60)
+
+    def acquire(self, tokens):
+        """Block until the request fits in both budgets; return the seconds waited"""
+        # A request larger than the whole bucket waits for a full bucket instead of forever
+        tokens = min(tokens, self.token_capacity)
+        started = time.monotonic()
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return now - started
+
+                request_wait = (1 - self._requests) * 60 / self.request_capacity
+                token_wait = (tokens - self._tokens) * 60 / self.token_capacity
+                delay = max(request_wait, token_wait, 0.001)
+
+            time.sleep(min(delay, 1.0))
+
+    def adjust(self, tokens):
+        """Correct the token bucket once actual usage is known (negative refunds)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.token_capacity, self._tokens - tokens)
+
+    def penalize(self, seconds):
+        """Drain both buckets as if the next `seconds` had already been spent"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._requests = min(self._requests, -seconds * self.request_capacity / 60)
+            self._tokens = min(self._tokens, -seconds * self.token_capacity / 60)
+
+
+class LLMClient:
+    """Process-wide OpenAI client shared by every session.
+
+    One keep-alive connection pool, a bounded number of requests in flight,
+    RPM/TPM rate limiting and jittered exponential backoff on 429s and 5xx
+    responses. The SDK's own retries are disabled so every attempt passes
+    through the limiter.
+    """
+
+    def __init__(self, api_key=None, max_concurrency=8, requests_per_minute=500,
+                 tokens_per_minute=30000, max_retries=4, backoff_base=1.0, backoff_max=30.0):
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._peak_waiting = 0
+        self._waits = deque(maxlen=1000)
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+
+    @property
+    def client(self):
+        # Imported on first use so app startup never pays for openai. The SDK's
+        # keep-alive pool is shared by every thread; the semaphore bounds its use.
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    def create(self, **params):
+        """`chat.completions.create` behind the shared limits.
+
+        For `stream=True` the concurrency slot is held until the returned
+        iterator is exhausted or closed.
+        """
+        estimate = estimate_request_tokens(params.get("messages", []), params.get("max_tokens"))
+
+        with span("llm.wait") as trace:
+            started = time.perf_counter()
+            trace.set(queue_depth=self._acquire_slot())
+            try:
+                self.limiter.acquire(estimate)
+            except BaseException:
+                self._release_slot()
+                raise
+        self._record_wait(time.perf_counter() - started)
+
+        try:
+            response = self._create_with_retry(estimate, params)
+        except BaseException:
+            self._release_slot()
+            raise
+
+        if params.get("stream"):
+            return _SlotStream(response, lambda usage: self._finish(estimate, usage))
+
+        self._finish(estimate, response.usage)
+        return response
+
+    def _acquire_slot(self):
+        """Wait for a concurrency slot; return the queue depth on arrival"""
+        depth = self._enter_queue()
+        try:
+            self._slots.acquire()
+        finally:
+            self._leave_queue()
+        return depth
+
+    def _enter_queue(self):
+        with self._stats_lock:
+            self._waiting += 1
+            self._peak_waiting = max(self._peak_waiting, self._waiting)
+            return self._waiting
+
+    def _leave_queue(self):
+        with self._stats_lock:
+            self._waiting -= 1
+            self._in_flight += 1
+
+    def _record_wait(self, seconds):
+        with self._stats_lock:
+            self._waits.append(seconds)
+
+    def _release_slot(self):
+        with self._stats_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _create_with_retry(self, estimate, params):
+        from openai import APIConnectionError, APIStatusError
+
+        attempt = 0
+        while True:
+            # The first attempt was admitted by create(); retries queue again
+            if attempt:
+                self.limiter.acquire(estimate)
+            with self._stats_lock:
+                self.requests += 1
+
+            try:
+                return self.client.chat.completions.create(**params)
+            except (APIStatusError, APIConnectionError) as e:
+                status = getattr(e, "status_code", None)
+                retryable = status is None or status in RETRY_STATUS_CODES
+                if not retryable or attempt >= self.max_retries:
+                    with self._stats_lock:
+                        self.failures += 1
+                    raise
+
+                delay = self._backoff_delay(attempt, e)
+                with self._stats_lock:
+                    self.retries += 1
+                    if status == 429:
+                        self.throttled += 1
+                if status == 429:
+                    # Hold back every session, not just the one that was told to slow down
+                    self.limiter.penalize(delay)
+                # Let other requests use the slot while this one backs off; it queues again for the retry
+                self._release_slot()
+                try:
+                    time.sleep(delay)
+                finally:
+                    self._acquire_slot()
+                attempt += 1
+
+    def _backoff_delay(self, attempt, error):
+        """Full-jitter exponential backoff, never shorter than a server Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after", 0))
+            except (TypeError, ValueError):
+                retry_after = 0
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def _finish(self, estimate, usage):
+        """Free the slot and settle the estimated token charge against actual usage"""
+        self._release_slot()
+        if usage is not None:
+            self.limiter.adjust(usage.total_tokens - min(estimate, self.limiter.token_capacity))
+
+    def stats(self):
+        with self._stats_lock:
+            waits = sorted(self._waits)
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "queue_depth": self._waiting,
+                "peak_queue_depth": self._peak_waiting,
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "failures": self.failures,
+                "wait_p50_ms": waits[len(waits) // 2] * 1000 if waits else 0.0,
+                "wait_p95_ms": waits[int(len(waits) * 0.95)] * 1000 if waits else 0.0,
+            }
+
+
+class _SlotStream:
+    """Streaming response that frees its concurrency slot exactly once,
+    when iteration ends, when closed, or when dropped unread"""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+        self.usage = None
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                # The final chunk carries usage when stream_options asks for it
+                if getattr(chunk, "usage", None) is not None:
+                    self.usage = chunk.usage
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        """Close the underlying response, so its connection is not left half read, and free the slot"""
+        if not self._closed:
+            self._closed = True
+            try:
+                close = getattr(self._stream, "close", None)
+                if close is not None:
+                    close()
+            finally:
+                self._on_close(self.usage)
+
+    def __del__(self):
+        self.close()
+
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client(api_key=None):
+    """Return the client shared by every session in this process"""
+    global _llm_client
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = LLMClient(
+                    api_key=api_key,
+                    max_concurrency=config.LLM_MAX_CONCURRENCY,
+                    requests_per_minute=config.LLM_REQUESTS_PER_MINUTE,
+                    tokens_per_minute=config.LLM_TOKENS_PER_MINUTE,
+                    max_retries=config.LLM_MAX_RETRIES,
+                    backoff_base=config.LLM_BACKOFF_BASE_SECONDS,
+                    backoff_max=config.LLM_BACKOFF_MAX_SECONDS,
+                )
+    return _llm_client
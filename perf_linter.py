@@ -0,0 +1,335 @@
+import ast
+import threading
+from collections import OrderedDict
+
+from code_cache import code_digest
+
+# Points each finding takes off a perfect score of 100
+RULE_WEIGHTS = {
+    'frame-in-loop': 15,
+    'figure-in-loop': 15,
+    'nested-session-scan': 15,
+    'rerun-in-loop': 20,
+    'widgets-per-row': 10,
+    'import-in-hot-path': 5,
+}
+
+# How to fix each rule, appended to the findings fed back to the model
+RULE_FIXES = {
+    'frame-in-loop': "build one DataFrame before the loop (tool_table(...).frame()) and use vectorized pandas operations",
+    'figure-in-loop': "build one figure with one trace per group, or move the builder into a @tool_cache function",
+    'nested-session-scan': "index the inner list once (a dict by id, or tool_table with create_index/lookup) "
+                           "instead of scanning it for every outer item",
+    'rerun-in-loop': "apply every change first, then call st.rerun() once after the loop",
+    'widgets-per-row': "show the rows in ui.table_editor(...) or st.data_editor instead of widgets per row",
+    'import-in-hot-path': "import once at the top of execute_tool()",
+}
+
+# Streamlit calls that create one widget each, on `st` or on any container
+WIDGET_CALLS = {
+    'button', 'checkbox', 'toggle', 'radio', 'selectbox', 'multiselect', 'slider', 'select_slider',
+    'text_input', 'text_area', 'number_input', 'date_input', 'time_input', 'color_picker',
+    'file_uploader', 'download_button', 'form_submit_button', 'data_editor',
+}
+
+FRAME_CALLS = {'DataFrame', 'Series', 'concat', 'merge', 'pivot_table', 'crosstab'}
+FIGURE_CALLS = {'Figure', 'make_subplots'}
+
+# Loops over at most this many constant items are treated as bounded
+MAX_BOUNDED_ITEMS = 50
+
+# Builtins that pass an iterable through without changing what is iterated
+_PASSTHROUGH_CALLS = {'enumerate', 'zip', 'sorted', 'reversed', 'list', 'tuple', 'set', 'dict'}
+_VIEW_METHODS = {'items', 'values', 'keys', 'get', 'setdefault', 'copy'}
+
+
+class Finding:
+    """One rerun hot spot found in tool code"""
+
+    def __init__(self, rule, line, message):
+        self.rule = rule
+        self.line = line
+        self.message = message
+
+    @property
+    def weight(self):
+        return RULE_WEIGHTS[self.rule]
+
+    def __str__(self):
+        return f"Line {self.line}: {self.message}"
+
+
+class PerfReport:
+    """Findings of one lint pass and the score they leave out of 100"""
+
+    def __init__(self, findings):
+        self.findings = findings
+        self.score = max(0, 100 - sum(finding.weight for finding in findings))
+
+    @property
+    def rules(self):
+        return sorted({finding.rule for finding in self.findings})
+
+    def feedback(self):
+        """Improvement request asking the model to fix the findings without changing behaviour"""
+        lines = [
+            "Make this tool fast on every Streamlit rerun without changing what it does or the data it keeps.",
+            "Fix these performance problems:",
+        ]
+        lines.extend(f"- line {finding.line}: {finding.message}; {RULE_FIXES[finding.rule]}" for finding in self.findings)
+        return "\n".join(lines)
+
+
+class _Loop:
+    def __init__(self, node, bounded):
+        self.node = node
+        self.bounded = bounded
+
+
+class _PerfVisitor(ast.NodeVisitor):
+    def __init__(self):
+        self.findings = []
+        # Local name -> dotted module or module attribute it was imported as
+        self.aliases = {'st': 'streamlit', 'pd': 'pandas', 'px': 'plotly.express', 'go': 'plotly.graph_objects'}
+        self.session_names = {'tool_data'}
+        self.bounded_names = set()
+        self._loops = []
+        self._functions = []
+        self._flagged = set()
+
+    # Scopes
+
+    def visit_FunctionDef(self, node):
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        # A function defined in a loop runs when called, not once per iteration
+        loops, self._loops = self._loops, []
+        self._functions.append(node)
+        for statement in node.body:
+            self.visit(statement)
+        self._functions.pop()
+        self._loops = loops
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        loops, self._loops = self._loops, []
+        self.visit(node.body)
+        self._loops = loops
+
+    def visit_For(self, node):
+        self.visit(node.iter)
+        self.visit(node.target)
+        self._enter_loop(node, node.iter)
+        for statement in node.body:
+            self.visit(statement)
+        self._loops.pop()
+        for statement in node.orelse:
+            self.visit(statement)
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node):
+        self.visit(node.test)
+        self._enter_loop(node, None)
+        for statement in node.body:
+            self.visit(statement)
+        self._loops.pop()
+        for statement in node.orelse:
+            self.visit(statement)
+
+    def _visit_comprehension(self, node, results):
+        # The first iterable is evaluated once, outside the comprehension's loop
+        for generator in node.generators:
+            self.visit(generator.iter)
+            self._enter_loop(node, generator.iter)
+            for condition in generator.ifs:
+                self.visit(condition)
+        for result in results:
+            self.visit(result)
+        for _ in node.generators:
+            self._loops.pop()
+
+    def visit_ListComp(self, node):
+        self._visit_comprehension(node, [node.elt])
+
+    visit_SetComp = visit_GeneratorExp = visit_ListComp
+
+    def visit_DictComp(self, node):
+        self._visit_comprehension(node, [node.key, node.value])
+
+    def _enter_loop(self, node, iterable):
+        # Scans inside a small fixed loop (columns, a literal list) cost a few passes, not one per row
+        outer_unbounded = any(not loop.bounded for loop in self._loops)
+        if outer_unbounded and iterable is not None and self._is_session_data(iterable):
+            self._report(
+                'nested-session-scan', node,
+                f"loop over {ast.unparse(iterable)} runs once per item of an outer loop over rows",
+            )
+        self._loops.append(_Loop(node, iterable is not None and self._is_bounded(iterable)))
+
+    # Names
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.aliases[alias.asname or alias.name.split('.')[0]] = alias.name if alias.asname else alias.name.split('.')[0]
+        self._check_import(node)
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}" if node.module else alias.name
+        self._check_import(node)
+
+    def visit_Assign(self, node):
+        self.visit(node.value)
+        for target in node.targets:
+            self.visit(target)
+            names = [target] if isinstance(target, ast.Name) else getattr(target, 'elts', [])
+            for name in names:
+                if not isinstance(name, ast.Name):
+                    continue
+                if self._is_session_data(node.value):
+                    self.session_names.add(name.id)
+                if self._is_bounded(node.value):
+                    self.bounded_names.add(name.id)
+
+    # Calls
+
+    def visit_Call(self, node):
+        module, attr = self._resolve(node.func)
+        if self._loops:
+            if module == 'pandas' and attr in FRAME_CALLS:
+                self._report('frame-in-loop', node, f"pandas {attr}() is built on every loop iteration")
+            elif module and module.startswith('plotly') and (module == 'plotly.express' or attr in FIGURE_CALLS):
+                self._report('figure-in-loop', node, f"a plotly figure ({attr}) is built on every loop iteration")
+            elif isinstance(node.func, ast.Attribute) and node.func.attr in ('rerun', 'experimental_rerun'):
+                self._report('rerun-in-loop', node, "st.rerun() is called inside a loop")
+            elif isinstance(node.func, ast.Attribute) and node.func.attr in WIDGET_CALLS:
+                loop = next((loop for loop in reversed(self._loops) if not loop.bounded), None)
+                if loop is not None and id(loop.node) not in self._flagged:
+                    self._flagged.add(id(loop.node))
+                    self._report(
+                        'widgets-per-row', node,
+                        f"st.{node.func.attr}() creates a widget for every row of an unbounded loop",
+                    )
+        self.generic_visit(node)
+
+    def _check_import(self, node):
+        if self._loops:
+            self._report('import-in-hot-path', node, "import statement inside a loop")
+            return
+        function = self._functions[-1] if self._functions else None
+        # Helpers nested in execute_tool run on every call; cached ones only on a miss
+        if function is not None and len(self._functions) > 1 and not function.decorator_list \
+                and id(function) not in self._flagged:
+            self._flagged.add(id(function))
+            self._report('import-in-hot-path', node, f"import inside helper {function.name}() runs on every call")
+
+    def _report(self, rule, node, message):
+        self.findings.append(Finding(rule, getattr(node, 'lineno', 0), message))
+
+    # Expression helpers
+
+    def _resolve(self, func):
+        """(module, attribute) a call refers to, e.g. ('pandas', 'DataFrame') for pd.DataFrame"""
+        if isinstance(func, ast.Name):
+            dotted = self.aliases.get(func.id)
+            if dotted and '.' in dotted:
+                module, _, attr = dotted.rpartition('.')
+                return module, attr
+            return None, func.id
+        if isinstance(func, ast.Attribute):
+            parts = [func.attr]
+            value = func.value
+            while isinstance(value, ast.Attribute):
+                parts.append(value.attr)
+                value = value.value
+            if isinstance(value, ast.Name) and value.id in self.aliases:
+                parts.append(self.aliases[value.id])
+                parts.reverse()
+                return '.'.join(parts[:-1]), parts[-1]
+        return None, None
+
+    def _unwrap(self, node):
+        while isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _PASSTHROUGH_CALLS \
+                and node.args:
+            node = node.args[0]
+        return node
+
+    def _is_session_data(self, node):
+        """Whether an expression is a container kept in st.session_state (or a view of one)"""
+        node = self._unwrap(node)
+        while True:
+            if isinstance(node, ast.Name):
+                return node.id in self.session_names
+            if isinstance(node, ast.Attribute):
+                if node.attr == 'session_state':
+                    return True
+                node = node.value
+            elif isinstance(node, ast.Subscript):
+                node = node.value
+            elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in _VIEW_METHODS:
+                node = node.func.value
+            else:
+                return False
+
+    def _is_bounded(self, node):
+        """Whether a loop over this expression has a small, fixed number of items"""
+        node = self._unwrap(node)
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return len(node.elts) <= MAX_BOUNDED_ITEMS
+        if isinstance(node, ast.Dict):
+            return len(node.keys) <= MAX_BOUNDED_ITEMS
+        if isinstance(node, ast.Name):
+            return node.id in self.bounded_names
+        if isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name) and node.func.id == 'range':
+                if all(isinstance(arg, ast.Constant) and isinstance(arg.value, int) for arg in node.args):
+                    return len(range(*[arg.value for arg in node.args])) <= MAX_BOUNDED_ITEMS
+                return False
+            if isinstance(node.func, ast.Attribute):
+                if node.func.attr in ('columns', 'tabs'):
+                    return True
+                if node.func.attr in _VIEW_METHODS:
+                    return self._is_bounded(node.func.value)
+        return False
+
+
+def _lint(code):
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return PerfReport([])
+    visitor = _PerfVisitor()
+    visitor.visit(tree)
+    return PerfReport(sorted(visitor.findings, key=lambda finding: finding.line))
+
+
+_reports = OrderedDict()
+_reports_lock = threading.Lock()
+_MAX_REPORTS = 256
+
+
+def lint_performance(code):
+    """Score tool code for rerun hot spots in one AST walk, memoized by content hash.
+
+    Code that does not parse gets an empty report; analyze_code() reports it.
+    """
+    if not isinstance(code, str):
+        return PerfReport([])
+
+    digest = code_digest(code)
+    with _reports_lock:
+        report = _reports.get(digest)
+        if report is not None:
+            _reports.move_to_end(digest)
+            return report
+
+    report = _lint(code)
+
+    with _reports_lock:
+        _reports[digest] = report
+        while len(_reports) > _MAX_REPORTS:
+            _reports.popitem(last=False)
+
+    return report
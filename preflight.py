@@ -0,0 +1,367 @@
+import atexit
+import builtins
+import contextlib
+import importlib
+import io
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from datetime import date, datetime
+
+import config
+from tool_cache import ToolCache, ToolCacheScope
+from tool_components import ToolComponents
+from tool_tables import ToolTableSet
+
+# Imported once per worker so each smoke run starts warm
+PRELOADED_MODULES = ("numpy", "pandas", "plotly.express", "plotly.graph_objects")
+
+
+class _StopTool(Exception):
+    """Raised by st.stop() and st.rerun() to end a smoke run early"""
+
+
+class _Stub:
+    """Permissive stand-in for whatever a Streamlit call returns"""
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, name):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+    def __bool__(self):
+        return False
+
+
+class StubSessionState(dict):
+    """Dict with attribute access, like st.session_state"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(f"st.session_state has no attribute \"{name}\"")
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        try:
+            del self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class StubStreamlit:
+    """Headless `streamlit` module: widgets return their defaults, display calls do nothing"""
+
+    def __init__(self):
+        self.__name__ = "streamlit"
+        self.reset()
+
+    def reset(self):
+        self.session_state = StubSessionState()
+        self.query_params = {}
+        self.secrets = {}
+
+    # Layout containers resolve back to the module so `col.button(...)` behaves like `st.button(...)`
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        return _Stub()
+
+    @property
+    def sidebar(self):
+        return self
+
+    def columns(self, spec, **kwargs):
+        count = spec if isinstance(spec, int) else len(spec)
+        return [self] * count
+
+    def tabs(self, labels, **kwargs):
+        return [self] * len(labels)
+
+    def container(self, *args, **kwargs):
+        return self
+
+    expander = form = popover = status = spinner = empty = chat_message = container
+
+    def stop(self):
+        raise _StopTool()
+
+    def rerun(self, *args, **kwargs):
+        raise _StopTool()
+
+    def _passthrough_decorator(self, func=None, **kwargs):
+        if func is None:
+            return lambda f: f
+        return func
+
+    cache_data = cache_resource = fragment = _passthrough_decorator
+
+    def text_input(self, label, value="", *args, **kwargs):
+        return "" if value is None else value
+
+    text_area = text_input
+
+    def number_input(self, label, min_value=None, max_value=None, value="min", *args, **kwargs):
+        if value not in ("min", None):
+            return value
+        return min_value if min_value is not None else 0
+
+    def slider(self, label, min_value=None, max_value=None, value=None, *args, **kwargs):
+        if value is not None:
+            return value
+        return min_value if min_value is not None else 0
+
+    select_slider = slider
+
+    def selectbox(self, label, options=(), index=0, *args, **kwargs):
+        options = list(options)
+        if not options or index is None:
+            return None
+        return options[index]
+
+    radio = selectbox
+
+    def multiselect(self, label, options=(), default=None, *args, **kwargs):
+        if default is None:
+            return []
+        return list(default) if isinstance(default, (list, tuple)) else [default]
+
+    def checkbox(self, label, value=False, *args, **kwargs):
+        return value
+
+    toggle = checkbox
+
+    def button(self, *args, **kwargs):
+        return False
+
+    form_submit_button = download_button = link_button = button
+
+    def date_input(self, label, value="today", *args, **kwargs):
+        if value in ("today", "default_value_today", None):
+            return date.today()
+        return value
+
+    def time_input(self, label, value="now", *args, **kwargs):
+        if value in ("now", None):
+            return datetime.now().time()
+        return value
+
+    def color_picker(self, label, value=None, *args, **kwargs):
+        return value or "#000000"
+
+    def file_uploader(self, *args, **kwargs):
+        return None
+
+    camera_input = chat_input = file_uploader
+
+    def data_editor(self, data, *args, **kwargs):
+        return data
+
+
+class PreflightResult:
+    def __init__(self, ok, error=None, traceback=None, runtime=0.0):
+        self.ok = ok
+        self.error = error
+        self.traceback = traceback
+        self.runtime = runtime
+
+
+def _apply_memory_limit(memory_limit_mb):
+    """Cap further address space growth at memory_limit_mb beyond what is mapped now"""
+    try:
+        import resource
+        with open("/proc/self/statm") as statm:
+            mapped = int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (ImportError, OSError, ValueError):
+        return
+
+    limit = mapped + memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _run_tool(stub, tool_code):
+    stub.reset()
+    tables = ToolTableSet(None, None)
+    # Private to this run, so preflight never fills the shared cache
+    cache = ToolCacheScope(ToolCache(8 * 1024 * 1024, 1), None, None, tables)
+    exec_globals = {
+        'st': stub,
+        '__builtins__': builtins,
+        'tool_data': {},
+        'tool_table': tables,
+        'tool_cache': cache,
+        'ui': ToolComponents(stub, cache)
+    }
+
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            exec(compile(tool_code, "<preflight>", "exec"), exec_globals)
+            if 'execute_tool' not in exec_globals:
+                raise NameError("Generated code must contain an 'execute_tool()' function.")
+            try:
+                exec_globals['execute_tool']()
+            except _StopTool:
+                pass
+    except BaseException as e:
+        return {
+            'ok': False,
+            'error': f"{type(e).__name__}: {e}",
+            'traceback': traceback.format_exc(),
+            'runtime': time.perf_counter() - started,
+            'fatal': isinstance(e, MemoryError)
+        }
+
+    return {'ok': True, 'runtime': time.perf_counter() - started}
+
+
+def _worker_main(conn, memory_limit_mb):
+    stub = StubStreamlit()
+    sys.modules['streamlit'] = stub
+    for module in PRELOADED_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    _apply_memory_limit(memory_limit_mb)
+    conn.send("ready")
+
+    while True:
+        try:
+            tool_code = conn.recv()
+        except EOFError:
+            break
+        if tool_code is None:
+            break
+
+        result = _run_tool(stub, tool_code)
+        conn.send(result)
+        if result.get('fatal'):
+            break
+
+
+class _Worker:
+    def __init__(self, context, memory_limit_mb):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_mb),
+            name="preflight-worker",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def wait_ready(self, timeout):
+        if not self.ready:
+            if not self.conn.poll(timeout):
+                raise TimeoutError("Preflight worker did not start in time")
+            self.conn.recv()
+            self.ready = True
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class PreflightPool:
+    """Warm worker processes that smoke-run generated tools against a stub Streamlit"""
+
+    def __init__(self, size=2, timeout=5.0, memory_limit_mb=512, startup_timeout=60.0):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.startup_timeout = startup_timeout
+        # Spawn rather than fork: the Streamlit server is multi-threaded
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        return _Worker(self._context, self.memory_limit_mb)
+
+    def run(self, tool_code):
+        """Smoke-run execute_tool() headlessly and report pass/fail"""
+        worker = self._idle.get()
+        replace = False
+        try:
+            worker.wait_ready(self.startup_timeout)
+            worker.conn.send(tool_code)
+            if not worker.conn.poll(self.timeout):
+                replace = True
+                return PreflightResult(False, f"Tool did not finish within {self.timeout:.0f}s", runtime=self.timeout)
+
+            result = worker.conn.recv()
+            replace = result.get('fatal', False)
+            return PreflightResult(result['ok'], result.get('error'), result.get('traceback'), result['runtime'])
+
+        except (EOFError, OSError, TimeoutError) as e:
+            replace = True
+            return PreflightResult(False, f"Preflight worker failed: {e}")
+        finally:
+            if replace:
+                worker.stop()
+                worker = self._spawn()
+            self._idle.put(worker)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.stop()
+
+
+_preflight_pool = None
+_preflight_pool_lock = threading.Lock()
+
+
+def get_preflight_pool():
+    """Return the process-wide pool, starting its workers on first use"""
+    global _preflight_pool
+    with _preflight_pool_lock:
+        if _preflight_pool is None:
+            _preflight_pool = PreflightPool(
+                size=config.PREFLIGHT_WORKERS,
+                timeout=config.PREFLIGHT_TIMEOUT_SECONDS,
+                memory_limit_mb=config.PREFLIGHT_MEMORY_LIMIT_MB
+            )
+            atexit.register(_preflight_pool.close)
+        return _preflight_pool
@@ -0,0 +1,79 @@
+import logging
+import math
+import re
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_PIECE_RE = re.compile(r"[^\W\d_]+|\d+|\s+|(?:[^\w\s]|_)+")
+
+_encoding = None
+_encoding_loaded = False
+
+
+class PromptBudgetExceeded(ValueError):
+    """A prompt is larger than the input budget configured for its stage"""
+
+
+def _tiktoken_encoding():
+    """The gpt-4o tokenizer when tiktoken is installed and its vocabulary is available"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            # Not installed, or the vocabulary cannot be downloaded (offline)
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text):
+    """Count tokens exactly with tiktoken, or estimate them from the text's pieces.
+
+    The estimate mirrors how BPE vocabularies split text: common words are one
+    token (longer ones a few), a single space merges into the following word,
+    and runs of punctuation, digits or indentation take a token per few
+    characters.
+    """
+    if not text:
+        return 0
+
+    encoding = _tiktoken_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece == " ":
+            continue
+        if piece[0].isalpha():
+            tokens += 1 + (len(piece) - 1) // 7
+        elif piece[0].isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif piece[0].isspace():
+            tokens += 1
+        else:
+            tokens += math.ceil(len(piece) / 2)
+    return tokens
+
+
+def stage_budget(stage):
+    return config.PROMPT_TOKEN_BUDGETS.get(stage)
+
+
+def check_budget(stage, *texts):
+    """Return the input tokens of a prompt, raising if they exceed the stage's budget.
+
+    Stages in config.ADVISORY_BUDGET_STAGES log a warning and go ahead instead.
+    """
+    tokens = sum(count_tokens(text) for text in texts)
+    budget = stage_budget(stage)
+    if budget is not None and tokens > budget:
+        message = f"The {stage} prompt needs about {tokens} input tokens, more than its budget of {budget}"
+        if stage not in config.ADVISORY_BUDGET_STAGES:
+            raise PromptBudgetExceeded(message)
+        logger.warning("%s; sending it anyway", message)
+    return tokens
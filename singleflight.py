@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+class FlightAbandoned(Exception):
+    """Raised from `publish` inside a streamed call once every caller has stopped listening"""
+
+
+class _Flight:
+    def __init__(self, future=None):
+        self.future = future
+        self.waiters = 0
+        # Streamed calls: the latest published value, how many have been published, and who to wake
+        self.latest = None
+        self.version = 0
+        self.updated = threading.Condition()
+        self.abandoned = False
+
+    def publish(self, value):
+        if self.abandoned:
+            raise FlightAbandoned()
+        with self.updated:
+            self.latest = value
+            self.version += 1
+            self.updated.notify_all()
+
+    def finish(self):
+        with self.updated:
+            self.updated.notify_all()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key starts `fn` on a background thread; callers
+    arriving while it runs wait for the same result. A waiter that gives up
+    (timeout or an exception raised into its thread) only withdraws itself:
+    the call keeps running for the others, and is cancelled only if nobody
+    is left waiting before it has started. stream() does the same for calls
+    that publish partial results, such as streamed completions.
+    """
+
+    def __init__(self, max_workers=16):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="singleflight")
+        self._flights = {}
+        # Re-entrant: cancelling a future runs its done callback while we hold the lock
+        self._lock = threading.RLock()
+        self.executions = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def do(self, key, fn, timeout=None):
+        """Return (result, shared); `shared` is True when another caller's call was reused"""
+        with self._lock:
+            flight = self._flights.get(key)
+            shared = flight is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                flight = _Flight(self._executor.submit(fn))
+                self._flights[key] = flight
+                self.executions += 1
+                flight.future.add_done_callback(lambda _, key=key, flight=flight: self._land(key, flight))
+            flight.waiters += 1
+
+        try:
+            return flight.future.result(timeout=timeout), shared
+        except FutureTimeoutError:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for a shared request") from None
+        finally:
+            self._leave(flight)
+
+    def stream(self, key, fn, on_update=None):
+        """Return (result, shared) like do(), for a call that publishes partial results.
+
+        `fn(publish)` runs once per key and calls publish(value) with each
+        partial result. Every caller's `on_update` gets the published values
+        in order; callers that join late start from the latest one. When all
+        callers have stopped listening, the next publish raises
+        FlightAbandoned so `fn` can close what it is reading.
+        """
+        key = ("stream", key)
+        with self._lock:
+            flight = self._flights.get(key)
+            shared = flight is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                flight = _Flight()
+                flight.future = self._executor.submit(fn, flight.publish)
+                self._flights[key] = flight
+                self.executions += 1
+                flight.future.add_done_callback(lambda _, key=key, flight=flight: self._land(key, flight))
+            flight.waiters += 1
+
+        try:
+            seen = 0
+            while True:
+                with flight.updated:
+                    while flight.version == seen and not flight.future.done():
+                        flight.updated.wait()
+                    version, latest, done = flight.version, flight.latest, flight.future.done()
+                if version != seen:
+                    seen = version
+                    if on_update is not None:
+                        on_update(latest)
+                elif done:
+                    return flight.future.result(), shared
+        finally:
+            self._leave(flight, key)
+
+    def _leave(self, flight, key=None):
+        with self._lock:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.future.done():
+                if flight.future.cancel():
+                    self.abandoned += 1
+                elif key is not None and not flight.abandoned:
+                    # A running stream is stopped at its next publish; new callers start their own
+                    flight.abandoned = True
+                    self.abandoned += 1
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+
+    def _land(self, key, flight):
+        with self._lock:
+            # A later flight may already hold the key if this one was cancelled
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.finish()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "abandoned": self.abandoned,
+            }
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight():
+    """Return the coalescing layer shared by every session in this process"""
+    return _single_flight
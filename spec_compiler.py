@@ -0,0 +1,583 @@
+import re
+import threading
+from collections import Counter
+
+from code_validator import analyze_code
+
+# Spec field types the compiler knows how to collect, store and chart
+FIELD_TYPES = {
+    "string": "text", "str": "text", "text": "text",
+    "number": "number", "integer": "number", "int": "number", "float": "number",
+    "decimal": "number", "currency": "number",
+    "date": "date", "datetime": "date",
+    "boolean": "boolean", "bool": "boolean",
+    "select": "select", "enum": "select", "category": "select",
+}
+
+MAX_FIELDS = 12
+
+# Words an interaction or feature may use to ask for an operation the templates implement.
+# Loose verbs such as "track", "set", "view" or "check" are left out: they cover too much the templates do not do
+OPERATION_WORDS = {
+    "add": "create", "create": "create", "log": "create", "logging": "create", "record": "create",
+    "enter": "create", "input": "create", "new": "create", "form": "create",
+    "edit": "edit", "editing": "edit", "update": "edit", "modify": "edit", "change": "edit",
+    "delete": "delete", "deletion": "delete", "remove": "delete",
+    "filter": "filter", "filtering": "filter", "search": "filter", "find": "filter",
+    "sort": "sort", "sorting": "sort",
+    "export": "export", "download": "export", "csv": "export",
+    "display": "read", "show": "read", "list": "read", "browse": "read", "table": "read", "history": "read",
+}
+
+# Words that ask for nothing on their own
+FILLER_WORDS = {
+    "a", "an", "the", "my", "your", "our", "their", "its", "it", "them", "this", "that", "these", "those",
+    "each", "every", "all", "any", "one", "multiple", "existing", "and", "or", "of", "to", "for", "by",
+    "per", "with", "in", "on", "from", "into", "as", "entry", "entries", "item", "items", "record",
+    "records", "row", "rows", "data", "details",
+}
+
+# Words a visualization description may use for what its template renders
+TABLE_WORDS = {"table", "list", "history", "log", "overview"}
+CHART_WORDS = {
+    "chart", "graph", "plot", "bar", "line", "pie", "histogram", "distribution", "breakdown", "trend",
+    "over", "time", "daily", "weekly", "monthly", "history", "timeline", "count", "number", "total", "amount",
+}
+METRIC_WORDS = {"count", "number", "overall"}
+# Metrics total the number fields
+TOTAL_WORDS = {"total", "sum", "amount"}
+# Charts split by a yes/no field; metrics and the progress bar also show its rate
+COMPLETION_WORDS = {"completion", "completed", "complete", "done", "status"}
+RATE_WORDS = {"rate", "percentage", "progress"}
+
+# Feature words naming a component, accepted only when the compiled tool has that component
+FEATURE_WORDS = {
+    "chart": {"chart", "graph", "plot", "visualization", "visualisation"},
+    "metric": {"metric", "summary", "total", "totals"},
+    "progress": {"progress", "metric", "summary"},
+}
+
+_WORD_RE = re.compile(r"[a-z]+")
+_OPTIONS_RE = re.compile(r"\(([^()]{3,120})\)|(?:one of|e\.g\.|such as|like)\s*:?\s*([^.;()]{3,120})", re.IGNORECASE)
+
+
+class UnsupportedSpec(Exception):
+    """The spec needs something the compiler's templates do not cover"""
+
+
+class Field:
+    def __init__(self, key, label, kind, help_text, options=None):
+        self.key = key
+        self.label = label
+        self.kind = kind
+        self.help_text = help_text
+        self.options = options
+
+    @property
+    def variable(self):
+        return f"value_{self.key}"
+
+
+def _field_key(name, taken):
+    key = re.sub(r"\W+", "_", name.strip().lower()).strip("_") or "field"
+    if key[0].isdigit():
+        key = f"field_{key}"
+    base, suffix = key, 2
+    while key in taken:
+        key = f"{base}_{suffix}"
+        suffix += 1
+    taken.add(key)
+    return key
+
+
+def _field_label(name):
+    label = name.replace("_", " ").strip()
+    return label[:1].upper() + label[1:]
+
+
+def _parse_options(field):
+    """Choices for a text field, from an explicit list or one spelled out in its description"""
+    options = field.get("options") or field.get("values") or field.get("choices")
+    if isinstance(options, list) and len(options) >= 2:
+        return [str(option) for option in options]
+
+    description = str(field.get("description", ""))
+    for match in _OPTIONS_RE.finditer(description):
+        text = match.group(1) or match.group(2)
+        parts = [part.strip(" '\"") for part in re.split(r",|/|\||\bor\b", text)]
+        parts = [part for part in parts if part]
+        if 2 <= len(parts) <= 10 and all(len(part) <= 30 for part in parts):
+            return parts
+    return None
+
+
+def parse_fields(spec):
+    fields = (spec.get("data_structure") or {}).get("fields")
+    if not isinstance(fields, list) or not fields:
+        raise UnsupportedSpec("no data fields")
+    if len(fields) > MAX_FIELDS:
+        raise UnsupportedSpec(f"more than {MAX_FIELDS} fields")
+
+    parsed = []
+    taken = set()
+    for field in fields:
+        if not isinstance(field, dict) or not field.get("name"):
+            raise UnsupportedSpec("malformed field")
+        type_name = str(field.get("type", "string")).split("|")[0].strip().lower()
+        kind = FIELD_TYPES.get(type_name)
+        if kind is None:
+            raise UnsupportedSpec(f"field type {type_name!r}")
+
+        options = _parse_options(field) if kind in ("text", "select") else None
+        if kind == "select" and not options:
+            raise UnsupportedSpec(f"no options for {field['name']!r}")
+        if options:
+            kind = "select"
+
+        name = str(field["name"])
+        parsed.append(Field(
+            _field_key(name, taken), _field_label(name), kind, str(field.get("description", "")) or None, options
+        ))
+    return parsed
+
+
+def _subject_words(spec, fields):
+    """Words naming what the tool keeps: its field names and labels, and the tool's name"""
+    text = " ".join([str(spec.get("name") or "")] + [f"{field.key} {field.label}" for field in fields])
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _known(word, vocabulary):
+    """The vocabulary form of `word`, allowing a plural; None when it is not in the vocabulary"""
+    if word in vocabulary:
+        return word
+    if word.endswith("s") and word[:-1] in vocabulary:
+        return word[:-1]
+    return None
+
+
+def _phrase_words(kind, text, vocabulary):
+    """Words of `text` in vocabulary form; raises UnsupportedSpec for any word outside it"""
+    words = []
+    # Single letters are left over from "today's", "e.g." and the like
+    for word in _WORD_RE.findall(text.lower()):
+        if len(word) == 1:
+            continue
+        known = _known(word, vocabulary)
+        if known is None:
+            raise UnsupportedSpec(f"{kind} {text!r}")
+        words.append(known)
+    return words
+
+
+def parse_interactions(spec, fields):
+    """Map interaction phrases to the operations the templates implement"""
+    operations = {"create", "read"}
+    vocabulary = FILLER_WORDS | _subject_words(spec, fields) | set(OPERATION_WORDS)
+    for interaction in spec.get("interactions") or []:
+        words = _phrase_words("interaction", str(interaction), vocabulary)
+        matched = {OPERATION_WORDS[word] for word in words if word in OPERATION_WORDS}
+        if not matched:
+            raise UnsupportedSpec(f"interaction {interaction!r}")
+        operations |= matched
+    return operations
+
+
+def parse_features(spec, fields, visualizations):
+    """Operations the features ask for; every word must name something the compiled tool has"""
+    kinds = {kind for kind, _ in visualizations}
+    vocabulary = FILLER_WORDS | _subject_words(spec, fields) | set(OPERATION_WORDS)
+    for kind, words in FEATURE_WORDS.items():
+        if kind in kinds:
+            vocabulary |= words
+
+    operations = set()
+    for feature in spec.get("features") or []:
+        words = _phrase_words("feature", str(feature), vocabulary)
+        operations |= {OPERATION_WORDS[word] for word in words if word in OPERATION_WORDS}
+    return operations
+
+
+def _first(fields, *kinds):
+    return next((field for field in fields if field.kind in kinds), None)
+
+
+def _visualization_vocabulary(kind, spec, fields):
+    vocabulary = FILLER_WORDS | _subject_words(spec, fields)
+    has_boolean = _first(fields, "boolean") is not None
+    if kind == "table":
+        return vocabulary | TABLE_WORDS
+    if kind == "chart":
+        return vocabulary | CHART_WORDS | (COMPLETION_WORDS if has_boolean else set())
+    vocabulary |= METRIC_WORDS
+    if _first(fields, "number"):
+        vocabulary |= TOTAL_WORDS
+    if has_boolean:
+        vocabulary |= COMPLETION_WORDS | RATE_WORDS
+    return vocabulary
+
+
+def parse_visualizations(spec, fields):
+    """Return a list of (kind, description) the templates can render from these fields.
+
+    Every word of a description has to match what the template for its type
+    shows, so "Current streak per habit" is not mistaken for an entry count.
+    """
+    parsed = []
+    for visualization in spec.get("visualizations") or []:
+        if not isinstance(visualization, dict):
+            raise UnsupportedSpec("malformed visualization")
+        kind = str(visualization.get("type", "")).lower()
+        description = str(visualization.get("description", ""))
+        if kind not in ("chart", "table", "metric", "progress"):
+            raise UnsupportedSpec(f"visualization type {kind!r}")
+        if kind == "progress" and not _first(fields, "boolean"):
+            raise UnsupportedSpec("progress without a yes/no field")
+        _phrase_words(kind, description, _visualization_vocabulary(kind, spec, fields))
+        parsed.append((kind, description))
+    return parsed
+
+
+class _Writer:
+    def __init__(self):
+        self.lines = []
+        self.depth = 1
+
+    def line(self, text=""):
+        self.lines.append(("    " * self.depth + text) if text else "")
+
+    def block(self, header):
+        writer = self
+
+        class _Block:
+            def __enter__(self):
+                writer.line(header)
+                writer.depth += 1
+
+            def __exit__(self, *exc_info):
+                writer.depth -= 1
+
+        return _Block()
+
+
+def _chart_plan(description, fields):
+    """Pick a chart from the description's wording and the available field types"""
+    words = set(_WORD_RE.findall(description.lower()))
+    date_field = _first(fields, "date")
+    number_field = _first(fields, "number")
+    group_field = _first(fields, "select") or _first(fields, "text")
+    boolean_field = _first(fields, "boolean")
+
+    over_time = bool(words & {"time", "trend", "trends", "daily", "weekly", "monthly", "history", "timeline", "over"})
+    if boolean_field and words & {"completion", "completed", "done", "status", "pie"} and not over_time:
+        return "pie", boolean_field, None
+    if date_field and (over_time or not group_field):
+        return ("line" if number_field else "count_by_date"), date_field, number_field
+    if group_field:
+        return ("bar" if number_field else "count_by_group"), group_field, number_field
+    if date_field:
+        return ("line" if number_field else "count_by_date"), date_field, number_field
+    if boolean_field:
+        return "pie", boolean_field, None
+    if number_field:
+        return "histogram", number_field, None
+    raise UnsupportedSpec(f"no field to chart for {description!r}")
+
+
+def _emit_input(w, field, prefix):
+    help_arg = f", help={field.help_text!r}" if field.help_text else ""
+    if field.kind == "text":
+        w.line(f"{field.variable} = {prefix}text_input({field.label!r}{help_arg})")
+    elif field.kind == "number":
+        w.line(f"{field.variable} = {prefix}number_input({field.label!r}, value=0.0, step=1.0{help_arg})")
+    elif field.kind == "date":
+        w.line(f"{field.variable} = {prefix}date_input({field.label!r}, value=date.today(){help_arg})")
+    elif field.kind == "boolean":
+        w.line(f"{field.variable} = {prefix}checkbox({field.label!r}{help_arg})")
+    elif field.kind == "select":
+        w.line(f"{field.variable} = {prefix}selectbox({field.label!r}, {field.options!r}{help_arg})")
+
+
+def _emit_add_form(w, fields):
+    required = _first(fields, "text")
+    with w.block('with st.expander("➕ Add Entry", expanded=len(records) == 0):'):
+        with w.block('with st.form("add_entry", clear_on_submit=True):'):
+            w.line(f"form_columns = st.columns({min(2, len(fields))})")
+            for index, field in enumerate(fields):
+                with w.block(f"with form_columns[{index % 2 if len(fields) > 1 else 0}]:"):
+                    _emit_input(w, field, "st.")
+            w.line('submitted = st.form_submit_button("Add Entry")')
+        w.line()
+        with w.block("if submitted:"):
+            if required:
+                with w.block(f"if not {required.variable}.strip():"):
+                    w.line(f"st.error({(required.label + ' is required.')!r})")
+                w.line("else:")
+                w.depth += 1
+            w.line("records.append({")
+            for field in fields:
+                value = f"{field.variable}.strip()" if field.kind == "text" else field.variable
+                w.line(f"    {field.key!r}: {value},")
+            w.line("})")
+            w.line('st.success("✅ Entry added.")')
+            if required:
+                w.depth -= 1
+
+
+def _emit_filters(w, fields, operations):
+    w.line("view = frame")
+    if "filter" in operations:
+        text_fields = [field.key for field in fields if field.kind in ("text", "select")]
+        select_fields = [field for field in fields if field.kind == "select"]
+        filter_columns = (1 if text_fields else 0) + len(select_fields)
+        if filter_columns:
+            w.line(f"filter_columns = st.columns({filter_columns})")
+            position = 0
+            if text_fields:
+                with w.block(f"with filter_columns[{position}]:"):
+                    w.line('search = st.text_input("🔍 Search", placeholder="Type to filter entries")')
+                with w.block("if search:"):
+                    w.line("mask = pd.Series(False, index=view.index)")
+                    with w.block(f"for column in {text_fields!r}:"):
+                        w.line("mask |= view[column].astype(str).str.contains(search, case=False, regex=False)")
+                    w.line("view = view[mask]")
+                position += 1
+            for field in select_fields:
+                with w.block(f"with filter_columns[{position}]:"):
+                    w.line(f"chosen_{field.key} = st.multiselect({field.label!r}, {field.options!r})")
+                with w.block(f"if chosen_{field.key}:"):
+                    w.line(f"view = view[view[{field.key!r}].isin(chosen_{field.key})]")
+                position += 1
+    if "sort" in operations:
+        labels = {field.key: field.label for field in fields}
+        w.line(f"sort_labels = {labels!r}")
+        w.line("sort_columns = st.columns([3, 1])")
+        with w.block("with sort_columns[0]:"):
+            w.line('sort_by = st.selectbox("Sort by", list(sort_labels), format_func=sort_labels.get)')
+        with w.block("with sort_columns[1]:"):
+            w.line('descending = st.checkbox("Descending")')
+        # Object columns can mix types (dates and blanks); compare them as text
+        w.line("view = view.sort_values(")
+        w.line("    sort_by, ascending=not descending, na_position='last',")
+        w.line("    key=lambda values: values.astype(str) if values.dtype == object else values")
+        w.line(")")
+
+
+def _emit_metrics(w, fields, visualizations):
+    if not any(kind in ("metric", "progress") for kind, _ in visualizations):
+        return
+    numbers = [field for field in fields if field.kind == "number"][:2]
+    booleans = [field for field in fields if field.kind == "boolean"][:1]
+    count = 1 + len(numbers) + len(booleans)
+    w.line(f"metric_columns = st.columns({count})")
+    w.line('metric_columns[0].metric("Entries", len(view))')
+    position = 1
+    for field in numbers:
+        w.line(f"metric_columns[{position}].metric({('Total ' + field.label)!r}, "
+               f"f\"{{pd.to_numeric(view[{field.key!r}], errors='coerce').sum():,.1f}}\")")
+        position += 1
+    for field in booleans:
+        w.line(f"rate_{field.key} = view[{field.key!r}].fillna(False).astype(bool).mean() if len(view) else 0.0")
+        w.line(f"metric_columns[{position}].metric({(field.label + ' rate')!r}, f\"{{rate_{field.key}:.0%}}\")")
+
+    for kind, description in visualizations:
+        if kind == "progress":
+            field = booleans[0]
+            w.line(f"st.progress(float(rate_{field.key}), text={(description or field.label)!r})")
+            break
+
+
+def _emit_chart(w, index, description, fields):
+    plan, field, value = _chart_plan(description, fields)
+    title = description[:80] or "Overview"
+    if description:
+        w.line(f"st.markdown({('**' + title + '**')!r})")
+    # Built through tool_cache so reruns with the same rows reuse the figure
+    w.line("@tool_cache")
+    with w.block(f"def chart_{index}(view):"):
+        if plan == "pie":
+            w.line(f"counts = view[{field.key!r}].fillna(False).astype(bool).map({{True: 'Yes', False: 'No'}}).value_counts()")
+            w.line(f"fig = px.pie(names=counts.index, values=counts.values, hole=0.4)")
+        elif plan in ("line", "count_by_date"):
+            w.line(f"by_date = view.assign(_date=pd.to_datetime(view[{field.key!r}], errors='coerce')).dropna(subset=['_date'])")
+            if plan == "line":
+                w.line(f"series = by_date.groupby('_date')[{value.key!r}].apply(lambda s: pd.to_numeric(s, errors='coerce').sum())")
+                w.line(f"fig = px.line(x=series.index, y=series.values, markers=True, labels={{'x': {field.label!r}, 'y': {value.label!r}}})")
+            else:
+                w.line("series = by_date.groupby('_date').size()")
+                w.line(f"fig = px.bar(x=series.index, y=series.values, labels={{'x': {field.label!r}, 'y': 'Entries'}})")
+        elif plan in ("bar", "count_by_group"):
+            if plan == "bar":
+                w.line(f"series = view.groupby({field.key!r})[{value.key!r}].apply(lambda s: pd.to_numeric(s, errors='coerce').sum())")
+                w.line(f"fig = px.bar(x=series.index, y=series.values, labels={{'x': {field.label!r}, 'y': {value.label!r}}})")
+            else:
+                w.line(f"series = view[{field.key!r}].value_counts()")
+                w.line(f"fig = px.bar(x=series.index, y=series.values, labels={{'x': {field.label!r}, 'y': 'Entries'}})")
+        elif plan == "histogram":
+            w.line(f"fig = px.histogram(x=pd.to_numeric(view[{field.key!r}], errors='coerce'), labels={{'x': {field.label!r}}})")
+        w.line("fig.update_layout(height=320, margin=dict(l=10, r=10, t=10, b=10))")
+        w.line("return fig")
+    w.line(f"st.plotly_chart(chart_{index}(view), use_container_width=True, key='chart_{index}')")
+
+
+def _emit_table(w, fields, operations):
+    labels = {field.key: field.label for field in fields}
+    if "edit" in operations:
+        w.line(f"column_config = {{")
+        for field in fields:
+            if field.kind == "date":
+                config = f"st.column_config.DateColumn({field.label!r})"
+            elif field.kind == "boolean":
+                config = f"st.column_config.CheckboxColumn({field.label!r})"
+            elif field.kind == "number":
+                config = f"st.column_config.NumberColumn({field.label!r})"
+            elif field.kind == "select":
+                config = f"st.column_config.SelectboxColumn({field.label!r}, options={field.options!r})"
+            else:
+                config = f"st.column_config.TextColumn({field.label!r})"
+            w.line(f"    {field.key!r}: {config},")
+        w.line("}")
+        w.line("edited = st.data_editor(view, column_config=column_config, use_container_width=True, key='entries_editor')")
+        with w.block('if st.button("💾 Save Changes"):'):
+            w.line("changed = 0")
+            with w.block("for row_id in edited.index:"):
+                w.line("updates = {}")
+                with w.block("for column in edited.columns:"):
+                    w.line("new_value, old_value = edited.at[row_id, column], view.at[row_id, column]")
+                    with w.block("if pd.isna(new_value) and pd.isna(old_value):"):
+                        w.line("continue")
+                    with w.block("if isinstance(new_value, pd.Timestamp):"):
+                        w.line("new_value = new_value.date()")
+                    with w.block("if new_value != old_value:"):
+                        w.line("updates[column] = None if pd.isna(new_value) else new_value")
+                with w.block("if updates:"):
+                    w.line("records.update(int(row_id), **updates)")
+                    w.line("changed += 1")
+            w.line('st.success(f"✅ Saved changes to {changed} entries.")')
+            w.line("st.rerun()")
+    else:
+        w.line(f"st.dataframe(view.rename(columns={labels!r}), use_container_width=True)")
+
+    if "delete" in operations:
+        w.line(f"first_column = {fields[0].key!r}")
+        w.line("to_delete = st.multiselect(")
+        w.line('    "Select entries to delete",')
+        w.line("    list(view.index),")
+        w.line("    format_func=lambda row_id: f\"#{row_id} · {view.at[row_id, first_column]}\"")
+        w.line(")")
+        with w.block('if to_delete and st.button("🗑️ Delete Selected"):'):
+            with w.block("for row_id in to_delete:"):
+                w.line("records.delete(int(row_id))")
+            w.line('st.success(f"Deleted {len(to_delete)} entries.")')
+            w.line("st.rerun()")
+
+    if "export" in operations:
+        w.line("st.download_button(")
+        w.line('    "📥 Download CSV",')
+        w.line(f"    view.rename(columns={labels!r}).to_csv(index=False),")
+        w.line('    file_name="entries.csv",')
+        w.line('    mime="text/csv"')
+        w.line(")")
+
+
+def compile_spec(spec):
+    """Turn a tool specification into `execute_tool()` source without the LLM.
+
+    Raises UnsupportedSpec when the spec asks for field types, interactions,
+    features or visualizations the templates do not cover.
+    """
+    if not isinstance(spec, dict):
+        raise UnsupportedSpec("spec is not an object")
+
+    fields = parse_fields(spec)
+    visualizations = parse_visualizations(spec, fields)
+    operations = parse_interactions(spec, fields) | parse_features(spec, fields, visualizations)
+    charts = [description for kind, description in visualizations if kind == "chart"]
+    # Resolve every chart up front so unsupported ones fail before any code is written
+    for description in charts:
+        _chart_plan(description, fields)
+
+    w = _Writer()
+    w.line("import streamlit as st")
+    w.line("import pandas as pd")
+    w.line("import plotly.express as px")
+    w.line("from datetime import date")
+    w.line()
+    w.line(f"st.subheader({str(spec.get('name') or 'My Tool')!r})")
+    if spec.get("description"):
+        w.line(f"st.caption({str(spec['description'])!r})")
+    w.line()
+    w.line("records = tool_table('records')")
+    w.line()
+    _emit_add_form(w, fields)
+    w.line()
+    with w.block("if len(records) == 0:"):
+        w.line('st.info("📝 No entries yet. Use **Add Entry** above to record your first one.")')
+        w.line("return")
+    w.line()
+    w.line("frame = records.frame()")
+    _emit_filters(w, fields, operations)
+    w.line()
+    _emit_metrics(w, fields, visualizations)
+
+    if charts:
+        w.line()
+        with w.block("if len(view):"):
+            chart_columns = min(2, len(charts))
+            w.line(f"chart_columns = st.columns({chart_columns})")
+            for index, description in enumerate(charts):
+                with w.block(f"with chart_columns[{index % chart_columns}]:"):
+                    _emit_chart(w, index, description, fields)
+
+    w.line()
+    w.line('st.markdown("### 📋 Entries")')
+    _emit_table(w, fields, operations)
+
+    code = "def execute_tool():\n" + "\n".join(w.lines) + "\n"
+    result = analyze_code(code)
+    if not result.valid:
+        raise UnsupportedSpec(f"compiled code failed validation: {result.message}")
+    return code
+
+
+class SpecCompiler:
+    """Counts how often specs compile locally and why the others fall back to the LLM"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.compiled = 0
+        self.fallbacks = 0
+        self.fallback_reasons = Counter()
+
+    def compile(self, spec):
+        """Return (code, None), or (None, reason) when the LLM has to write the code"""
+        try:
+            code = compile_spec(spec)
+        except UnsupportedSpec as e:
+            with self._lock:
+                self.fallbacks += 1
+                # Keep the category ("field type", "interaction", ...) rather than every distinct value
+                self.fallback_reasons[str(e).split(" '")[0]] += 1
+            return None, str(e)
+
+        with self._lock:
+            self.compiled += 1
+        return code, None
+
+    def stats(self):
+        with self._lock:
+            total = self.compiled + self.fallbacks
+            return {
+                "compiled": self.compiled,
+                "fallbacks": self.fallbacks,
+                "compiled_fraction": self.compiled / total if total else 0.0,
+                "top_fallback_reasons": self.fallback_reasons.most_common(3),
+            }
+
+
+_spec_compiler = SpecCompiler()
+
+
+def get_spec_compiler():
+    """Return the compiler shared by every session in this process"""
+    return _spec_compiler
@@ -0,0 +1,257 @@
+import functools
+import json
+import threading
+import time
+from collections import deque
+
+import config
+
+# Streamlit exceptions that end a script run without being failures
+_CONTROL_FLOW_EXCEPTIONS = {"StopException", "RerunException"}
+
+# Histogram bucket upper bounds in seconds, from in-process work up to full LLM calls
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Span:
+    """One timed stage; attributes end up in the trace record"""
+
+    def __init__(self, stage, attrs):
+        self.stage = stage
+        self.attrs = dict(attrs)
+        self.outcome = "ok"
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def set_outcome(self, outcome):
+        self.outcome = outcome
+
+    def set_usage(self, usage):
+        """Take token counts from an OpenAI `response.usage` object"""
+        if usage is not None:
+            self.prompt_tokens = usage.prompt_tokens
+            self.completion_tokens = usage.completion_tokens
+
+    def to_record(self):
+        record = {
+            "stage": self.stage,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "outcome": self.outcome,
+        }
+        if self.prompt_tokens is not None:
+            record["prompt_tokens"] = self.prompt_tokens
+            record["completion_tokens"] = self.completion_tokens
+        record.update(self.attrs)
+        return record
+
+
+class Telemetry:
+    """In-process aggregation of stage spans into histograms and token counters"""
+
+    def __init__(self, trace_file=None, recent_spans=5000):
+        self.trace_file = trace_file
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._first_token = {}
+        self._tokens = {}
+        self._recent = deque(maxlen=recent_spans)
+
+    def span(self, stage, **attrs):
+        return _SpanContext(self, stage, attrs)
+
+    def record(self, span):
+        record = span.to_record()
+        with self._lock:
+            key = (span.stage, span.outcome)
+            if key not in self._durations:
+                self._durations[key] = Histogram()
+            self._durations[key].observe(span.duration)
+
+            first_token = span.attrs.get("time_to_first_token")
+            if first_token is not None:
+                if span.stage not in self._first_token:
+                    self._first_token[span.stage] = Histogram()
+                self._first_token[span.stage].observe(first_token)
+
+            if span.prompt_tokens is not None:
+                tokens = self._tokens.setdefault(span.stage, {"prompt": 0, "completion": 0})
+                tokens["prompt"] += span.prompt_tokens or 0
+                tokens["completion"] += span.completion_tokens or 0
+
+            # Set only on spans that sent a compacted prompt to the API
+            saved = span.attrs.get("prompt_tokens_saved")
+            if saved:
+                tokens = self._tokens.setdefault(span.stage, {"prompt": 0, "completion": 0})
+                tokens["saved"] = tokens.get("saved", 0) + saved
+
+            self._recent.append(record)
+
+            if self.trace_file:
+                with open(self.trace_file, "a") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    def summary(self):
+        """Per-stage counts, error counts, tokens and latency percentiles over recent spans"""
+        with self._lock:
+            recent = list(self._recent)
+            tokens = {stage: dict(counts) for stage, counts in self._tokens.items()}
+
+        by_stage = {}
+        for record in recent:
+            by_stage.setdefault(record["stage"], []).append(record)
+
+        rows = []
+        for stage in sorted(by_stage):
+            records = by_stage[stage]
+            durations = sorted(record["duration"] for record in records)
+            first_tokens = sorted(r["time_to_first_token"] for r in records if r.get("time_to_first_token") is not None)
+            rows.append({
+                "stage": stage,
+                "count": len(records),
+                "errors": sum(1 for record in records if record["outcome"] == "error"),
+                "p50_ms": _percentile(durations, 50) * 1000,
+                "p95_ms": _percentile(durations, 95) * 1000,
+                "p99_ms": _percentile(durations, 99) * 1000,
+                "ttft_p50_ms": _percentile(first_tokens, 50) * 1000 if first_tokens else None,
+                "prompt_tokens": tokens.get(stage, {}).get("prompt", 0),
+                "completion_tokens": tokens.get(stage, {}).get("completion", 0),
+                "prompt_tokens_saved": tokens.get(stage, {}).get("saved", 0),
+            })
+        return rows
+
+    def recent_jsonl(self):
+        with self._lock:
+            return "".join(json.dumps(record, default=str) + "\n" for record in self._recent)
+
+    def prometheus_text(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            durations = {key: _copy_histogram(h) for key, h in self._durations.items()}
+            first_token = {key: _copy_histogram(h) for key, h in self._first_token.items()}
+            tokens = {stage: dict(counts) for stage, counts in self._tokens.items()}
+
+        lines = [
+            "# HELP focus_builder_stage_duration_seconds Time spent per pipeline stage.",
+            "# TYPE focus_builder_stage_duration_seconds histogram",
+        ]
+        for (stage, outcome), histogram in sorted(durations.items()):
+            lines.extend(_histogram_lines(
+                "focus_builder_stage_duration_seconds", f'stage="{stage}",outcome="{outcome}"', histogram
+            ))
+
+        lines.extend([
+            "# HELP focus_builder_time_to_first_token_seconds Latency until the first streamed token.",
+            "# TYPE focus_builder_time_to_first_token_seconds histogram",
+        ])
+        for stage, histogram in sorted(first_token.items()):
+            lines.extend(_histogram_lines(
+                "focus_builder_time_to_first_token_seconds", f'stage="{stage}"', histogram
+            ))
+
+        lines.extend([
+            "# HELP focus_builder_tokens_total LLM tokens reported by the API, and prompt tokens saved by compaction.",
+            "# TYPE focus_builder_tokens_total counter",
+        ])
+        for stage, counts in sorted(tokens.items()):
+            for kind, value in sorted(counts.items()):
+                lines.append(f'focus_builder_tokens_total{{stage="{stage}",kind="{kind}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+class _SpanContext:
+    def __init__(self, telemetry, stage, attrs):
+        self.telemetry = telemetry
+        self.span = Span(stage, attrs)
+
+    def __enter__(self):
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.duration = time.perf_counter() - span._start
+        if exc_type is not None:
+            # st.stop() and st.rerun() unwind through spans as exceptions
+            if exc_type.__name__ in _CONTROL_FLOW_EXCEPTIONS:
+                span.outcome = "interrupted"
+            else:
+                span.outcome = "error"
+                span.attrs["error"] = exc_type.__name__
+        self.telemetry.record(span)
+        return False
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _copy_histogram(histogram):
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.count = histogram.count
+    copy.sum = histogram.sum
+    return copy
+
+
+def _histogram_lines(name, labels, histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+_telemetry = Telemetry(trace_file=config.TRACE_FILE)
+
+
+def get_telemetry():
+    """Return the telemetry shared by every session in this process"""
+    return _telemetry
+
+
+def span(stage, **attrs):
+    """Time a pipeline stage: `with span("validate") as trace: ...`"""
+    return _telemetry.span(stage, **attrs)
+
+
+def traced(stage):
+    """Decorator form of span() for functions that are a stage on their own"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _telemetry.span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,203 @@
+def execute_tool():
+    import streamlit as st
+    import numpy as np
+    import pandas as pd
+    import plotly.graph_objects as go
+    from datetime import date
+
+    st.subheader("📅 Daily Habit Tracker")
+
+    # Habits are rows of one table; their row ids are the habit ids.
+    # Logs hold one row per (habit_id, day), with days stored as date ordinals.
+    habits = tool_table('habits')
+    logs = tool_table('habit_logs')
+
+    today = date.today()
+    today_ordinal = today.toordinal()
+
+    # Day ordinals stay below 2**20 until the year 2870, so (habit_id, day) packs into one integer
+    def log_key(habit_id, day):
+        return habit_id * (1 << 20) + day
+
+    @tool_cache
+    def log_index():
+        """Log row id by packed (habit_id, day) key, rebuilt only after a log is written"""
+        frame = logs.frame()
+        if len(frame) == 0:
+            return pd.Series([], dtype=np.int64)
+        keys = log_key(frame['habit_id'].to_numpy(dtype=np.int64), frame['day'].to_numpy(dtype=np.int64))
+        return pd.Series(frame.index.to_numpy(), index=keys)
+
+    def set_log(habit_id, day, value):
+        row_id = log_index().get(log_key(habit_id, day))
+        if row_id is None:
+            logs.append({'habit_id': habit_id, 'day': day, 'value': float(value)})
+        else:
+            logs.update(int(row_id), value=float(value))
+
+    # Add new habit section
+    with st.expander("➕ Add New Habit", expanded=len(habits) == 0):
+        col1, col2 = st.columns(2)
+        with col1:
+            new_habit_name = st.text_input("Habit Name")
+            habit_target = st.number_input("Daily Target", min_value=1.0, value=1.0, step=1.0)
+        with col2:
+            habit_category = st.selectbox("Category", ["Health", "Productivity", "Learning", "Other"])
+            habit_unit = st.text_input("Unit (e.g., glasses, minutes, pages)", value="times")
+
+        if st.button("Add Habit") and new_habit_name.strip():
+            habits.append({
+                'name': new_habit_name.strip(),
+                'target': float(habit_target),
+                'category': habit_category,
+                'unit': habit_unit,
+                'created_date': today
+            })
+            st.success(f"Added habit: {new_habit_name}")
+            st.rerun()
+
+    if len(habits) == 0:
+        st.info("🎯 Add your first habit to start tracking!")
+        return
+
+    habit_frame = habits.frame()
+
+    # Today's habit tracking: one O(1) lookup per habit, edited in a single table
+    st.subheader("Today's Progress")
+    today_rows = log_index().reindex(log_key(habit_frame.index.to_numpy(), today_ordinal))
+    today_values = np.zeros(len(habit_frame))
+    if today_rows.notna().any():
+        logged = today_rows.notna().to_numpy()
+        today_values[logged] = logs.frame()['value'].reindex(today_rows[logged].astype(np.int64)).to_numpy(dtype=float)
+
+    targets = habit_frame['target'].astype(float)
+    today_frame = pd.DataFrame({
+        'Habit': habit_frame['name'],
+        'Category': habit_frame['category'],
+        'Today': today_values,
+        'Target': targets,
+        'Unit': habit_frame['unit'],
+        'Progress': np.minimum(today_values / targets.to_numpy(), 1.0),
+    }, index=habit_frame.index)
+    edited = st.data_editor(
+        today_frame,
+        key="today_progress",
+        hide_index=True,
+        use_container_width=True,
+        disabled=['Habit', 'Category', 'Target', 'Unit', 'Progress'],
+        column_config={
+            'Today': st.column_config.NumberColumn("Today", min_value=0.0, step=1.0, help="Amount done today"),
+            'Progress': st.column_config.ProgressColumn("Progress", min_value=0.0, max_value=1.0, format="percent"),
+        },
+    )
+    changed = edited.index[edited['Today'].to_numpy() != today_frame['Today'].to_numpy()]
+    for habit_id in changed:
+        set_log(int(habit_id), today_ordinal, edited.at[habit_id, 'Today'])
+    if len(changed):
+        st.rerun()
+
+    if len(logs) == 0:
+        return
+
+    @tool_cache
+    def habit_stats(today_ordinal):
+        """Streaks, this week's average and weekly completion, computed with array operations"""
+        frame = logs.frame()
+        habit_ids = frame['habit_id'].to_numpy(dtype=np.int64)
+        days = frame['day'].to_numpy(dtype=np.int64)
+        slots = int(max(habit_frame.index.max(), habit_ids.max())) + 1
+
+        targets = np.full(slots, np.inf)
+        targets[habit_frame.index.to_numpy()] = habit_frame['target'].to_numpy(dtype=float)
+        completion = np.minimum(frame['value'].to_numpy(dtype=float) / targets[habit_ids], 1.0) * 100
+
+        # Streaks: runs of consecutive days that met the target, per habit
+        met = completion >= 100
+        order = np.lexsort((days[met], habit_ids[met]))
+        met_habits, met_days = habit_ids[met][order], days[met][order]
+        run_starts = np.ones(len(met_days), dtype=bool)
+        run_starts[1:] = (met_habits[1:] != met_habits[:-1]) | (met_days[1:] != met_days[:-1] + 1)
+        starts = np.flatnonzero(run_starts)
+        lengths = np.diff(np.append(starts, len(met_days)))
+        run_habits = met_habits[starts]
+        run_ends = met_days[starts + lengths - 1]
+        best_streak = np.zeros(slots, dtype=np.int64)
+        np.maximum.at(best_streak, run_habits, lengths)
+        # A streak is still current if it reaches today, or yesterday while today is unlogged
+        alive = run_ends >= today_ordinal - 1
+        current_streak = np.zeros(slots, dtype=np.int64)
+        np.maximum.at(current_streak, run_habits[alive], lengths[alive])
+
+        # This week's average, counting days without a log as 0% (ordinal 1 is a Monday)
+        week_start = today_ordinal - (today_ordinal - 1) % 7
+        this_week = days >= week_start
+        week_average = np.bincount(habit_ids[this_week], weights=completion[this_week], minlength=slots)
+        week_average /= today_ordinal - week_start + 1
+
+        # Weekly completion over the last 12 weeks, for the chart
+        recent = days >= week_start - 11 * 7
+        weekly = pd.DataFrame({
+            'habit_id': habit_ids[recent],
+            'week': days[recent] - (days[recent] - 1) % 7,
+            'completion': completion[recent],
+        }).groupby(['habit_id', 'week'], sort=True)['completion'].sum().reset_index()
+        weekly['completion'] /= np.minimum(7, today_ordinal - weekly['week'].to_numpy() + 1)
+        weekly['week'] = pd.to_datetime(weekly['week'] - date(1970, 1, 1).toordinal(), unit='D')
+
+        ids = habit_frame.index.to_numpy()
+        summary = pd.DataFrame({
+            'current_streak': current_streak[ids],
+            'best_streak': best_streak[ids],
+            'week_average': week_average[ids],
+        }, index=habit_frame.index)
+        return summary, weekly
+
+    summary, weekly = habit_stats(today_ordinal)
+
+    # Progress visualization
+    st.subheader("📊 Progress Overview")
+    names = habit_frame['name']
+    shown = st.multiselect("Habits to chart", names.index.tolist(), default=names.index[:10].tolist(),
+                           format_func=lambda habit_id: names[habit_id])
+
+    @tool_cache
+    def weekly_chart(today_ordinal, shown):
+        # One trace per habit, built without plotly express's per-call overhead
+        traces = [
+            dict(type='scatter', mode='lines+markers', name=names[habit_id],
+                 x=part['week'], y=part['completion'])
+            for habit_id, part in weekly[weekly['habit_id'].isin(shown)].groupby('habit_id')
+        ]
+        if not traces:
+            return None
+        return go.Figure(dict(data=traces, layout=dict(
+            title=dict(text="Weekly Completion Rate (last 12 weeks)"),
+            xaxis=dict(title=dict(text="Week of")),
+            yaxis=dict(title=dict(text="Completion %"), range=[0, 105]),
+        )))
+
+    fig = weekly_chart(today_ordinal, tuple(shown))
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Statistics
+    table = pd.DataFrame({
+        'Habit': habit_frame['name'],
+        'Current streak (days)': summary['current_streak'].astype(int),
+        'Best streak (days)': summary['best_streak'].astype(int),
+        "This week's average": summary['week_average'].round(0).astype(int).astype(str) + '%',
+    })
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("🏆 Current Streaks")
+        top = table.sort_values('Current streak (days)', ascending=False).head(5)
+        for _, row in top.iterrows():
+            st.metric(row['Habit'], f"{row['Current streak (days)']} days")
+    with col2:
+        st.subheader("📈 This Week's Average")
+        top = summary.sort_values('week_average', ascending=False).head(5)
+        for habit_id, row in top.iterrows():
+            st.metric(habit_frame.at[habit_id, 'name'], f"{row['week_average']:.0f}%")
+
+    with st.expander("All habits"):
+        st.dataframe(table, use_container_width=True, hide_index=True)
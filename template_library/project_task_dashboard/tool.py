@@ -0,0 +1,199 @@
+def execute_tool():
+    import streamlit as st
+    import numpy as np
+    import pandas as pd
+    import plotly.graph_objects as go
+    from datetime import date
+
+    st.subheader("📋 Project Task Dashboard")
+
+    STATUSES = ["To Do", "In Progress", "Completed"]
+    PRIORITIES = ["Low", "Medium", "High"]
+
+    projects = tool_table('projects')
+    tasks = tool_table('tasks')
+    # Secondary indexes, kept current by every append, update and delete
+    for column in ('project_id', 'status', 'priority'):
+        tasks.create_index(column)
+    tasks.create_index('due_date', ordered=True)
+
+    # Project management
+    with st.expander("🚀 Manage Projects", expanded=len(projects) == 0):
+        with st.form("add_project", clear_on_submit=True):
+            col1, col2 = st.columns(2)
+            with col1:
+                new_project_name = st.text_input("Project Name")
+                project_description = st.text_area("Description")
+            with col2:
+                project_deadline = st.date_input("Deadline")
+                project_priority = st.selectbox("Priority", PRIORITIES)
+
+            if st.form_submit_button("Add Project") and new_project_name.strip():
+                projects.append({
+                    'name': new_project_name.strip(),
+                    'description': project_description,
+                    'deadline': project_deadline,
+                    'priority': project_priority,
+                    'created_date': date.today()
+                })
+                st.success(f"Added project: {new_project_name}")
+                st.rerun()
+
+    if len(projects) == 0:
+        st.info("🎯 Create your first project to start managing tasks!")
+        return
+
+    project_names = projects.frame()['name']
+    project_ids = {name: project_id for project_id, name in project_names.items()}
+
+    # Task management
+    with st.expander("➕ Add New Task", expanded=len(tasks) == 0):
+        with st.form("add_task", clear_on_submit=True):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                task_title = st.text_input("Task Title")
+                task_project = st.selectbox("Project", project_names.index.tolist(),
+                                            format_func=lambda project_id: project_names[project_id])
+            with col2:
+                task_status = st.selectbox("Status", STATUSES)
+                task_priority = st.selectbox("Task Priority", PRIORITIES)
+            with col3:
+                task_due_date = st.date_input("Due Date")
+                task_estimate = st.number_input("Estimated Hours", min_value=0.5, value=1.0, step=0.5)
+
+            task_description = st.text_area("Task Description")
+
+            if st.form_submit_button("Add Task") and task_title.strip():
+                tasks.append({
+                    'title': task_title.strip(),
+                    'description': task_description,
+                    'project_id': int(task_project),
+                    'status': task_status,
+                    'priority': task_priority,
+                    'due_date': task_due_date,
+                    'estimate': float(task_estimate),
+                    'created_date': date.today()
+                })
+                st.success(f"Added task: {task_title}")
+                st.rerun()
+
+    if len(tasks) == 0:
+        st.info("📝 Add your first task to see the dashboard in action!")
+        return
+
+    # Dashboard overview, read from the indexes instead of scanning every task
+    status_counts = tasks.counts('status')
+    completed = tasks.lookup('status', 'Completed')
+    overdue = np.setdiff1d(tasks.between('due_date', high=date.today()), completed, assume_unique=True)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Tasks", len(tasks))
+    with col2:
+        st.metric("Completed", status_counts.get('Completed', 0))
+    with col3:
+        st.metric("In Progress", status_counts.get('In Progress', 0))
+    with col4:
+        st.metric("Overdue", len(overdue), delta_color="inverse")
+
+    # Project progress visualization
+    st.subheader("📊 Project Progress")
+
+    @tool_cache
+    def progress_chart():
+        frame = tasks.frame()
+        counts = pd.crosstab(frame['project_id'], frame['status']).reindex(columns=STATUSES, fill_value=0)
+        labels = project_names.reindex(counts.index).tolist()
+        return go.Figure(dict(
+            data=[dict(type='bar', name=status, x=labels, y=counts[status].tolist()) for status in STATUSES],
+            layout=dict(barmode='stack', title=dict(text="Task Status by Project")),
+        ))
+
+    st.plotly_chart(progress_chart(), use_container_width=True)
+
+    # Task list with filters
+    st.subheader("📝 Task Management")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        filter_project = st.selectbox("Filter by Project", ["All"] + project_names.index.tolist(),
+                                      format_func=lambda option: option if option == "All" else project_names[option])
+    with col2:
+        filter_status = st.selectbox("Filter by Status", ["All"] + STATUSES)
+    with col3:
+        filter_priority = st.selectbox("Filter by Priority", ["All"] + PRIORITIES)
+
+    # Apply filters by intersecting sorted row ids from the indexes
+    matches = None
+    for column, value in (('project_id', filter_project), ('status', filter_status), ('priority', filter_priority)):
+        if value != "All":
+            rows = tasks.lookup(column, value)
+            matches = rows if matches is None else np.intersect1d(matches, rows, assume_unique=True)
+    if matches is None:
+        matches = tasks.frame().index.to_numpy()
+
+    # Only one page of tasks is ever rendered
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Tasks per page", [25, 50, 100], index=1)
+    pages = max(1, -(-len(matches) // page_size))
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1,
+                               key=f"task_page_{filter_project}_{filter_status}_{filter_priority}_{page_size}_{pages}")
+    with col3:
+        st.caption(f"{len(matches)} matching tasks · page {page} of {pages}")
+
+    page_frame = tasks.frame().loc[matches[(page - 1) * page_size:page * page_size]]
+    view = pd.DataFrame({
+        'Title': page_frame['title'],
+        'Project': project_names.reindex(page_frame['project_id']).to_numpy(),
+        'Status': page_frame['status'],
+        'Priority': page_frame['priority'],
+        'Due': page_frame['due_date'],
+        'Hours': page_frame['estimate'].astype(float),
+        'Description': page_frame['description'],
+        'Delete': False,
+    }, index=page_frame.index)
+
+    # The key changes after every write, so pending edits never shift onto other rows
+    edited = st.data_editor(
+        view,
+        key=f"task_editor_{tasks.version}_{filter_project}_{filter_status}_{filter_priority}_{page_size}_{page}",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'Title': st.column_config.TextColumn("Title", required=True),
+            'Project': st.column_config.SelectboxColumn("Project", options=project_names.tolist(), required=True),
+            'Status': st.column_config.SelectboxColumn("Status", options=STATUSES, required=True),
+            'Priority': st.column_config.SelectboxColumn("Priority", options=PRIORITIES, required=True),
+            'Due': st.column_config.DateColumn("Due", required=True),
+            'Hours': st.column_config.NumberColumn("Hours", min_value=0.5, step=0.5),
+            'Delete': st.column_config.CheckboxColumn("🗑️", help="Tick tasks, then press Delete"),
+        },
+    )
+
+    # Write back only the cells that changed on this page
+    fields = {'Title': 'title', 'Status': 'status', 'Priority': 'priority', 'Due': 'due_date',
+              'Hours': 'estimate', 'Description': 'description', 'Project': 'project_id'}
+    changed = edited[list(fields)].ne(view[list(fields)])
+    for row_id in edited.index[changed.any(axis=1).to_numpy()]:
+        values = {}
+        for label, column in fields.items():
+            if changed.at[row_id, label]:
+                value = edited.at[row_id, label]
+                if label == 'Project':
+                    value = project_ids.get(value)
+                elif label == 'Hours':
+                    value = float(value)
+                if value is not None:
+                    values[column] = value
+        if values:
+            tasks.update(int(row_id), **values)
+    if changed.to_numpy().any():
+        st.rerun()
+
+    to_delete = edited.index[edited['Delete'].to_numpy(dtype=bool)]
+    if len(to_delete) and st.button(f"🗑️ Delete {len(to_delete)} selected task(s)"):
+        for row_id in to_delete:
+            tasks.delete(int(row_id))
+        st.rerun()
@@ -0,0 +1,160 @@
+import re
+import threading
+
+import numpy as np
+
+import config
+from template_registry import get_template_registry
+
+
+def _char_ngrams(text, sizes=(3, 4, 5)):
+    """Character n-grams of the normalized text, padded at word boundaries"""
+    text = " " + " ".join(re.findall(r"[a-z0-9]+", text.lower())) + " "
+    grams = {}
+    for size in sizes:
+        for i in range(len(text) - size + 1):
+            gram = text[i:i + size]
+            grams[gram] = grams.get(gram, 0) + 1
+    return grams
+
+
+class TemplateMatch:
+    def __init__(self, name, score, spec, code):
+        self.name = name
+        self.score = score
+        self.spec = spec
+        self.code = code
+
+
+class _Index:
+    """TF-IDF vectors for one version of the template registry"""
+
+    def __init__(self, version, templates):
+        self.version = version
+        self.names = [template.name for template in templates]
+
+        documents = []
+        for template in templates:
+            documents.append(_char_ngrams(template.description + " " + " ".join(template.features)))
+
+        self.vocabulary = {}
+        for grams in documents:
+            for gram in grams:
+                self.vocabulary.setdefault(gram, len(self.vocabulary))
+
+        counts = np.zeros((len(documents), len(self.vocabulary)))
+        for row, grams in enumerate(documents):
+            for gram, count in grams.items():
+                counts[row, self.vocabulary[gram]] = count
+
+        document_frequency = (counts > 0).sum(axis=0)
+        self.idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+        # n-grams no template contains still count against the query's norm
+        self.unseen_idf = np.log(1 + len(documents)) + 1
+
+        vectors = np.log1p(counts) * self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.where(norms == 0, 1, norms)
+
+
+class TemplateMatcher:
+    """TF-IDF index over template descriptions and features using character n-grams"""
+
+    def __init__(self, threshold=config.TEMPLATE_MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.served_locally = 0
+        self.saved_seconds = 0.0
+        self.avg_generation_seconds = None
+        self._build_index()
+
+    def _build_index(self):
+        registry = get_template_registry()
+        # Only templates with bundled code can be served without the LLM
+        templates = [template for template in registry.templates if template.code is not None]
+        self._index = _Index(registry.version, templates)
+
+    def _current_index(self):
+        # Templates edited on disk are picked up on the next request
+        if self._index.version != get_template_registry().version:
+            with self._lock:
+                if self._index.version != get_template_registry().version:
+                    self._build_index()
+        return self._index
+
+    @property
+    def names(self):
+        return self._current_index().names
+
+    def score(self, text):
+        """Return (template_name, cosine similarity) of the closest template"""
+        index = self._current_index()
+        if not index.names:
+            return None, 0.0
+
+        query = np.zeros(len(index.vocabulary))
+        unseen_weight = 0.0
+        for gram, count in _char_ngrams(text).items():
+            position = index.vocabulary.get(gram)
+            if position is None:
+                unseen_weight += (np.log1p(count) * index.unseen_idf) ** 2
+            else:
+                query[position] = np.log1p(count) * index.idf[position]
+
+        norm = np.sqrt(query @ query + unseen_weight)
+        if norm == 0:
+            return None, 0.0
+
+        similarities = index.vectors @ (query / norm)
+        best = int(np.argmax(similarities))
+        return index.names[best], float(similarities[best])
+
+    def match(self, text):
+        """Return a TemplateMatch if `text` is close enough to a bundled template"""
+        name, score = self.score(text)
+
+        with self._lock:
+            self.requests += 1
+            if name is None or score < self.threshold:
+                return None
+            self.served_locally += 1
+            if self.avg_generation_seconds is not None:
+                self.saved_seconds += self.avg_generation_seconds
+
+        template = get_template_registry().get(name)
+        if template is None or template.code is None:
+            # Removed by a reload since it was scored
+            return None
+        return TemplateMatch(name, score, template.spec(), template.code)
+
+    def record_generation(self, seconds):
+        """Track LLM generation latency, used to estimate time saved by local matches"""
+        with self._lock:
+            if self.avg_generation_seconds is None:
+                self.avg_generation_seconds = seconds
+            else:
+                self.avg_generation_seconds = 0.8 * self.avg_generation_seconds + 0.2 * seconds
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "served_locally": self.served_locally,
+                "local_fraction": self.served_locally / self.requests if self.requests else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "avg_generation_seconds": self.avg_generation_seconds,
+            }
+
+
+_template_matcher = None
+_template_matcher_lock = threading.Lock()
+
+
+def get_template_matcher():
+    """Return the matcher shared by every session in this process"""
+    global _template_matcher
+    with _template_matcher_lock:
+        if _template_matcher is None:
+            _template_matcher = TemplateMatcher()
+        return _template_matcher
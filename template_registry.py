@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+import config
+from code_cache import get_code_cache
+from code_validator import analyze_code
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "template_library")
+MANIFEST_FILE = "manifest.json"
+
+
+class TemplateError(Exception):
+    """A template's manifest or code is missing, malformed or fails validation"""
+
+
+class Template:
+    """One bundled template, validated and compiled when its files are loaded"""
+
+    def __init__(self, slug, manifest, code=None):
+        self.slug = slug
+        self.name = manifest["name"]
+        self.category = manifest["category"]
+        self.description = manifest["description"]
+        self.features = tuple(manifest["features"])
+        self.code = code
+        # Read-only view in the shape get_template_library() has always returned
+        self.info = MappingProxyType({
+            "category": self.category,
+            "description": self.description,
+            "features": self.features,
+        })
+
+    def spec(self):
+        """A tool specification shaped like AIGenerator output; a fresh copy per call"""
+        return {
+            "name": self.name,
+            "category": self.category,
+            "description": self.description,
+            "features": list(self.features),
+            "source": "template",
+        }
+
+
+def load_template(path):
+    """Read, validate and compile the template in directory `path`"""
+    slug = os.path.basename(path)
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise TemplateError(f"{slug}: unreadable manifest ({e})") from None
+
+    missing = [key for key in ("name", "category", "description", "features") if not manifest.get(key)]
+    if missing:
+        raise TemplateError(f"{slug}: manifest is missing {', '.join(missing)}")
+
+    code = None
+    if manifest.get("code"):
+        try:
+            with open(os.path.join(path, manifest["code"]), encoding="utf-8") as f:
+                code = f.read()
+        except OSError as e:
+            raise TemplateError(f"{slug}: unreadable code ({e})") from None
+
+        result = analyze_code(code)
+        if not result.valid:
+            raise TemplateError(f"{slug}: {result.message}")
+        # Seeds the shared compile cache, so the first run of a template tool skips compilation
+        get_code_cache().get(code)
+
+    return Template(slug, manifest, code)
+
+
+class _Snapshot:
+    """Immutable indexes over one load of the template directory"""
+
+    def __init__(self, templates, errors, signature):
+        self.by_name = MappingProxyType({template.name: template for template in templates})
+        self.library = MappingProxyType({template.name: template.info for template in templates})
+
+        by_category = {}
+        by_feature = {}
+        for template in templates:
+            by_category.setdefault(template.category, []).append(template)
+            for feature in template.features:
+                by_feature.setdefault(feature.lower(), []).append(template)
+        self.by_category = MappingProxyType({key: tuple(value) for key, value in by_category.items()})
+        self.by_feature = MappingProxyType({key: tuple(value) for key, value in by_feature.items()})
+
+        self.errors = tuple(errors)
+        self.signature = signature
+
+
+class TemplateRegistry:
+    """Templates loaded once per process from `<root>/<slug>/manifest.json` (+ code file).
+
+    Lookups read prebuilt, read-only indexes and allocate nothing. A daemon
+    thread polls file modification times and swaps in a fresh snapshot when
+    something changes, so edited templates go live without a restart.
+    """
+
+    def __init__(self, root=TEMPLATE_DIR, reload_seconds=config.TEMPLATE_RELOAD_SECONDS):
+        self.root = root
+        self.reload_seconds = reload_seconds
+        self.version = 0
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._snapshot = self._load(self._signature())
+        self._watcher = None
+        if reload_seconds > 0:
+            self._watcher = threading.Thread(target=self._watch, name="template-reload", daemon=True)
+            self._watcher.start()
+
+    def _template_dirs(self):
+        try:
+            entries = sorted(os.scandir(self.root), key=lambda entry: entry.name)
+        except OSError:
+            return []
+        return [entry.path for entry in entries if entry.is_dir() and not entry.name.startswith((".", "_"))]
+
+    def _signature(self):
+        """Modification times and sizes of every template file"""
+        signature = []
+        for path in self._template_dirs():
+            for entry in os.scandir(path):
+                if entry.is_file():
+                    stat = entry.stat()
+                    signature.append((entry.path, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(signature))
+
+    def _load(self, signature):
+        templates = []
+        errors = []
+        names = set()
+        for path in self._template_dirs():
+            try:
+                template = load_template(path)
+            except TemplateError as e:
+                errors.append(str(e))
+                continue
+            if template.name in names:
+                errors.append(f"{template.slug}: duplicate template name {template.name!r}")
+                continue
+            names.add(template.name)
+            templates.append(template)
+        return _Snapshot(templates, errors, signature)
+
+    def reload_if_changed(self):
+        """Reload the directory if any file changed; return True when it did"""
+        with self._lock:
+            signature = self._signature()
+            if signature == self._snapshot.signature:
+                return False
+            self._snapshot = self._load(signature)
+            self.version += 1
+            self.reloads += 1
+            return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.reload_seconds)
+            try:
+                self.reload_if_changed()
+            except Exception:
+                # A half-written file is picked up on the next poll
+                pass
+
+    @property
+    def templates(self):
+        return self._snapshot.by_name.values()
+
+    @property
+    def library(self):
+        """Read-only mapping of template name to its category, description and features"""
+        return self._snapshot.library
+
+    def get(self, name):
+        return self._snapshot.by_name.get(name)
+
+    def code(self, name, default=None):
+        template = self._snapshot.by_name.get(name)
+        if template is None or template.code is None:
+            return default
+        return template.code
+
+    def by_category(self, category):
+        return self._snapshot.by_category.get(category, ())
+
+    def with_feature(self, feature):
+        return self._snapshot.by_feature.get(feature.lower(), ())
+
+    @property
+    def categories(self):
+        return self._snapshot.by_category.keys()
+
+    @property
+    def errors(self):
+        """Templates skipped at the last load, with the reason"""
+        return self._snapshot.errors
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "templates": len(snapshot.by_name),
+            "with_code": sum(1 for template in snapshot.by_name.values() if template.code is not None),
+            "errors": len(snapshot.errors),
+            "reloads": self.reloads,
+        }
+
+
+_template_registry = None
+_template_registry_lock = threading.Lock()
+
+
+def get_template_registry():
+    """Return the registry shared by every session in this process"""
+    global _template_registry
+    if _template_registry is None:
+        with _template_registry_lock:
+            if _template_registry is None:
+                _template_registry = TemplateRegistry()
+    return _template_registry
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep anything the modules persist out of the working tree
+os.environ.setdefault("FOCUS_BUILDER_DATA_DIR", tempfile.mkdtemp(prefix="focus-builder-tests-"))
+os.environ.setdefault("FOCUS_BUILDER_WARMUP", "0")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
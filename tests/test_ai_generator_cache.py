@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from ai_generator import AIGenerator
+from llm_cache import ResponseCache
+
+
+class FakeLLM:
+    """Returns the queued replies in order and counts the calls"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def create(self, **params):
+        self.calls += 1
+        content = self.replies.pop(0)
+        if params.get("stream"):
+            delta = SimpleNamespace(content=content)
+            return iter([SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])])
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.SPEC_COMPILER_ENABLED", False)
+    generator = AIGenerator()
+    generator.response_cache = ResponseCache(str(tmp_path / "llm_cache.sqlite3"))
+    return generator
+
+
+VALID_CODE = "def execute_tool():\n    import streamlit as st\n    st.write('hi')\n"
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_unparsable_spec_is_not_cached(generator, stream):
+    generator.llm = FakeLLM("{not json", '{"name": "Tool"}')
+    generate = generator.stream_tool_specification if stream else generator.generate_tool_specification
+
+    assert generate(f"a tool {stream}") is None
+    assert generate(f"a tool {stream}") == {"name": "Tool"}
+    assert generator.llm.calls == 2
+    assert generate(f"a tool {stream}") == {"name": "Tool"}
+    assert generator.llm.calls == 2
+
+
+def test_invalid_code_is_not_cached(generator):
+    generator.llm = FakeLLM("def execute_tool(:\n", VALID_CODE)
+    spec = {"name": "Tool"}
+
+    assert generator.generate_streamlit_code(spec) == "def execute_tool(:\n"
+    assert generator.generate_streamlit_code(spec) == VALID_CODE
+    assert generator.generate_streamlit_code(spec) == VALID_CODE
+    assert generator.llm.calls == 2
+
+
+def test_failing_diff_is_not_cached(generator):
+    generator.llm = FakeLLM("not a diff", "still not a diff")
+
+    assert generator._improve_with_patch(VALID_CODE, "make it blue")[0] is None
+    assert generator._improve_with_patch(VALID_CODE, "make it blue")[0] is None
+    assert generator.llm.calls == 2
+
+
+def test_fresh_skips_the_cache(generator):
+    generator.llm = FakeLLM('{"name": "First"}', '{"name": "Second"}')
+
+    assert generator.generate_tool_specification("same request") == {"name": "First"}
+    assert generator.generate_tool_specification("same request", fresh=True) == {"name": "Second"}
+    # The fresh reply replaces the cached one
+    assert generator.generate_tool_specification("same request") == {"name": "Second"}
+    assert generator.llm.calls == 2
+
+
+def test_patch_over_budget_falls_back_to_a_full_rewrite(generator, monkeypatch):
+    monkeypatch.setitem(config.PROMPT_TOKEN_BUDGETS, "improve", 10)
+    generator.llm = FakeLLM(VALID_CODE.replace("hi", "hello"))
+
+    improved = generator.improve_tool(VALID_CODE, "say hello")
+
+    assert improved == VALID_CODE.replace("hi", "hello")
+    assert generator.last_improvement["mode"] == "full"
+    assert "budget" in generator.last_improvement["fallback_reason"]
+    assert generator.llm.calls == 1
+
+
+def test_full_rewrite_over_budget_is_sent_anyway(generator, monkeypatch, caplog):
+    monkeypatch.setitem(config.PROMPT_TOKEN_BUDGETS, "improve", 10)
+    monkeypatch.setitem(config.PROMPT_TOKEN_BUDGETS, "improve_full", 10)
+    generator.llm = FakeLLM(VALID_CODE.replace("hi", "hello"))
+
+    assert generator.improve_tool(VALID_CODE, "say hello") == VALID_CODE.replace("hi", "hello")
+    assert "improve_full prompt" in caplog.text
@@ -0,0 +1,42 @@
+from code_cache import CodeCache
+from code_repair import error_line, repair_context
+
+CODE = "def execute_tool():\n    x = 1\n    return undefined_name\n"
+
+
+def test_error_line_reads_the_innermost_preflight_frame():
+    traceback_text = (
+        'Traceback (most recent call last):\n'
+        '  File "/srv/preflight.py", line 220, in _run_tool\n'
+        '  File "<preflight>", line 7, in <module>\n'
+        '  File "<preflight>", line 3, in execute_tool\n'
+        "NameError: name 'undefined_name' is not defined\n"
+    )
+    assert error_line("NameError", traceback_text) == 3
+
+
+def test_error_line_reads_frames_of_code_compiled_by_the_code_cache():
+    import traceback
+
+    tool_function = CodeCache().get(CODE).bind({"__builtins__": __builtins__})
+    try:
+        tool_function()
+    except NameError:
+        traceback_text = traceback.format_exc()
+    assert error_line("NameError", traceback_text) == 3
+
+
+def test_error_line_falls_back_to_the_message():
+    assert error_line("invalid syntax (line 12)") == 12
+    assert error_line("something broke") is None
+
+
+def test_errors_without_a_line_get_an_outline_of_long_code():
+    helpers = "".join(f"def helper_{i}():\n    return {i}\n\n\n" for i in range(60))
+    code = helpers + "def execute_tool():\n    return helper_1()\n"
+
+    scope, context = repair_context(code, "Code must contain an 'execute_tool()' function")
+
+    assert scope.startswith("an outline")
+    assert "OUTLINE" in context
+    assert len(context) < len(code)
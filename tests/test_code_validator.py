@@ -0,0 +1,25 @@
+import pytest
+
+from code_validator import analyze_code
+
+
+def tool(body):
+    return "def execute_tool():\n    import streamlit as st\n" + "".join(f"    {line}\n" for line in body.splitlines())
+
+
+def test_plain_tool_is_valid():
+    assert analyze_code(tool("st.write('hi')")).valid
+
+
+@pytest.mark.parametrize("body", [
+    'import io\nio.open("/etc/passwd")',
+    'globals()["__builtins__"]["__import__"]("os").system("id")',
+    'getattr(st, "__glob"+"als__")',
+    'st.__dict__.get("__builtins__")',
+    'vars(st)',
+    'setattr(st, "write", print)',
+])
+def test_indirect_access_to_builtins_is_rejected(body):
+    result = analyze_code(tool(body))
+    assert not result.valid
+    assert "dangerous operation" in result.message
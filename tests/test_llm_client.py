@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+import llm_client
+from llm_client import LLMClient, _SlotStream
+
+
+class FakeResponse:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+def test_closing_a_slot_stream_closes_the_response_and_frees_the_slot_once():
+    response = FakeResponse([SimpleNamespace(usage=None)] * 3)
+    freed = []
+    stream = _SlotStream(response, freed.append)
+
+    next(iter(stream))
+    stream.close()
+    stream.close()
+
+    assert response.closed
+    assert freed == [None]
+
+
+def test_backoff_does_not_hold_a_concurrency_slot(monkeypatch):
+    openai = pytest.importorskip("openai")
+    httpx = pytest.importorskip("httpx")
+
+    client = LLMClient(max_concurrency=1, max_retries=1)
+    attempts = []
+
+    def create(**params):
+        attempts.append(params)
+        if len(attempts) == 1:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "http://llm.invalid"))
+        return SimpleNamespace(usage=None)
+
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    free_while_sleeping = []
+
+    def sleep(seconds):
+        # Another request can take the only slot during the backoff
+        free = client._slots.acquire(blocking=False)
+        if free:
+            client._slots.release()
+        free_while_sleeping.append(free)
+
+    monkeypatch.setattr(llm_client.time, "sleep", sleep)
+    client.create(model="m", messages=[{"role": "user", "content": "hi"}])
+
+    assert free_while_sleeping == [True]
+    assert len(attempts) == 2
+    assert client.stats()["in_flight"] == 0
@@ -0,0 +1,94 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ai_generator import SPECULATION_FIELDS, AIGenerator, _SpeculationCancelled
+
+SPEC = {
+    "name": "Reading Log",
+    "category": "tracker",
+    "features": ["log books"],
+    "data_structure": {"fields": [{"name": "title", "type": "string", "description": "Book"}]},
+    "visualizations": [{"type": "table", "description": "All books"}],
+    "interactions": ["add book"],
+    "layout": {"columns": 1, "sections": ["Books"]},
+    "description": "Keep a list of the books I read this year, with a short note for each one.",
+}
+
+CODE = "def execute_tool():\n    import streamlit as st\n    st.write('books')\n"
+
+
+class FakeStream:
+    def __init__(self, text, size=8, delay=0.0):
+        self.chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        self.delay = delay
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            if self.closed:
+                return
+            delta = SimpleNamespace(content=chunk)
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])
+
+    def close(self):
+        self.closed = True
+
+
+class FakeLLM:
+    """Streams the spec for JSON requests and the code for the rest"""
+
+    def __init__(self, delay=0.0):
+        self.streams = []
+        self.delay = delay
+
+    def create(self, **params):
+        text = json.dumps(SPEC) if "response_format" in params else CODE
+        stream = FakeStream(text, delay=self.delay)
+        self.streams.append(stream)
+        return stream
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    monkeypatch.setattr("config.SPEC_COMPILER_ENABLED", False)
+    generator = AIGenerator()
+    generator.response_cache = None
+    generator.llm = FakeLLM()
+    return generator
+
+
+def test_description_streams_last_after_the_code_shaping_fields():
+    assert list(SPEC)[-1] == "description"
+    assert set(SPECULATION_FIELDS) == set(SPEC) - {"description"}
+
+
+def test_speculation_is_kept_and_stats_come_back_with_the_code(generator):
+    tool_spec, tool_code = generator.generate_pipelined("a reading log", poll_interval=0.01)
+
+    assert tool_spec == SPEC
+    assert tool_code == CODE
+    assert generator.last_pipeline_report["speculation"] == "kept"
+    assert len(generator.llm.streams) == 2
+    assert generator.last_stats["code"]["duration"] > 0
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_cancelled_speculation_closes_its_stream(generator):
+    generator.llm = FakeLLM(delay=0.01)
+    progress = {"text": "", "cancelled": True}
+
+    with pytest.raises(_SpeculationCancelled):
+        generator._code_worker(SPEC, progress)
+    # The response is read on a shared thread, which closes it at the next chunk
+    assert wait_for(lambda: generator.llm.streams[-1].closed)
+    assert "code" not in generator.last_stats
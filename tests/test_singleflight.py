@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import FlightAbandoned, SingleFlight
+
+
+def slow_words(words, started=None, closed=None):
+    def fn(publish):
+        if started is not None:
+            started.set()
+        text = ""
+        try:
+            for word in words:
+                time.sleep(0.02)
+                text += word
+                publish(text)
+        except FlightAbandoned:
+            closed.set()
+            raise
+        return text
+
+    return fn
+
+
+def test_concurrent_streams_share_one_call_and_see_every_update():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+    results, updates = {}, {"leader": [], "waiter": []}
+
+    def fn(publish):
+        calls.append(1)
+        return slow_words(["a", "b", "c"], started)(publish)
+
+    def run(name):
+        results[name] = flight.stream("key", fn, updates[name].append)
+
+    leader = threading.Thread(target=run, args=("leader",))
+    leader.start()
+    started.wait()
+    waiter = threading.Thread(target=run, args=("waiter",))
+    waiter.start()
+    leader.join()
+    waiter.join()
+
+    assert len(calls) == 1
+    assert results == {"leader": ("abc", False), "waiter": ("abc", True)}
+    assert updates["leader"] == ["a", "ab", "abc"]
+    # A late joiner starts from the latest text and still ends with the full one
+    assert updates["waiter"][-1] == "abc"
+
+
+def test_stream_stops_when_every_caller_leaves():
+    flight = SingleFlight()
+    closed = threading.Event()
+
+    def stop(text):
+        raise KeyboardInterrupt()
+
+    with pytest.raises(KeyboardInterrupt):
+        flight.stream("key", slow_words(["a"] * 50, closed=closed), stop)
+    assert closed.wait(2)
+    assert flight.stats()["abandoned"] == 1
+    assert flight.stats()["in_flight"] == 0
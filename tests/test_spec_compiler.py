@@ -0,0 +1,93 @@
+import copy
+import os
+import sys
+
+import pytest
+
+from spec_compiler import SpecCompiler, UnsupportedSpec, compile_spec
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from fake_openai_server import DEFAULT_SPEC  # noqa: E402
+
+EXPENSE_SPEC = {
+    "name": "Expense Tracker",
+    "category": "tracker",
+    "description": "Log expenses and see where the money goes",
+    "features": ["expense logging", "category filtering", "charts", "CSV export"],
+    "data_structure": {
+        "fields": [
+            {"name": "description", "type": "string", "description": "What the money was spent on"},
+            {"name": "amount", "type": "number", "description": "Amount spent"},
+            {"name": "category", "type": "string", "description": "One of: Food, Rent, Travel, Other"},
+            {"name": "date", "type": "date", "description": "Day of the expense"},
+        ]
+    },
+    "visualizations": [
+        {"type": "chart", "description": "Total amount by category"},
+        {"type": "chart", "description": "Amount over time"},
+        {"type": "metric", "description": "Total amount"},
+    ],
+    "interactions": ["add expense", "filter by category", "delete expense", "export to CSV"],
+}
+
+
+def with_changes(spec, **changes):
+    spec = copy.deepcopy(spec)
+    spec.update(changes)
+    return spec
+
+
+def test_regular_spec_compiles():
+    code = compile_spec(EXPENSE_SPEC)
+    assert "def execute_tool():" in code
+    assert "st.download_button(" in code
+    assert "records.delete(" in code
+
+
+def test_default_bench_spec_falls_back():
+    code, reason = SpecCompiler().compile(DEFAULT_SPEC)
+    assert code is None
+    assert reason
+
+
+@pytest.mark.parametrize("interaction", [
+    "Set reminders for each habit via email",
+    "Track streaks and send push notifications",
+    "view habit",
+    "track habit",
+])
+def test_loose_interactions_fall_back(interaction):
+    spec = with_changes(EXPENSE_SPEC, interactions=["add expense", interaction])
+    with pytest.raises(UnsupportedSpec, match="interaction"):
+        compile_spec(spec)
+
+
+@pytest.mark.parametrize("feature", ["streak tracking", "daily check-offs", "budget alerts"])
+def test_unsupported_features_fall_back(feature):
+    spec = with_changes(EXPENSE_SPEC, features=["expense logging", feature])
+    with pytest.raises(UnsupportedSpec, match="feature"):
+        compile_spec(spec)
+
+
+def test_feature_naming_a_missing_component_falls_back():
+    spec = with_changes(EXPENSE_SPEC, visualizations=[{"type": "table", "description": "All expenses"}],
+                        features=["expense charts"])
+    with pytest.raises(UnsupportedSpec, match="feature"):
+        compile_spec(spec)
+
+
+def test_metric_the_templates_do_not_compute_falls_back():
+    spec = with_changes(DEFAULT_SPEC, features=[], interactions=["add habit", "delete habit"], visualizations=[
+        {"type": "metric", "description": "Current streak per habit"},
+    ])
+    with pytest.raises(UnsupportedSpec, match="metric"):
+        compile_spec(spec)
+
+
+def test_rate_chart_falls_back():
+    spec = with_changes(DEFAULT_SPEC, features=[], interactions=["add habit", "delete habit"], visualizations=[
+        {"type": "chart", "description": "Completion rate over time"},
+    ])
+    with pytest.raises(UnsupportedSpec, match="chart"):
+        compile_spec(spec)
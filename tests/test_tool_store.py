@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+from tool_store import ToolStore
+
+CODE = "def execute_tool():\n    pass\n"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ToolStore(str(tmp_path / "tools.sqlite3"))
+
+
+def test_lookups_by_id_match_the_owner(store):
+    tool_id = store.create_tool("alice", "Tool", "", {"category": "tracker"}, CODE)
+
+    assert store.exists("alice", tool_id)
+    assert store.get_code("alice", tool_id) == CODE
+    assert not store.exists("mallory", tool_id)
+    assert store.get_code("mallory", tool_id) is None
+    assert store.get_metadata("mallory", tool_id) is None
+    assert store.get_specification("mallory", tool_id) is None
+
+
+def test_other_owners_cannot_change_or_delete_a_tool(store):
+    tool_id = store.create_tool("alice", "Tool", "", {}, CODE)
+
+    assert not store.update_code("mallory", tool_id, "def execute_tool():\n    1\n")
+    assert not store.delete_tool("mallory", tool_id)
+    assert store.get_code("alice", tool_id) == CODE
+
+    assert store.delete_tool("alice", tool_id)
+    assert not store.exists("alice", tool_id)
+
+
+def test_replaced_code_can_be_restored(store):
+    tool_id = store.create_tool("alice", "Tool", "", {}, CODE)
+    repaired = "def execute_tool():\n    return 1\n"
+    assert not store.has_previous_code("alice", tool_id)
+    assert not store.revert_code("alice", tool_id)
+
+    assert store.update_code("alice", tool_id, repaired)
+    assert store.has_previous_code("alice", tool_id)
+    assert not store.revert_code("mallory", tool_id)
+
+    assert store.revert_code("alice", tool_id)
+    assert store.get_code("alice", tool_id) == CODE
+    # Restoring again redoes the change
+    assert store.revert_code("alice", tool_id)
+    assert store.get_code("alice", tool_id) == repaired
+
+
+def test_older_stores_gain_the_previous_code_column(tmp_path):
+    path = str(tmp_path / "tools.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE tools (id TEXT PRIMARY KEY, owner TEXT NOT NULL, name TEXT NOT NULL,
+                    description TEXT NOT NULL DEFAULT '', category TEXT NOT NULL DEFAULT 'other',
+                    created_at TEXT NOT NULL, specification TEXT, code TEXT)""")
+    conn.execute("INSERT INTO tools (id, owner, name, created_at, code) VALUES ('t1', 'alice', 'Tool', '2024', ?)", (CODE,))
+    conn.commit()
+    conn.close()
+
+    store = ToolStore(path)
+    assert store.update_code("alice", "t1", "def execute_tool():\n    return 1\n")
+    assert store.revert_code("alice", "t1")
+    assert store.get_code("alice", "t1") == CODE
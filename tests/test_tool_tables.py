@@ -0,0 +1,68 @@
+import gc
+
+import numpy as np
+import pytest
+
+from tool_tables import TableStorage, ToolTable, _LoadedTables
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return TableStorage(str(tmp_path / "tables.sqlite3"))
+
+
+def test_sparse_int_row_survives_reload(storage):
+    table = ToolTable(storage, "sparse_int")
+    table.append({"a": 1})
+    table.append({"b": "y"})
+
+    reloaded = ToolTable(storage, "sparse_int")
+    assert reloaded.get(0)["a"] == 1
+    assert np.isnan(reloaded.get(1)["a"])
+    assert reloaded.get(1)["b"] == "y"
+
+
+def test_sparse_bool_row_reloads_as_missing(storage):
+    table = ToolTable(storage, "sparse_bool")
+    table.append({"done": True})
+    table.append({"title": "later"})
+
+    reloaded = ToolTable(storage, "sparse_bool")
+    assert reloaded.get(0)["done"] is True
+    assert reloaded.get(1)["done"] is None
+
+
+def test_frame_is_a_snapshot(storage):
+    table = ToolTable(storage, "snapshot")
+    table.append({"v": 1})
+    frame = table.frame()
+
+    frame.loc[0, "v"] = 99
+    assert table.get(0)["v"] == 1
+
+    table.update(0, v=5)
+    assert frame.loc[0, "v"] == 99
+    assert table.frame().loc[0, "v"] == 5
+
+
+def test_evicted_table_in_use_is_not_loaded_twice():
+    tables = _LoadedTables(maxsize=1)
+    held = tables.get("a", ToolTable)
+    tables.get("b", ToolTable)
+    assert tables.get("a", ToolTable) is held
+
+    del held
+    tables.get("b", ToolTable)
+    gc.collect()
+    created = []
+    tables.get("a", lambda: created.append(ToolTable()) or created[-1])
+    assert created
+
+
+def test_widening_to_object_reencodes_stored_values(storage):
+    table = ToolTable(storage, "widen")
+    table.append({"v": 3})
+    table.append({"v": "three"})
+
+    reloaded = ToolTable(storage, "widen")
+    assert [reloaded.get(0)["v"], reloaded.get(1)["v"]] == [3, "three"]
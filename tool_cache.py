@@ -0,0 +1,193 @@
+import functools
+import hashlib
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+import config
+
+
+def _fingerprint(value, digest):
+    """Feed a stable description of `value` into `digest`"""
+    module = type(value).__module__
+    if module.startswith("pandas"):
+        import pandas as pd
+
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            labels = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+            digest.update(repr((type(value).__name__, value.shape, labels, list(value.dtypes) if labels else [])).encode())
+            try:
+                digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+            except TypeError:
+                # Cells holding lists or dicts cannot be hashed by pandas
+                digest.update(pickle.dumps(value, protocol=5))
+            return
+    if module == "numpy" and hasattr(value, "tobytes"):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(value.tobytes() if value.dtype != object else pickle.dumps(value.tolist(), protocol=5))
+        return
+    try:
+        digest.update(pickle.dumps(value, protocol=5))
+    except Exception:
+        # Unpicklable arguments (widgets, tables, modules) are keyed by identity
+        digest.update(f"{type(value).__qualname__}@{id(value)}".encode())
+
+
+def _sizeof(value):
+    """Approximate bytes held by a cached result"""
+    module = type(value).__module__
+    try:
+        if module.startswith("pandas") and hasattr(value, "memory_usage"):
+            usage = value.memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        if module == "numpy" and hasattr(value, "nbytes"):
+            return int(value.nbytes)
+        return len(pickle.dumps(value, protocol=5))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class _ToolEntries:
+    """LRU of one tool's results at one data version, bounded by their total size"""
+
+    def __init__(self, version):
+        self.version = version
+        self.entries = OrderedDict()
+        self.bytes = 0
+
+
+class ToolCache:
+    """Process-wide memo of values derived by generated tools.
+
+    Results are grouped per tool (owner and tool id). Each group is an LRU
+    bounded by `max_bytes_per_tool` that only holds results for the tool's
+    current data version; at most `max_tools` groups are kept, dropping the
+    least recently used tool first.
+    """
+
+    def __init__(self, max_bytes_per_tool, max_tools):
+        self.max_bytes_per_tool = max_bytes_per_tool
+        self.max_tools = max_tools
+        self._tools = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.oversized = 0
+
+    def get(self, tool_key, version, key):
+        """Return (found, value)"""
+        with self._lock:
+            group = self._tools.get(tool_key)
+            if group is not None and group.version == version and key in group.entries:
+                self._tools.move_to_end(tool_key)
+                group.entries.move_to_end(key)
+                self.hits += 1
+                return True, group.entries[key][0]
+            self.misses += 1
+            return False, None
+
+    def put(self, tool_key, version, key, value):
+        size = _sizeof(value)
+        with self._lock:
+            if size > self.max_bytes_per_tool:
+                self.oversized += 1
+                return
+
+            group = self._tools.get(tool_key)
+            if group is None or group.version != version:
+                # Results derived from older data can never be served again
+                if group is not None:
+                    self.evictions += len(group.entries)
+                group = self._tools[tool_key] = _ToolEntries(version)
+            self._tools.move_to_end(tool_key)
+
+            previous = group.entries.pop(key, None)
+            if previous is not None:
+                group.bytes -= previous[1]
+            group.entries[key] = (value, size)
+            group.bytes += size
+
+            while group.bytes > self.max_bytes_per_tool:
+                _, (_, evicted_size) = group.entries.popitem(last=False)
+                group.bytes -= evicted_size
+                self.evictions += 1
+            while len(self._tools) > self.max_tools:
+                _, evicted = self._tools.popitem(last=False)
+                self.evictions += len(evicted.entries)
+
+    def clear_tool(self, tool_key):
+        with self._lock:
+            self._tools.pop(tool_key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tools": len(self._tools),
+                "entries": sum(len(group.entries) for group in self._tools.values()),
+                "bytes": sum(group.bytes for group in self._tools.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "oversized": self.oversized,
+            }
+
+
+class ToolCacheScope:
+    """The `tool_cache` decorator injected into a generated tool's globals.
+
+    A decorated function's result is reused while its arguments, the tool's
+    code and the tool's data version are unchanged. The data version changes
+    on every write to the tool's `tool_table` tables; tools that keep data in
+    st.session_state pass it in as arguments instead. Cached results are
+    shared between reruns and sessions, so treat them as read-only.
+    """
+
+    def __init__(self, cache, tool_key, code_digest, tables=None):
+        self._cache = cache
+        self._tool_key = tool_key
+        self._code_digest = code_digest
+        self._tables = tables
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            digest = hashlib.sha1(fn.__qualname__.encode())
+            for value in args:
+                _fingerprint(value, digest)
+            for name in sorted(kwargs):
+                digest.update(name.encode())
+                _fingerprint(kwargs[name], digest)
+            key = (self._code_digest, digest.hexdigest())
+            version = self.data_version
+
+            found, value = self._cache.get(self._tool_key, version, key)
+            if found:
+                return value
+            value = fn(*args, **kwargs)
+            self._cache.put(self._tool_key, version, key, value)
+            return value
+
+        return wrapper
+
+    @property
+    def data_version(self):
+        return self._tables.data_version if self._tables is not None else 0
+
+    def invalidate(self):
+        """Drop everything cached for this tool, e.g. after changing data kept outside tool_table"""
+        self._cache.clear_tool(self._tool_key)
+
+
+_tool_cache = ToolCache(
+    max_bytes_per_tool=config.TOOL_CACHE_MAX_MB_PER_TOOL * 1024 * 1024,
+    max_tools=config.TOOL_CACHE_MAX_TOOLS,
+)
+
+
+def get_tool_cache():
+    """Return the cache shared by every session in this process"""
+    return _tool_cache
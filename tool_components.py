@@ -0,0 +1,234 @@
+import hashlib
+
+import numpy as np
+
+# Widget kinds add_form() understands; a list or tuple of options becomes a selectbox
+FORM_FIELD_KINDS = ('text', 'textarea', 'number', 'int', 'date', 'checkbox')
+
+CHART_KINDS = ('line', 'bar', 'scatter', 'area', 'pie')
+
+
+def _label(name):
+    return name.replace('_', ' ').capitalize()
+
+
+def _plain(value):
+    """Python value for a data_editor cell, with missing cells as None"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return value
+
+
+def _sorted_values(values):
+    try:
+        return sorted(values)
+    except TypeError:
+        return sorted(values, key=str)
+
+
+def build_figure(kind, data, x, y=None, color=None, agg=None, title=None):
+    """Plotly figure built from trace dicts, which skips plotly express's per-call overhead.
+
+    `data` is a DataFrame or a tool_table. With `agg` ('count', 'sum' or
+    'mean'), rows are grouped by `x` (and `color`) first; 'count' needs no `y`.
+    """
+    import plotly.graph_objects as go
+
+    if kind not in CHART_KINDS:
+        raise ValueError(f"Unknown chart kind {kind!r}; expected one of {', '.join(CHART_KINDS)}")
+    frame = data.frame() if hasattr(data, 'frame') else data
+    if agg is not None:
+        keys = [x] if color is None else [x, color]
+        grouped = frame.groupby(keys, sort=True)
+        frame = (grouped.size() if agg == 'count' else grouped[y].agg(agg)).rename('value').reset_index()
+        y = 'value'
+    elif kind != 'pie' and y is None:
+        raise ValueError("A y column is needed unless agg='count'")
+
+    if kind == 'pie':
+        traces = [dict(type='pie', labels=frame[x].tolist(), values=frame[y].tolist())]
+    else:
+        trace_type = 'bar' if kind == 'bar' else 'scatter'
+        mode = {'line': 'lines+markers', 'scatter': 'markers', 'area': 'lines'}.get(kind)
+        parts = [(None, frame)] if color is None else frame.groupby(color, sort=True)
+        traces = []
+        for name, part in parts:
+            trace = dict(type=trace_type, x=part[x].tolist(), y=part[y].tolist())
+            if name is not None:
+                trace['name'] = str(name)
+            if mode is not None:
+                trace['mode'] = mode
+            if kind == 'area':
+                trace['stackgroup'] = 'one'
+            traces.append(trace)
+
+    layout = dict(title=dict(text=title)) if title else {}
+    if kind == 'bar' and color is not None:
+        layout['barmode'] = 'stack'
+    if kind != 'pie':
+        layout['xaxis'] = dict(title=dict(text=_label(x)))
+        layout['yaxis'] = dict(title=dict(text='Count' if agg == 'count' else _label(y)))
+    return go.Figure(dict(data=traces, layout=layout))
+
+
+class ToolComponents:
+    """The `ui` runtime injected into a generated tool's globals.
+
+    Ready-made CRUD building blocks over `tool_table` tables: an add form, a
+    filter bar answered from the table's indexes, a paginated data_editor
+    that writes back only the cells that changed, and charts memoized through
+    `tool_cache`. Every rerun renders at most one page of rows.
+    """
+
+    def __init__(self, st, cache):
+        self._st = st
+        self._figure = cache(build_figure)
+
+    def add_form(self, table, fields, key="add", submit_label="Add", required=()):
+        """Form that appends one row to `table`; returns the new row id on submit, else None.
+
+        `fields` maps column names to a kind from FORM_FIELD_KINDS or to a
+        list of options.
+        """
+        st = self._st
+        with st.form(key, clear_on_submit=True):
+            columns = st.columns(min(len(fields), 3) or 1)
+            values = {}
+            for position, (name, kind) in enumerate(fields.items()):
+                with columns[position % len(columns)]:
+                    values[name] = self._field(name, kind, f"{key}_{name}")
+            submitted = st.form_submit_button(submit_label)
+
+        if not submitted:
+            return None
+        values = {name: value.strip() if isinstance(value, str) else value for name, value in values.items()}
+        missing = [_label(name) for name in required if values.get(name) in (None, "")]
+        if missing:
+            st.warning(f"Please fill in: {', '.join(missing)}")
+            return None
+        return table.append(values)
+
+    def _field(self, name, kind, key):
+        st = self._st
+        label = _label(name)
+        if isinstance(kind, (list, tuple)):
+            return st.selectbox(label, list(kind), key=key)
+        if kind == 'text':
+            return st.text_input(label, key=key)
+        if kind == 'textarea':
+            return st.text_area(label, key=key)
+        if kind == 'number':
+            return float(st.number_input(label, value=0.0, key=key))
+        if kind == 'int':
+            return int(st.number_input(label, value=0, step=1, key=key))
+        if kind == 'date':
+            return st.date_input(label, key=key)
+        if kind == 'checkbox':
+            return bool(st.checkbox(label, key=key))
+        raise ValueError(f"Unknown field kind {kind!r} for {name!r}; expected one of {', '.join(FORM_FIELD_KINDS)}")
+
+    def filter_bar(self, table, columns, key="filter", formats=None):
+        """One selectbox per column, answered from indexes; returns the matching row ids, sorted.
+
+        `columns` is a list of column names or a dict of column name to label.
+        `formats` optionally maps a column to a function that displays its values.
+        """
+        st = self._st
+        labels = columns if isinstance(columns, dict) else {name: f"Filter by {_label(name)}" for name in columns}
+        formats = formats or {}
+        matches = None
+        for slot, (name, label) in zip(st.columns(len(labels) or 1), labels.items()):
+            table.create_index(name)
+            counts = table.counts(name)
+            shown = formats.get(name, str)
+            with slot:
+                choice = st.selectbox(
+                    label,
+                    [None] + _sorted_values(value for value in counts if value is not None),
+                    format_func=lambda value, shown=shown, counts=counts: (
+                        "All" if value is None else f"{shown(value)} ({counts.get(value, 0)})"
+                    ),
+                    key=f"{key}_{name}",
+                )
+            if choice is not None:
+                rows = table.lookup(name, choice)
+                matches = rows if matches is None else np.intersect1d(matches, rows, assume_unique=True)
+        return table.frame().index.to_numpy() if matches is None else matches
+
+    def table_editor(self, table, rows=None, columns=None, key="rows", page_size=50,
+                     column_config=None, editable=True, deletable=True):
+        """Paginated data_editor over `table`; writes changed cells and deletions back in one batch.
+
+        `rows` limits the editor to these row ids, e.g. from filter_bar().
+        Returns the DataFrame of the rows on the current page.
+        """
+        import pandas as pd
+
+        st = self._st
+        frame = table.frame()
+        rows = frame.index.to_numpy() if rows is None else np.asarray(rows, dtype=np.int64)
+        columns = list(columns) if columns is not None else list(frame.columns)
+
+        pages = max(1, -(-len(rows) // page_size))
+        page = 1
+        if pages > 1:
+            page = int(st.number_input("Page", min_value=1, max_value=pages, value=1, step=1,
+                                       key=f"{key}_page_{pages}"))
+            st.caption(f"{len(rows)} rows · page {page} of {pages}")
+        page_ids = rows[(page - 1) * page_size:page * page_size]
+
+        view = frame.reindex(index=page_ids, columns=columns)
+        if not editable and not deletable:
+            st.dataframe(view, hide_index=True, column_config=column_config, use_container_width=True)
+            return view
+        if deletable:
+            view = view.assign(_delete=False)
+
+        config = dict(column_config or {})
+        if deletable:
+            config['_delete'] = st.column_config.CheckboxColumn("🗑️", help="Tick rows, then press Delete")
+        # Keyed by the table version and the rows shown, so pending edits never shift onto other rows
+        shown = hashlib.sha1(np.ascontiguousarray(page_ids, dtype=np.int64).tobytes()).hexdigest()[:12]
+        edited = st.data_editor(
+            view,
+            key=f"{key}_editor_{table.version}_{shown}",
+            hide_index=True,
+            use_container_width=True,
+            column_config=config,
+            disabled=[] if editable else columns,
+        )
+        if not isinstance(edited, pd.DataFrame):
+            return view[columns]
+
+        same = (edited[columns] == view[columns]) | (edited[columns].isna() & view[columns].isna())
+        changed = ~same.to_numpy(dtype=bool)
+        for position in np.flatnonzero(changed.any(axis=1)):
+            row_id = int(edited.index[position])
+            table.update(row_id, **{
+                columns[column]: _plain(edited.iat[position, edited.columns.get_loc(columns[column])])
+                for column in np.flatnonzero(changed[position])
+            })
+        if changed.any():
+            st.rerun()
+
+        if deletable:
+            to_delete = edited.index[edited['_delete'].to_numpy(dtype=bool)]
+            if len(to_delete) and st.button(f"🗑️ Delete {len(to_delete)} selected", key=f"{key}_delete"):
+                for row_id in to_delete:
+                    table.delete(int(row_id))
+                st.rerun()
+        return edited[columns]
+
+    def figure(self, kind, data, x, y=None, color=None, agg=None, title=None):
+        """Cached build_figure(); reused until its arguments change or the tool's tables are written"""
+        return self._figure(kind, data, x, y=y, color=color, agg=agg, title=title)
+
+    def chart(self, kind, data, x, y=None, color=None, agg=None, title=None):
+        """Render a cached chart; see build_figure() for the arguments"""
+        if len(data) == 0:
+            return None
+        fig = self.figure(kind, data, x, y=y, color=color, agg=agg, title=title)
+        self._st.plotly_chart(fig, use_container_width=True)
+        return fig
@@ -3,15 +3,24 @@ import sys
 import traceback
 from io import StringIO
 import contextlib
+import config
+from code_cache import code_digest, get_code_cache
+from code_validator import analyze_code
+from telemetry import span
+from tool_cache import ToolCacheScope, get_tool_cache
+from tool_components import ToolComponents
+from tool_store import get_tool_store
+from tool_tables import ToolTableSet, get_table_storage
+from utils import get_owner_id
 
 class ToolExecutor:
     def __init__(self):
-        pass
+        self.code_cache = get_code_cache()
     
     def execute_tool(self, tool_id, tool_code):
         """Safely execute the generated tool code within the current Streamlit context"""
         
-        if tool_id not in st.session_state.generated_tools:
+        if not get_tool_store().exists(get_owner_id(), tool_id):
             st.error("Tool not found!")
             return
         
@@ -22,11 +31,34 @@ class ToolExecutor:
         if tool_namespace not in st.session_state:
             st.session_state[tool_namespace] = {}
         
+        if self.runs_isolated(tool_code):
+            # Widget interactions inside the tool rerun only this fragment, not the whole page
+            st.fragment(self._run_tool)(tool_id, tool_code)
+        else:
+            self._run_tool(tool_id, tool_code)
+    
+    def runs_isolated(self, tool_code):
+        """Whether the tool can run as a fragment.
+        
+        Fragments cannot write to the sidebar, so tools that use it keep
+        rerunning with the whole page.
+        """
+        if not config.TOOL_FRAGMENTS_ENABLED or not hasattr(st, 'fragment'):
+            return False
+        return not analyze_code(tool_code).metrics.get('uses_sidebar', False)
+    
+    def _run_tool(self, tool_id, tool_code):
+        tool_namespace = f"tool_{tool_id}_data"
+        st.session_state.pop(f"tool_{tool_id}_error", None)
+        
         try:
             # Capture any print statements or stdout
             stdout_capture = StringIO()
             
             # Prepare the execution environment
+            owner = get_owner_id()
+            tables = ToolTableSet(owner, tool_id, get_table_storage())
+            cache = ToolCacheScope(get_tool_cache(), (owner, tool_id), code_digest(tool_code), tables)
             exec_globals = {
                 'st': st,
                 'pd': None,  # Will be imported in the code if needed
@@ -37,16 +69,23 @@ class ToolExecutor:
                 'date': None,  # Will be imported in the code if needed
                 'json': None,  # Will be imported in the code if needed
                 '__builtins__': __builtins__,
-                'tool_data': st.session_state[tool_namespace]  # Tool-specific data storage
+                'tool_data': st.session_state[tool_namespace],  # Tool-specific data storage
+                'tool_table': tables,  # Persistent columnar tables
+                'tool_cache': cache,  # Memo for derived frames and figures
+                'ui': ToolComponents(st, cache)  # Paginated tables, filter bars, forms and cached charts
             }
             
             # Execute the tool code
             with contextlib.redirect_stdout(stdout_capture):
-                exec(tool_code, exec_globals)
+                with span("exec", tool_id=tool_id):
+                    # Reuse the compiled code object across reruns and sessions
+                    compiled = self.code_cache.get(tool_code)
+                    tool_function = compiled.bind(exec_globals)
                 
                 # Call the execute_tool function if it exists
-                if 'execute_tool' in exec_globals:
-                    exec_globals['execute_tool']()
+                if tool_function is not None:
+                    with span("render", tool_id=tool_id):
+                        tool_function()
                 else:
                     st.error("Generated code must contain an 'execute_tool()' function.")
                     return
@@ -61,11 +100,13 @@ class ToolExecutor:
                     st.text(captured_output)
                     
         except Exception as e:
+            details = traceback.format_exc()
+            st.session_state[f"tool_{tool_id}_error"] = (f"{type(e).__name__}: {e}", details)
             st.error(f"❌ Error executing tool: {str(e)}")
             
             # Show detailed error information
             with st.expander("🔍 Error Details", expanded=True):
-                st.code(traceback.format_exc(), language='python')
+                st.code(details, language='python')
                 
                 # Show the problematic code section
                 st.subheader("Generated Code:")
@@ -80,29 +121,15 @@ class ToolExecutor:
                 - Verify that session state variables are properly initialized
                 """)
     
+    def last_error(self, tool_id):
+        """(error, traceback) of the tool's latest run in this session if it raised, else None"""
+        return st.session_state.get(f"tool_{tool_id}_error")
+    
     def validate_tool_code(self, tool_code):
         """Validate the generated tool code for basic syntax and structure"""
         
-        try:
-            # Check for basic syntax errors
-            compile(tool_code, '<string>', 'exec')
-            
-            # Check if execute_tool function exists
-            if 'def execute_tool(' not in tool_code:
-                return False, "Code must contain an 'execute_tool()' function"
-            
-            # Check for potentially dangerous operations (basic security)
-            dangerous_keywords = ['import os', 'import sys', 'import subprocess', 'exec(', 'eval(']
-            for keyword in dangerous_keywords:
-                if keyword in tool_code:
-                    return False, f"Code contains potentially dangerous operation: {keyword}"
-            
-            return True, "Code validation passed"
-            
-        except SyntaxError as e:
-            return False, f"Syntax error: {str(e)}"
-        except Exception as e:
-            return False, f"Validation error: {str(e)}"
+        result = analyze_code(tool_code)
+        return result.valid, result.message
     
     def get_tool_data(self, tool_id):
         """Get the stored data for a specific tool"""
@@ -0,0 +1,163 @@
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+import config
+
+# Columns read when listing tools; code and specification load on demand
+METADATA_COLUMNS = ("id", "name", "description", "category", "created_at")
+
+
+class ToolStore:
+    """SQLite-backed storage for generated tools, shared by every session.
+
+    Every lookup by tool id also matches the owner, so one owner's ids cannot
+    reach another owner's tools. Replacing a tool's code keeps the version it
+    replaced so the change can be reverted. A tool's records live in tool_tables.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tools (
+                id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                name TEXT NOT NULL,
+                description TEXT NOT NULL DEFAULT '',
+                category TEXT NOT NULL DEFAULT 'other',
+                created_at TEXT NOT NULL,
+                specification TEXT,
+                code TEXT,
+                previous_code TEXT
+            );
+            CREATE INDEX IF NOT EXISTS tools_owner_created_at ON tools (owner, created_at);
+            CREATE INDEX IF NOT EXISTS tools_owner_category ON tools (owner, category, created_at);
+            """
+        )
+        # Stores created before code history was kept
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(tools)")}
+        if "previous_code" not in columns:
+            conn.execute("ALTER TABLE tools ADD COLUMN previous_code TEXT")
+
+    def _connection(self):
+        # One connection per thread lets WAL readers proceed while another session writes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def create_tool(self, owner, name, description, specification, code):
+        """Persist a new tool and return its id"""
+        tool_id = f"tool_{uuid.uuid4().hex[:12]}"
+        category = (specification or {}).get("category") or "other"
+        self._connection().execute(
+            """INSERT INTO tools (id, owner, name, description, category, created_at, specification, code)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                tool_id,
+                owner,
+                name,
+                description,
+                category,
+                datetime.now().isoformat(),
+                json.dumps(specification),
+                code,
+            ),
+        )
+        return tool_id
+
+    def list_tools(self, owner, category=None, since=None, limit=None):
+        """Return metadata for an owner's tools, newest first"""
+        query = f"SELECT {', '.join(METADATA_COLUMNS)} FROM tools WHERE owner = ?"
+        params = [owner]
+        if category is not None:
+            query += " AND category = ?"
+            params.append(category)
+        if since is not None:
+            query += " AND created_at >= ?"
+            params.append(since)
+        query += " ORDER BY created_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        return [dict(row) for row in self._connection().execute(query, params)]
+
+    def tool_ids(self, owner):
+        return {row[0] for row in self._connection().execute("SELECT id FROM tools WHERE owner = ?", (owner,))}
+
+    def count(self, owner):
+        return self._connection().execute("SELECT COUNT(*) FROM tools WHERE owner = ?", (owner,)).fetchone()[0]
+
+    def exists(self, owner, tool_id):
+        return self._connection().execute(
+            "SELECT 1 FROM tools WHERE id = ? AND owner = ?", (tool_id, owner)
+        ).fetchone() is not None
+
+    def get_metadata(self, owner, tool_id):
+        row = self._connection().execute(
+            f"SELECT {', '.join(METADATA_COLUMNS)} FROM tools WHERE id = ? AND owner = ?", (tool_id, owner)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_code(self, owner, tool_id):
+        row = self._connection().execute(
+            "SELECT code FROM tools WHERE id = ? AND owner = ?", (tool_id, owner)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_specification(self, owner, tool_id):
+        row = self._connection().execute(
+            "SELECT specification FROM tools WHERE id = ? AND owner = ?", (tool_id, owner)
+        ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def has_previous_code(self, owner, tool_id):
+        return self._connection().execute(
+            "SELECT 1 FROM tools WHERE id = ? AND owner = ? AND previous_code IS NOT NULL", (tool_id, owner)
+        ).fetchone() is not None
+
+    def update_code(self, owner, tool_id, code):
+        """Replace a tool's code, keeping the old one; returns False when the owner has no such tool"""
+        cursor = self._connection().execute(
+            "UPDATE tools SET previous_code = code, code = ? WHERE id = ? AND owner = ?", (code, tool_id, owner)
+        )
+        return cursor.rowcount > 0
+
+    def revert_code(self, owner, tool_id):
+        """Swap a tool's code with the version it replaced; returns False when there is none"""
+        cursor = self._connection().execute(
+            """UPDATE tools SET code = previous_code, previous_code = code
+               WHERE id = ? AND owner = ? AND previous_code IS NOT NULL""",
+            (tool_id, owner),
+        )
+        return cursor.rowcount > 0
+
+    def delete_tool(self, owner, tool_id):
+        """Delete a tool; returns False when the owner has no such tool"""
+        cursor = self._connection().execute("DELETE FROM tools WHERE id = ? AND owner = ?", (tool_id, owner))
+        return cursor.rowcount > 0
+
+
+_tool_store = None
+_tool_store_lock = threading.Lock()
+
+
+def get_tool_store():
+    """Return the store shared by every session in this process"""
+    global _tool_store
+    with _tool_store_lock:
+        if _tool_store is None:
+            _tool_store = ToolStore(config.data_path("tools.sqlite3"))
+        return _tool_store
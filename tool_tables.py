@@ -0,0 +1,617 @@
+import bisect
+import hashlib
+import itertools
+import json
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import date, datetime
+
+import numpy as np
+
+import config
+
+# How each column kind is held in memory and written to SQLite
+_NUMPY_DTYPES = {'int': np.int64, 'float': np.float64, 'bool': np.bool_}
+_INITIAL_CAPACITY = 64
+
+
+def _kind_of(value):
+    if isinstance(value, bool) or isinstance(value, np.bool_):
+        return 'bool'
+    if isinstance(value, (int, np.integer)):
+        return 'int'
+    if isinstance(value, (float, np.floating)):
+        return 'float'
+    if isinstance(value, datetime):
+        return 'datetime'
+    if isinstance(value, date):
+        return 'date'
+    if isinstance(value, str):
+        return 'str'
+    return 'object'
+
+
+def _widen(kind, value_kind):
+    """Smallest column kind that can hold both kinds of value"""
+    if kind == value_kind or value_kind == 'none':
+        return kind
+    if {kind, value_kind} <= {'int', 'float', 'bool'}:
+        return 'float' if 'float' in (kind, value_kind) else 'int'
+    return 'object'
+
+
+def _to_sql(kind, value):
+    if value is None:
+        return None
+    if kind in ('date', 'datetime'):
+        return value.isoformat()
+    if kind == 'object':
+        return json.dumps(value, default=str)
+    if kind in _NUMPY_DTYPES:
+        return value.item() if hasattr(value, 'item') else value
+    return value
+
+
+def _from_sql(kind, value):
+    if value is None:
+        return None
+    if kind == 'date':
+        return date.fromisoformat(value)
+    if kind == 'datetime':
+        return datetime.fromisoformat(value)
+    if kind == 'object':
+        return json.loads(value)
+    if kind == 'bool':
+        return bool(value)
+    return value
+
+
+class _Column:
+    """Growable array holding one column; appends are amortized O(1)"""
+
+    def __init__(self, kind, size, capacity):
+        if size and kind in ('int', 'bool'):
+            # Rows that predate the column have no value, which int/bool arrays cannot hold
+            kind = 'float' if kind == 'int' else 'object'
+        self.kind = kind
+        self.values = self._empty(kind, capacity)
+
+    @staticmethod
+    def _empty(kind, capacity):
+        if kind == 'float':
+            return np.full(capacity, np.nan)
+        dtype = _NUMPY_DTYPES.get(kind, object)
+        return np.empty(capacity, dtype=dtype) if dtype is not object else np.full(capacity, None, dtype=object)
+
+    def grow(self, capacity):
+        values = self._empty(self.kind, capacity)
+        values[:len(self.values)] = self.values
+        self.values = values
+
+    @property
+    def missing(self):
+        return np.nan if self.kind == 'float' else None
+
+    def set_many(self, positions, values):
+        if self.kind in _NUMPY_DTYPES:
+            self.values[positions] = values
+        else:
+            # Element-wise so list or dict values are stored as single objects
+            for position, value in zip(positions, values):
+                self.values[position] = value
+
+    def widen(self, kind):
+        values = self._empty(kind, len(self.values))
+        values[:] = self.values.astype(values.dtype)
+        self.kind = kind
+        self.values = values
+
+
+def _index_key(value):
+    """Hashable form of a stored value; missing values index under None"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class _Index:
+    """Row ids by column value, kept up to date by every write"""
+
+    def __init__(self, ordered):
+        self.ordered = ordered
+        self.rows = {}
+        self._sorted_keys = None
+
+    def add(self, key, row_id):
+        rows = self.rows.get(key)
+        if rows is None:
+            rows = self.rows[key] = set()
+            self._sorted_keys = None
+        rows.add(row_id)
+
+    def remove(self, key, row_id):
+        rows = self.rows.get(key)
+        if rows is not None:
+            rows.discard(row_id)
+            if not rows:
+                del self.rows[key]
+                self._sorted_keys = None
+
+    def sorted_keys(self):
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(key for key in self.rows if key is not None)
+        return self._sorted_keys
+
+
+def _row_ids(rows):
+    return np.fromiter(sorted(rows), dtype=np.int64, count=len(rows))
+
+
+class ToolTable:
+    """Column-oriented, append-friendly table owned by one generated tool.
+
+    Rows live in per-column NumPy buffers and are mirrored to SQLite as they
+    are written. `frame()` returns a DataFrame copied from the buffers that is
+    cached until the next write, so reading never rebuilds the frame from
+    Python objects.
+    """
+
+    def __init__(self, storage=None, table_id=None, on_change=None):
+        self._storage = storage
+        self._table_id = table_id
+        self._on_change = on_change
+        self._lock = threading.RLock()
+        self._columns = OrderedDict()
+        self._capacity = _INITIAL_CAPACITY
+        self._size = 0
+        self._alive = np.ones(self._capacity, dtype=bool)
+        self._deleted = 0
+        self._frame = None
+        self._indexes = {}
+        self.version = 0
+
+        if storage is not None:
+            storage.load(self)
+
+    def __len__(self):
+        return self._size - self._deleted
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def append(self, row):
+        """Add one row (a dict) and return its row id"""
+        return self.extend([row])[0]
+
+    def extend(self, rows):
+        """Add several rows in one write and return their row ids"""
+        rows = list(rows)
+        if not rows:
+            return []
+
+        with self._lock:
+            row_ids = [self._put(row) for row in rows]
+            if self._storage is not None:
+                self._storage.insert(self, row_ids)
+            self._changed()
+            return row_ids
+
+    def update(self, row_id, **values):
+        """Change fields of an existing row"""
+        with self._lock:
+            self._check_row(row_id)
+            for name, value in values.items():
+                column = self._column_for(name, value)
+                index = self._indexes.get(name)
+                if index is not None:
+                    index.remove(_index_key(column.values[row_id]), row_id)
+                column.values[row_id] = column.missing if value is None else value
+                if index is not None:
+                    index.add(_index_key(column.values[row_id]), row_id)
+            if self._storage is not None:
+                self._storage.update(self, row_id, list(values))
+            self._changed()
+
+    def delete(self, row_id):
+        """Remove a row; its id is never reused"""
+        with self._lock:
+            self._check_row(row_id)
+            self._alive[row_id] = False
+            self._deleted += 1
+            for name, index in self._indexes.items():
+                column = self._columns.get(name)
+                index.remove(_index_key(column.values[row_id]) if column is not None else None, row_id)
+            if self._storage is not None:
+                self._storage.delete(self, row_id)
+            self._changed()
+
+    def clear(self):
+        with self._lock:
+            self._columns.clear()
+            self._capacity = _INITIAL_CAPACITY
+            self._size = 0
+            self._alive = np.ones(self._capacity, dtype=bool)
+            self._deleted = 0
+            for name, index in self._indexes.items():
+                self._indexes[name] = _Index(index.ordered)
+            if self._storage is not None:
+                self._storage.clear(self)
+            self._changed()
+
+    def get(self, row_id):
+        """Return one row as a dict"""
+        with self._lock:
+            self._check_row(row_id)
+            return {name: column.values[row_id] for name, column in self._columns.items()}
+
+    def column(self, name):
+        """Return a read-only view of one column's live values"""
+        with self._lock:
+            values = self._columns[name].values[:self._size]
+            if self._deleted:
+                values = values[self._alive[:self._size]]
+            view = values.view()
+            view.flags.writeable = False
+            return view
+
+    def frame(self):
+        """Return a snapshot of the table as a DataFrame indexed by row id, cached until the next write"""
+        import pandas as pd
+
+        with self._lock:
+            if self._frame is None:
+                index = pd.RangeIndex(self._size, name='row_id')
+                # Copied, so neither edits to the frame nor later writes to the table reach the other;
+                # explicit Series keep object columns as objects instead of converting them to strings
+                data = {
+                    name: pd.Series(column.values[:self._size].copy(), index=index, dtype=column.values.dtype, copy=False)
+                    for name, column in self._columns.items()
+                }
+                frame = pd.DataFrame(data, index=index, copy=False)
+                if self._deleted:
+                    frame = frame[self._alive[:self._size]]
+                self._frame = frame
+            return self._frame
+
+    def create_index(self, name, ordered=False):
+        """Index a column so lookup(), counts() and, when `ordered`, between() skip full scans.
+
+        Idempotent; the index is kept up to date by every later write.
+        """
+        with self._lock:
+            index = self._indexes.get(name)
+            if index is not None:
+                index.ordered = index.ordered or ordered
+                return
+            index = _Index(ordered)
+            column = self._columns.get(name)
+            for row_id in np.flatnonzero(self._alive[:self._size]):
+                index.add(_index_key(column.values[row_id]) if column is not None else None, int(row_id))
+            self._indexes[name] = index
+
+    def lookup(self, name, value):
+        """Sorted ids of the rows whose indexed column equals `value`"""
+        with self._lock:
+            return _row_ids(self._indexes[name].rows.get(_index_key(value), ()))
+
+    def between(self, name, low=None, high=None):
+        """Sorted ids of the rows with low <= value < high on an ordered index (None is unbounded)"""
+        with self._lock:
+            index = self._indexes[name]
+            if not index.ordered:
+                raise ValueError(f"The index on {name!r} was not created with ordered=True")
+            keys = index.sorted_keys()
+            start = 0 if low is None else bisect.bisect_left(keys, low)
+            end = len(keys) if high is None else bisect.bisect_left(keys, high)
+            rows = set()
+            for key in keys[start:end]:
+                rows.update(index.rows[key])
+            return _row_ids(rows)
+
+    def counts(self, name):
+        """Number of rows per value of an indexed column"""
+        with self._lock:
+            return {key: len(rows) for key, rows in self._indexes[name].rows.items()}
+
+    def _put(self, row):
+        row_id = self._size
+        if row_id == self._capacity:
+            self._capacity *= 2
+            for column in self._columns.values():
+                column.grow(self._capacity)
+            alive = np.ones(self._capacity, dtype=bool)
+            alive[:row_id] = self._alive[:row_id]
+            self._alive = alive
+
+        for name, value in row.items():
+            self._column_for(name, value)
+        for name, column in list(self._columns.items()):
+            if name not in row and column.kind in ('int', 'bool'):
+                # int/bool arrays cannot hold a missing value; widen (and persist the new kind) first
+                column = self._column_for(name, None)
+            column.values[row_id] = row.get(name, column.missing)
+        for name, index in self._indexes.items():
+            column = self._columns.get(name)
+            index.add(_index_key(column.values[row_id]) if column is not None else None, row_id)
+        self._size += 1
+        return row_id
+
+    def _column_for(self, name, value):
+        kind = _kind_of(value) if value is not None else 'none'
+        column = self._columns.get(name)
+        if column is None:
+            column = _Column('object' if kind == 'none' else kind, self._size, self._capacity)
+            self._columns[name] = column
+            if self._storage is not None:
+                self._storage.add_column(self, name, column.kind)
+            return column
+
+        widened = _widen(column.kind, kind)
+        if kind == 'none' and column.kind in ('int', 'bool'):
+            widened = 'float' if column.kind == 'int' else 'object'
+        if widened != column.kind:
+            column.widen(widened)
+            if self._storage is not None:
+                self._storage.set_column_kind(self, name, column.kind)
+        return column
+
+    def _check_row(self, row_id):
+        if not 0 <= row_id < self._size or not self._alive[row_id]:
+            raise KeyError(f"No row with id {row_id}")
+
+    def _changed(self):
+        self._frame = None
+        self.version += 1
+        if self._on_change is not None:
+            self._on_change()
+
+
+class TableStorage:
+    """Mirrors ToolTable writes into SQLite, one SQL table per tool table"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS table_columns (
+                table_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                PRIMARY KEY (table_id, name)
+            );
+            """
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _sql_table(table):
+        return f"data_{table._table_id}"
+
+    def _column_positions(self, table):
+        # SQL column names are positional (c0, c1, ...) so field names never reach the SQL text
+        rows = self._connection().execute(
+            "SELECT name, position FROM table_columns WHERE table_id = ?", (table._table_id,)
+        )
+        return dict(rows.fetchall())
+
+    def load(self, table):
+        conn = self._connection()
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "{self._sql_table(table)}" (row_id INTEGER PRIMARY KEY, alive INTEGER NOT NULL DEFAULT 1)')
+        columns = conn.execute(
+            "SELECT name, position, kind FROM table_columns WHERE table_id = ? ORDER BY position",
+            (table._table_id,)
+        ).fetchall()
+        if not columns:
+            return
+
+        select = ", ".join(f"c{position}" for _, position, _ in columns)
+        rows = conn.execute(f'SELECT row_id, alive, {select} FROM "{self._sql_table(table)}" ORDER BY row_id').fetchall()
+        if not rows:
+            for name, _, kind in columns:
+                table._columns[name] = _Column(kind, 0, table._capacity)
+            return
+
+        size = rows[-1][0] + 1
+        capacity = max(_INITIAL_CAPACITY, 1 << (size - 1).bit_length())
+        alive = np.zeros(capacity, dtype=bool)
+        row_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        alive[row_ids] = [bool(row[1]) for row in rows]
+        alive[size:] = True
+
+        for offset, (name, _, kind) in enumerate(columns, start=2):
+            column = _Column(kind, 0, capacity)
+            values = [_from_sql(kind, row[offset]) for row in rows]
+            if column.kind == 'float':
+                values = [np.nan if value is None else value for value in values]
+            column.set_many(row_ids, values)
+            table._columns[name] = column
+
+        table._capacity = capacity
+        table._size = size
+        table._alive = alive
+        table._deleted = int(size - alive[:size].sum())
+
+    def add_column(self, table, name, kind):
+        conn = self._connection()
+        position = conn.execute(
+            "SELECT COUNT(*) FROM table_columns WHERE table_id = ?", (table._table_id,)
+        ).fetchone()[0]
+        conn.execute(
+            "INSERT INTO table_columns (table_id, position, name, kind) VALUES (?, ?, ?, ?)",
+            (table._table_id, position, name, kind)
+        )
+        conn.execute(f'ALTER TABLE "{self._sql_table(table)}" ADD COLUMN c{position}')
+
+    def set_column_kind(self, table, name, kind):
+        conn = self._connection()
+        conn.execute("BEGIN")
+        conn.execute(
+            "UPDATE table_columns SET kind = ? WHERE table_id = ? AND name = ?", (kind, table._table_id, name)
+        )
+        if kind == 'object':
+            # Object columns are stored as JSON, so values written under the old kind are re-encoded
+            position = self._column_positions(table)[name]
+            values = table._columns[name].values[:table._size]
+            conn.executemany(
+                f'UPDATE "{self._sql_table(table)}" SET c{position} = ? WHERE row_id = ?',
+                [(_to_sql(kind, None if _is_missing(value) else value), row_id) for row_id, value in enumerate(values)]
+            )
+        conn.execute("COMMIT")
+
+    def insert(self, table, row_ids):
+        positions = self._column_positions(table)
+        names = list(table._columns)
+        placeholders = ", ".join("?" for _ in range(len(names) + 1))
+        sql_columns = ", ".join(["row_id"] + [f"c{positions[name]}" for name in names])
+        kinds = [table._columns[name].kind for name in names]
+
+        params = []
+        for row_id in row_ids:
+            values = [table._columns[name].values[row_id] for name in names]
+            params.append([row_id] + [
+                _to_sql(kind, None if _is_missing(value) else value) for kind, value in zip(kinds, values)
+            ])
+
+        conn = self._connection()
+        conn.execute("BEGIN")
+        conn.executemany(f'INSERT INTO "{self._sql_table(table)}" ({sql_columns}) VALUES ({placeholders})', params)
+        conn.execute("COMMIT")
+
+    def update(self, table, row_id, names):
+        positions = self._column_positions(table)
+        assignments = ", ".join(f"c{positions[name]} = ?" for name in names)
+        values = [
+            _to_sql(table._columns[name].kind, None if _is_missing(value) else value)
+            for name, value in ((name, table._columns[name].values[row_id]) for name in names)
+        ]
+        self._connection().execute(
+            f'UPDATE "{self._sql_table(table)}" SET {assignments} WHERE row_id = ?', values + [row_id]
+        )
+
+    def delete(self, table, row_id):
+        self._connection().execute(f'UPDATE "{self._sql_table(table)}" SET alive = 0 WHERE row_id = ?', (row_id,))
+
+    def clear(self, table):
+        conn = self._connection()
+        conn.execute(f'DROP TABLE IF EXISTS "{self._sql_table(table)}"')
+        conn.execute("DELETE FROM table_columns WHERE table_id = ?", (table._table_id,))
+        conn.execute(f'CREATE TABLE "{self._sql_table(table)}" (row_id INTEGER PRIMARY KEY, alive INTEGER NOT NULL DEFAULT 1)')
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+class ToolTableSet:
+    """The `tool_table(name)` callable injected into a generated tool's globals"""
+
+    def __init__(self, owner, tool_id, storage=None):
+        self.owner = owner
+        self.tool_id = tool_id
+        self.storage = storage
+        # Without storage (e.g. preflight runs) tables are private to this set
+        self._private_tables = {}
+        self._private_version = 0
+
+    def __call__(self, name):
+        """Return the named table, creating it on first use"""
+        if self.storage is None:
+            if name not in self._private_tables:
+                self._private_tables[name] = ToolTable(on_change=self._private_changed)
+            return self._private_tables[name]
+
+        return _loaded_tables.get((self.owner, self.tool_id, name), lambda: self._open(name))
+
+    @property
+    def data_version(self):
+        """Changes whenever any table of this tool is written, in any session"""
+        if self.storage is None:
+            return self._private_version
+        return _data_versions.get((self.owner, self.tool_id))
+
+    def _private_changed(self):
+        self._private_version += 1
+
+    def _open(self, name):
+        table_id = hashlib.sha1(f"{self.owner}/{self.tool_id}/{name}".encode("utf-8")).hexdigest()[:20]
+        key = (self.owner, self.tool_id)
+        return ToolTable(self.storage, table_id, on_change=lambda: _data_versions.bump(key))
+
+
+class _DataVersions:
+    """Per-tool write counters.
+
+    Values come from one process-wide sequence, so a tool never returns to a
+    version it had before, even after its tables are evicted and reloaded.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._versions.get(key, 0)
+
+    def bump(self, key):
+        with self._lock:
+            self._versions[key] = next(self._sequence)
+
+
+class _LoadedTables:
+    """LRU of tables held in memory, keyed by (owner, tool_id, name).
+
+    Evicted tables reload from SQLite on next use. A table evicted while a
+    session still holds it is kept through a weak reference and handed out
+    again, so one SQL table never has two live ToolTable objects assigning
+    the same row ids.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._tables = OrderedDict()
+        self._evicted = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, key, factory):
+        with self._lock:
+            table = self._tables.get(key)
+            if table is None:
+                table = self._evicted.pop(key, None)
+                if table is None:
+                    table = factory()
+                self._tables[key] = table
+            self._tables.move_to_end(key)
+            while len(self._tables) > self.maxsize:
+                evicted_key, evicted = self._tables.popitem(last=False)
+                self._evicted[evicted_key] = evicted
+            return table
+
+
+_loaded_tables = _LoadedTables(maxsize=config.TOOL_TABLES_IN_MEMORY)
+_data_versions = _DataVersions()
+_table_storage = None
+_table_storage_lock = threading.Lock()
+
+
+def get_table_storage():
+    """Return the SQLite storage shared by every session in this process"""
+    global _table_storage
+    with _table_storage_lock:
+        if _table_storage is None:
+            _table_storage = TableStorage(config.data_path("tool_tables.sqlite3"))
+        return _table_storage
@@ -1,7 +1,47 @@
 import re
-import ast
+import hmac
+import json
+import secrets
 import streamlit as st
+import config
+from code_validator import analyze_code
+from telemetry import span, traced
+from tool_store import get_tool_store
 
+def get_owner_id():
+    """Return the id that owns this browser's tools.
+    
+    Kept in the `owner` query parameter so saved tools survive a page reload.
+    This is an unauthenticated bearer id, not access control: whoever has it
+    can read and change the tools. New ids are 256 random bits so they cannot
+    be guessed; never log or display them.
+    """
+    
+    if 'owner_id' not in st.session_state:
+        owner_id = st.query_params.get('owner')
+        if not owner_id:
+            owner_id = secrets.token_urlsafe(32)
+            st.query_params['owner'] = owner_id
+        st.session_state.owner_id = owner_id
+    
+    return st.session_state.owner_id
+
+def is_admin():
+    """Whether this session may see process-wide metrics.
+    
+    True only when FOCUS_BUILDER_ADMIN_TOKEN is set and the `admin` query
+    parameter matches it.
+    """
+    
+    if 'is_admin' not in st.session_state:
+        token = st.query_params.get('admin')
+        st.session_state.is_admin = bool(
+            config.ADMIN_TOKEN and token and hmac.compare_digest(token, config.ADMIN_TOKEN)
+        )
+    
+    return st.session_state.is_admin
+
+@traced("sanitize")
 def sanitize_input(user_input):
     """Sanitize user input to prevent injection attacks and clean up the text"""
     
@@ -30,54 +70,173 @@ def sanitize_input(user_input):
 def validate_generated_code(code):
     """Validate that the generated code is safe and properly structured"""
     
-    if not code or not isinstance(code, str):
+    with span("validate") as trace:
+        result = analyze_code(code)
+        trace.set(size_bytes=result.metrics.get('size_bytes'))
+        if not result.valid:
+            trace.set_outcome("invalid")
+    
+    if not result.valid:
+        st.error(f"❌ {result.message}")
         return False
     
-    try:
-        # Check for basic syntax errors
-        ast.parse(code)
-        
-        # Check if execute_tool function is defined
-        if 'def execute_tool(' not in code:
-            st.error("❌ Generated code must contain an 'execute_tool()' function")
-            return False
-        
-        # Check for potentially dangerous imports or operations
-        dangerous_patterns = [
-            r'import\s+os',
-            r'import\s+sys',
-            r'import\s+subprocess',
-            r'exec\s*\(',
-            r'eval\s*\(',
-            r'__import__',
-            r'open\s*\(',
-            r'file\s*\(',
-            r'input\s*\(',
-            r'raw_input\s*\('
-        ]
-        
-        for pattern in dangerous_patterns:
-            if re.search(pattern, code, re.IGNORECASE):
-                st.error(f"❌ Generated code contains potentially unsafe operation: {pattern}")
-                return False
-        
-        # Check if code is too long (potential resource abuse)
-        if len(code) > 50000:  # 50KB limit
-            st.error("❌ Generated code is too long")
-            return False
-        
-        # Check for required Streamlit import
-        if 'import streamlit' not in code and 'st.' in code:
-            st.warning("⚠️ Generated code uses Streamlit but doesn't import it (this might be intentional)")
-        
-        return True
+    for warning in result.warnings:
+        st.warning(f"⚠️ {warning}")
+    
+    return True
+
+# An opening fence line, then code up to a closing fence line or the end of a (partial) reply
+_FENCED_BLOCK_RE = re.compile(r"^[ \t]*```[\w+-]*[ \t]*\n(.*?)(?:^[ \t]*```[ \t]*$|\Z)", re.MULTILINE | re.DOTALL)
+
+def strip_code_fences(text):
+    """Return the code inside markdown fences in an LLM reply.
+
+    Prose around the fences is dropped; with several fenced blocks the one
+    defining execute_tool() wins. Text without fences is returned unchanged.
+    """
+
+    if not text or "```" not in text:
+        return text
+    blocks = _FENCED_BLOCK_RE.findall(text)
+    if not blocks:
+        return text
+    code = next((block for block in blocks if "def execute_tool" in block), max(blocks, key=len))
+    return code.rstrip() + "\n"
+
+class _IncompleteJSON(Exception):
+    pass
+
+class _PartialJSONParser:
+    """Recursive-descent JSON parser that stops gracefully at end of input"""
+    
+    _literals = {'true': True, 'false': False, 'null': None}
+    _number_chars = set('0123456789+-.eE')
+    
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+    
+    def parse(self):
+        try:
+            return self._value()
+        except _IncompleteJSON:
+            return None
+    
+    def _skip_whitespace(self):
+        while self.pos < len(self.text) and self.text[self.pos] in ' \t\r\n':
+            self.pos += 1
+        if self.pos >= len(self.text):
+            raise _IncompleteJSON()
+    
+    def _value(self):
+        self._skip_whitespace()
+        char = self.text[self.pos]
+        if char == '{':
+            return self._object()
+        if char == '[':
+            return self._array()
+        if char == '"':
+            return self._string()[0]
+        if char in '-0123456789':
+            return self._number()
+        return self._literal()
+    
+    def _object(self):
+        result = {}
+        self.pos += 1
+        while True:
+            try:
+                self._skip_whitespace()
+                if self.text[self.pos] == '}':
+                    self.pos += 1
+                    return result
+                if self.text[self.pos] == ',':
+                    self.pos += 1
+                    self._skip_whitespace()
+                
+                key, key_complete = self._string()
+                if not key_complete:
+                    return result
+                self._skip_whitespace()
+                if self.text[self.pos] != ':':
+                    raise ValueError(f"Expected ':' at position {self.pos}")
+                self.pos += 1
+                result[key] = self._value()
+            except _IncompleteJSON:
+                return result
+    
+    def _array(self):
+        result = []
+        self.pos += 1
+        while True:
+            try:
+                self._skip_whitespace()
+                if self.text[self.pos] == ']':
+                    self.pos += 1
+                    return result
+                if self.text[self.pos] == ',':
+                    self.pos += 1
+                result.append(self._value())
+            except _IncompleteJSON:
+                return result
+    
+    def _string(self):
+        """Return (value, complete); a cut-off string yields what has arrived"""
+        if self.text[self.pos] != '"':
+            raise ValueError(f"Expected string at position {self.pos}")
+        start = self.pos
+        self.pos += 1
+        while self.pos < len(self.text):
+            char = self.text[self.pos]
+            if char == '\\':
+                self.pos += 2
+                continue
+            if char == '"':
+                self.pos += 1
+                return json.loads(self.text[start:self.pos]), True
+            self.pos += 1
         
-    except SyntaxError as e:
-        st.error(f"❌ Syntax error in generated code: {str(e)}")
-        return False
-    except Exception as e:
-        st.error(f"❌ Error validating generated code: {str(e)}")
-        return False
+        # Drop a trailing partial escape sequence before decoding
+        partial = self.text[start + 1:]
+        partial = re.sub(r'\\(u[0-9a-fA-F]{0,3})?$', '', partial)
+        try:
+            return json.loads(f'"{partial}"'), False
+        except json.JSONDecodeError:
+            return "", False
+    
+    def _number(self):
+        start = self.pos
+        while self.pos < len(self.text) and self.text[self.pos] in self._number_chars:
+            self.pos += 1
+        if self.pos >= len(self.text):
+            # The number may still be growing; wait for its terminator
+            raise _IncompleteJSON()
+        return json.loads(self.text[start:self.pos])
+    
+    def _literal(self):
+        for literal, value in self._literals.items():
+            if self.text.startswith(literal, self.pos):
+                self.pos += len(literal)
+                return value
+            if literal.startswith(self.text[self.pos:]):
+                raise _IncompleteJSON()
+        raise ValueError(f"Unexpected character at position {self.pos}")
+
+def parse_partial_json(text):
+    """Parse a JSON document that may be cut off mid-stream.
+    
+    Returns the structure received so far, dropping any trailing key or value
+    that cannot be decoded yet. Returns None if nothing usable has arrived or
+    the text is not JSON.
+    """
+    
+    if not text:
+        return None
+    
+    try:
+        return _PartialJSONParser(text).parse()
+    except ValueError:
+        return None
 
 def format_error_message(error):
     """Format error messages in a user-friendly way"""
@@ -157,12 +316,13 @@ def clean_session_state():
     """Clean up old or unused session state variables"""
     
     # Remove old tool data that's no longer needed
+    tool_ids = get_tool_store().tool_ids(get_owner_id())
     keys_to_remove = []
     for key in st.session_state:
         if key.startswith('tool_') and key.endswith('_data'):
-            # Extract tool_id from the key
-            tool_id = key.replace('tool_', '').replace('_data', '')
-            if tool_id not in st.session_state.get('generated_tools', {}):
+            # Extract tool_id from the key (namespaces look like tool_{tool_id}_data)
+            tool_id = key[len('tool_'):-len('_data')]
+            if tool_id not in tool_ids:
                 keys_to_remove.append(key)
     
     for key in keys_to_remove:
@@ -0,0 +1,50 @@
+import importlib
+import threading
+import time
+
+import config
+
+# Not needed to draw the first page, but needed soon after: by the OpenAI
+# client, by generated tools on their first render, and by the template matcher
+WARMUP_MODULES = ("openai", "numpy", "pandas", "plotly.express", "plotly.graph_objects")
+
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+_warmup_timings = {}
+
+
+def _warm_up():
+    for module in WARMUP_MODULES:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            continue
+        _warmup_timings[module] = time.perf_counter() - started
+
+    # Process-wide resources that are slow to create on first use
+    from template_matcher import get_template_matcher
+    get_template_matcher()
+
+    if config.PREFLIGHT_ENABLED:
+        from preflight import get_preflight_pool
+        get_preflight_pool()
+
+
+def start_warmup():
+    """Start the background warm-up once per process; later calls are no-ops"""
+    global _warmup_thread
+
+    if not config.WARMUP_ENABLED:
+        return None
+
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_warm_up, name="warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def warmup_timings():
+    """Seconds each warm-up import took in the background"""
+    return dict(_warmup_timings)